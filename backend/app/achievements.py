@@ -0,0 +1,108 @@
+from sqlalchemy.orm import Session
+import json
+
+from .db_utils import insert_ignore
+from .models import UserAchievement, UserProgress
+from .progress_store import STATS_KEY
+from .stats_counters import get_counters, counters_to_stats
+
+# 지표별 성취 규칙: (성취 ID, 달성 기준값) - 새 성취는 여기에 한 줄 추가
+ACHIEVEMENT_RULES = {
+    'total_learned': [
+        ('first_learn', 1),
+        ('beginner', 3),
+        ('learner', 5),
+        ('first_10', 10),
+        ('knowledge_seeker', 20),
+        ('first_50', 50),
+    ],
+    'total_terms_learned': [
+        ('first_term', 1),
+        ('term_collector', 5),
+        ('term_master', 10),
+    ],
+    'streak_days': [
+        ('three_day_streak', 3),
+        ('week_streak', 7),
+        ('two_week_streak', 14),
+    ],
+    'quiz_score': [
+        ('quiz_beginner', 60),
+        ('quiz_master', 80),
+        ('perfect_quiz', 100),
+    ],
+}
+
+# 학습 이벤트 종류별로 값이 바뀌는 지표
+EVENT_METRICS = {
+    'info': ('total_learned', 'streak_days'),
+    'term': ('total_terms_learned',),
+    'quiz': ('quiz_score',),
+}
+
+ACHIEVEMENT_ORDER = [achievement_id for rules in ACHIEVEMENT_RULES.values() for achievement_id, _ in rules]
+
+def _sort_achievements(achievement_ids):
+    order = {achievement_id: i for i, achievement_id in enumerate(ACHIEVEMENT_ORDER)}
+    return sorted(achievement_ids, key=lambda achievement_id: order.get(achievement_id, len(order)))
+
+def qualified_achievements(values, metrics=None):
+    """지표 값으로 달성한 성취 ID 목록을 반환합니다. metrics를 주면 해당 지표의 규칙만 확인합니다."""
+    qualified = []
+    for metric in (metrics if metrics is not None else ACHIEVEMENT_RULES):
+        value = values.get(metric) or 0
+        for achievement_id, threshold in ACHIEVEMENT_RULES.get(metric, ()):
+            if value < threshold:
+                break  # 기준값 오름차순이므로 이후 규칙은 모두 미달성
+            qualified.append(achievement_id)
+    return qualified
+
+def unlocked_achievements(db: Session, session_id: str):
+    """세션이 획득한 성취 행 목록"""
+    return db.query(UserAchievement).filter(UserAchievement.session_id == session_id).all()
+
+def evaluate_achievements(db: Session, session_id: str, metrics=None):
+    """바뀐 지표의 규칙만 평가해 새로 달성한 성취를 기록하고 그 ID 목록을 반환합니다. (커밋은 호출자 책임)
+
+    지표 값은 세션 카운터에서 읽으므로 학습 기록 길이나 규칙 수와 관계없이 쿼리 비용이 일정합니다.
+    """
+    values = counters_to_stats(get_counters(db, session_id))
+    qualified = qualified_achievements(values, metrics)
+    if not qualified:
+        return []
+
+    unlocked = {row.achievement_id for row in unlocked_achievements(db, session_id)}
+    new_achievements = []
+    for achievement_id in qualified:
+        if achievement_id in unlocked:
+            continue
+        # 동시 요청이 같은 성취를 먼저 기록했다면 무시 (고유 키 충돌)
+        if insert_ignore(
+            db, UserAchievement,
+            {'session_id': session_id, 'achievement_id': achievement_id, 'notified': False},
+            ['session_id', 'achievement_id']
+        ):
+            new_achievements.append(achievement_id)
+    return new_achievements
+
+def merge_achievements(rows, stored_stats=None):
+    """성취 테이블 행과 레거시 `__stats__`의 성취 목록을 합쳐 반환합니다."""
+    achievement_ids = {row.achievement_id for row in rows}
+    if stored_stats:
+        achievement_ids.update(stored_stats.get('achievements') or [])
+    return _sort_achievements(achievement_ids)
+
+def import_legacy_achievements(db: Session):
+    """`__stats__` 행에 저장된 성취 목록을 성취 테이블로 옮깁니다. (이미 알린 성취로 표시)"""
+    imported = 0
+    for row in db.query(UserProgress).filter(UserProgress.date == STATS_KEY).all():
+        try:
+            achievement_ids = (json.loads(row.stats) if row.stats else {}).get('achievements') or []
+        except (TypeError, ValueError):
+            continue
+        unlocked = {item.achievement_id for item in unlocked_achievements(db, row.session_id)}
+        for achievement_id in set(achievement_ids) - unlocked:
+            db.add(UserAchievement(session_id=row.session_id, achievement_id=achievement_id, notified=True))
+            imported += 1
+        db.commit()
+    return imported
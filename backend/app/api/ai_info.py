@@ -1,62 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import json
-import re
+import os
+import random
 
 from ..database import get_db
+from ..text_normalize import duplicate_indices
 from ..models import AIInfo
 from ..schemas import AIInfoCreate, AIInfoResponse, AIInfoItem, TermItem
+from ..progress_store import load_session_events
+from ..term_index import get_terms_by_date, rebuild_term_index, delete_term_index, invalidate_term_index, parse_ai_info_terms
+from ..quiz_bundles import refresh_quiz_bundle, delete_quiz_bundle, invalidate_quiz_bundles, get_quiz_bundle, next_variant
+from ..quiz_builder import DistractorPool, build_term_quizzes, date_pool, quiz_fallback_pool
+from ..content_etag import AI_INFO_CACHE_CONTROL, content_hash, etag_matches, format_etag, lookup_etag
+from ..cache import ResponseCache, create_backend
+from ..search_index import index_document, remove_document, invalidate_search_documents
+from ..near_duplicates import ai_info_items, delete_signatures, find_near_duplicates, invalidate_near_duplicates, rebuild_signatures
 
 router = APIRouter()
 
+# 한 번에 조회할 수 있는 최대 날짜 수와 전체 날짜 목록 캐시
+AI_INFO_BULK_MAX_DATES = int(os.getenv("AI_INFO_BULK_MAX_DATES", "366"))
+AI_INFO_DATES_CACHE_TTL_SECONDS = float(os.getenv("AI_INFO_DATES_CACHE_TTL_SECONDS", "300"))
 
+dates_cache = ResponseCache("ai-info-dates", AI_INFO_DATES_CACHE_TTL_SECONDS, create_backend(16))
 
-def normalize_text(text):
-    text = text.lower()
-    text = re.sub(r'[-–—:·.,!?"\'\\|/]', '', text)
-    text = re.sub(r'\s+', '', text)
-    return text
+INFO_FIELDS = (
+    ("info1_title", "info1_content", "info1_terms"),
+    ("info2_title", "info2_content", "info2_terms"),
+    ("info3_title", "info3_content", "info3_terms"),
+)
+
+
+def duplicate_titles(infos, existing_titles=()):
+    """정규화한 제목이 저장된 제목이나 앞 항목과 같은 요청 정보의 제목 목록 (경고용, 저장은 막지 않음)
+
+    제목 목록을 duplicate_indices로 한 번에 정규화해 비교하며, 제목이 빈 정보는 비교하지 않습니다.
+    """
+    titles = [title for title in existing_titles if title]
+    submitted = [info.title for info in infos if info.title]
+    return [submitted[index - len(titles)] for index in duplicate_indices(titles + submitted) if index >= len(titles)]
+
+def build_infos(obj):
+    """AI 정보 행을 응답용 infos 목록으로 변환합니다. (제목과 내용이 있는 정보만)"""
+    infos = []
+    for title_field, content_field, terms_field in INFO_FIELDS:
+        title = getattr(obj, title_field)
+        content = getattr(obj, content_field)
+        if not (title and content):
+            continue
+        raw_terms = getattr(obj, terms_field)
+        try:
+            terms = json.loads(raw_terms) if raw_terms else []
+        except json.JSONDecodeError:
+            terms = []
+        infos.append({
+            "title": title,
+            "content": content,
+            "terms": terms
+        })
+    return infos
+
+@router.get("/bulk")
+def get_ai_info_bulk(start: Optional[str] = None, end: Optional[str] = None, dates: Optional[str] = None, db: Session = Depends(get_db)):
+    """날짜 범위(start~end) 또는 쉼표로 구분한 날짜 목록의 AI 정보를 한 번의 쿼리로 반환합니다."""
+    query = db.query(AIInfo)
+    if dates:
+        requested = list(dict.fromkeys(d.strip() for d in dates.split(',') if d.strip()))
+        if len(requested) > AI_INFO_BULK_MAX_DATES:
+            raise HTTPException(status_code=400, detail=f"Too many dates (max {AI_INFO_BULK_MAX_DATES})")
+        query = query.filter(AIInfo.date.in_(requested))
+    elif start and end:
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must not be after end")
+        query = query.filter(AIInfo.date >= start, AIInfo.date <= end)
+    else:
+        raise HTTPException(status_code=400, detail="Either dates or start and end are required")
+
+    rows = query.order_by(AIInfo.date).limit(AI_INFO_BULK_MAX_DATES + 1).all()
+    if len(rows) > AI_INFO_BULK_MAX_DATES:
+        raise HTTPException(status_code=400, detail=f"Range covers too many dates (max {AI_INFO_BULK_MAX_DATES})")
+    return {row.date: build_infos(row) for row in rows}
 
 @router.get("/{date}", response_model=List[AIInfoItem])
-def get_ai_info_by_date(date: str, db: Session = Depends(get_db)):
+def get_ai_info_by_date(date: str, request: Request, response: Response, db: Session = Depends(get_db)):
     try:
+        # 저장 시 계산해 둔 내용 해시로 조건부 요청 처리 (일치하면 행 조회/직렬화 없이 304)
+        etag = lookup_etag(db, date)
+        if etag and etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": AI_INFO_CACHE_CONTROL})
+
         ai_info = db.query(AIInfo).filter(AIInfo.date == date).first()
         if not ai_info:
             return []
         
-        infos = []
-        if ai_info.info1_title and ai_info.info1_content:
-            try:
-                terms1 = json.loads(ai_info.info1_terms) if ai_info.info1_terms else []
-            except json.JSONDecodeError:
-                terms1 = []
-            infos.append({
-                "title": ai_info.info1_title, 
-                "content": ai_info.info1_content,
-                "terms": terms1
-            })
-        if ai_info.info2_title and ai_info.info2_content:
-            try:
-                terms2 = json.loads(ai_info.info2_terms) if ai_info.info2_terms else []
-            except json.JSONDecodeError:
-                terms2 = []
-            infos.append({
-                "title": ai_info.info2_title, 
-                "content": ai_info.info2_content,
-                "terms": terms2
-            })
-        if ai_info.info3_title and ai_info.info3_content:
-            try:
-                terms3 = json.loads(ai_info.info3_terms) if ai_info.info3_terms else []
-            except json.JSONDecodeError:
-                terms3 = []
-            infos.append({
-                "title": ai_info.info3_title, 
-                "content": ai_info.info3_content,
-                "terms": terms3
-            })
-        
+        infos = build_infos(ai_info)
+        if not ai_info.content_hash:
+            # 해시 도입 전에 저장된 행은 처음 조회될 때 채움
+            ai_info.content_hash = content_hash(infos)
+            db.commit()
+        response.headers["ETag"] = format_etag(ai_info.content_hash)
+        response.headers["Cache-Control"] = AI_INFO_CACHE_CONTROL
         return infos
     except Exception as e:
         print(f"Error in get_ai_info_by_date: {e}")
@@ -67,40 +112,6 @@ def add_ai_info(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
     try:
         existing_info = db.query(AIInfo).filter(AIInfo.date == ai_info_data.date).first()
 
-        def build_infos(obj):
-            infos = []
-            if obj.info1_title and obj.info1_content:
-                try:
-                    terms1 = json.loads(obj.info1_terms) if obj.info1_terms else []
-                except json.JSONDecodeError:
-                    terms1 = []
-                infos.append({
-                    "title": obj.info1_title,
-                    "content": obj.info1_content,
-                    "terms": terms1
-                })
-            if obj.info2_title and obj.info2_content:
-                try:
-                    terms2 = json.loads(obj.info2_terms) if obj.info2_terms else []
-                except json.JSONDecodeError:
-                    terms2 = []
-                infos.append({
-                    "title": obj.info2_title,
-                    "content": obj.info2_content,
-                    "terms": terms2
-                })
-            if obj.info3_title and obj.info3_content:
-                try:
-                    terms3 = json.loads(obj.info3_terms) if obj.info3_terms else []
-                except json.JSONDecodeError:
-                    terms3 = []
-                infos.append({
-                    "title": obj.info3_title,
-                    "content": obj.info3_content,
-                    "terms": terms3
-                })
-            return infos
-
         def terms_to_dict(terms):
             """TermItem 객체들을 딕셔너리 리스트로 변환"""
             if not terms:
@@ -110,28 +121,39 @@ def add_ai_info(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
         if existing_info:
             # 기존 데이터 업데이트 (비어있는 info2, info3에 순차적으로 채움)
             infos_to_add = [i for i in ai_info_data.infos if i.title and i.content]
-            fields = [
-                ("info1_title", "info1_content", "info1_terms"),
-                ("info2_title", "info2_content", "info2_terms"),
-                ("info3_title", "info3_content", "info3_terms"),
-            ]
-            for i, (title_field, content_field, terms_field) in enumerate(fields):
+            repeated_titles = duplicate_titles(infos_to_add, [info["title"] for info in build_infos(existing_info)])
+            for i, (title_field, content_field, terms_field) in enumerate(INFO_FIELDS):
                 if getattr(existing_info, title_field) == '' or getattr(existing_info, content_field) == '':
                     if infos_to_add:
                         info = infos_to_add.pop(0)
                         setattr(existing_info, title_field, info.title)
                         setattr(existing_info, content_field, info.content)
                         setattr(existing_info, terms_field, json.dumps(terms_to_dict(info.terms or [])))
+            existing_info.content_hash = content_hash(build_infos(existing_info))
+            rebuild_term_index(db, existing_info)
+            refresh_quiz_bundle(db, existing_info.date, parse_ai_info_terms(existing_info))
+            index_document(db, 'ai_info', existing_info)
+            # 다른 날짜에 이미 올라온 비슷한 정보를 후보로 함께 반환 (저장은 막지 않음)
+            duplicates = find_near_duplicates(db, ai_info_items(existing_info), exclude_date=existing_info.date)
+            rebuild_signatures(db, existing_info)
             db.commit()
+            invalidate_term_index(existing_info.date)
+            invalidate_quiz_bundles(existing_info.date)
+            dates_cache.invalidate("all")
+            invalidate_search_documents('ai_info', existing_info.date)
+            invalidate_near_duplicates(existing_info.date)
             db.refresh(existing_info)
             return {
                 "id": existing_info.id,
                 "date": existing_info.date,
                 "infos": build_infos(existing_info),
-                "created_at": str(existing_info.created_at) if existing_info.created_at else None
+                "created_at": str(existing_info.created_at) if existing_info.created_at else None,
+                "duplicates": duplicates,
+                "duplicate_titles": repeated_titles
             }
         else:
             # 새 데이터 생성
+            repeated_titles = duplicate_titles(ai_info_data.infos)
             db_ai_info = AIInfo(
                 date=ai_info_data.date,
                 info1_title=ai_info_data.infos[0].title if len(ai_info_data.infos) >= 1 else "",
@@ -144,14 +166,27 @@ def add_ai_info(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
                 info3_content=ai_info_data.infos[2].content if len(ai_info_data.infos) >= 3 else "",
                 info3_terms=json.dumps(terms_to_dict(ai_info_data.infos[2].terms or [])) if len(ai_info_data.infos) >= 3 else "[]"
             )
+            db_ai_info.content_hash = content_hash(build_infos(db_ai_info))
             db.add(db_ai_info)
+            rebuild_term_index(db, db_ai_info)
+            refresh_quiz_bundle(db, db_ai_info.date, parse_ai_info_terms(db_ai_info))
+            index_document(db, 'ai_info', db_ai_info)
+            duplicates = find_near_duplicates(db, ai_info_items(db_ai_info), exclude_date=db_ai_info.date)
+            rebuild_signatures(db, db_ai_info)
             db.commit()
+            invalidate_term_index(db_ai_info.date)
+            invalidate_quiz_bundles(db_ai_info.date)
+            dates_cache.invalidate("all")
+            invalidate_search_documents('ai_info', db_ai_info.date)
+            invalidate_near_duplicates(db_ai_info.date)
             db.refresh(db_ai_info)
             return {
                 "id": db_ai_info.id,
                 "date": db_ai_info.date,
                 "infos": build_infos(db_ai_info),
-                "created_at": str(db_ai_info.created_at) if db_ai_info.created_at else None
+                "created_at": str(db_ai_info.created_at) if db_ai_info.created_at else None,
+                "duplicates": duplicates,
+                "duplicate_titles": repeated_titles
             }
     except Exception as e:
         print(f"Error in add_ai_info: {e}")
@@ -164,177 +199,85 @@ def delete_ai_info(date: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="AI info not found")
     
     db.delete(ai_info)
+    delete_term_index(db, date)
+    delete_quiz_bundle(db, date)
+    remove_document(db, 'ai_info', date)
+    delete_signatures(db, date)
     db.commit()
+    invalidate_term_index(date)
+    invalidate_quiz_bundles(date)
+    dates_cache.invalidate("all")
+    invalidate_search_documents('ai_info', date)
+    invalidate_near_duplicates(date)
     return {"message": "AI info deleted successfully"}
 
+@router.post("/duplicates/check")
+def check_ai_info_duplicates(ai_info_data: AIInfoCreate, db: Session = Depends(get_db)):
+    """저장 전에 입력한 정보와 비슷한 기존 AI 정보를 찾습니다. (같은 날짜는 제외)"""
+    items = [(i, info.title, info.content) for i, info in enumerate(ai_info_data.infos) if info.title and info.content]
+    return {"duplicates": find_near_duplicates(db, items, exclude_date=ai_info_data.date)}
+
 @router.get("/dates/all")
 def get_all_ai_info_dates(db: Session = Depends(get_db)):
-    dates = [row.date for row in db.query(AIInfo).order_by(AIInfo.date).all()]
-    return dates
+    # date 컬럼만 조회해 캐시 (AI 정보 추가/삭제 시 무효화)
+    return dates_cache.get_or_compute("all", lambda: [date for (date,) in db.query(AIInfo.date).order_by(AIInfo.date)])
 
 @router.get("/terms-quiz/{session_id}")
-def get_terms_quiz(session_id: str, db: Session = Depends(get_db)):
+def get_terms_quiz(session_id: str, db: Session = Depends(get_db), seed: Optional[int] = None):
     """사용자가 학습한 날짜의 모든 용어로 퀴즈를 생성합니다."""
     try:
         # 사용자의 학습 진행상황 가져오기
-        from ..models import UserProgress
-        user_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date != '__stats__'
-        ).all()
+        events = load_session_events(db, session_id)
         
-        if not user_progress:
+        if not events.learned_info and not events.learned_terms:
             return {"quizzes": [], "message": "학습한 내용이 없습니다."}
         
-        # 학습한 날짜들의 모든 용어 수집
+        # 학습한 날짜들의 모든 용어 수집 (용어 색인에서 한 번에 조회)
+        terms_by_date = get_terms_by_date(db, events.learned_info)
         all_terms = []
-        for progress in user_progress:
-            if progress.learned_info:
-                try:
-                    learned_indices = json.loads(progress.learned_info)
-                    ai_info = db.query(AIInfo).filter(AIInfo.date == progress.date).first()
-                    if ai_info:
-                        # 각 학습한 info의 용어들 가져오기
-                        for info_idx in learned_indices:
-                            if info_idx == 0 and ai_info.info1_terms:
-                                try:
-                                    terms = json.loads(ai_info.info1_terms)
-                                    all_terms.extend(terms)
-                                except json.JSONDecodeError:
-                                    pass
-                            elif info_idx == 1 and ai_info.info2_terms:
-                                try:
-                                    terms = json.loads(ai_info.info2_terms)
-                                    all_terms.extend(terms)
-                                except json.JSONDecodeError:
-                                    pass
-                            elif info_idx == 2 and ai_info.info3_terms:
-                                try:
-                                    terms = json.loads(ai_info.info3_terms)
-                                    all_terms.extend(terms)
-                                except json.JSONDecodeError:
-                                    pass
-                except json.JSONDecodeError:
-                    continue
+        for learned_date, learned_indices in events.learned_info.items():
+            learned = set(learned_indices)
+            all_terms.extend(entry for entry in terms_by_date.get(learned_date, []) if entry['info_index'] in learned)
         
         if not all_terms:
             return {"quizzes": [], "message": "학습한 용어가 없습니다."}
         
-        # 중복 제거
-        unique_terms = []
-        seen_terms = set()
-        for term in all_terms:
-            if term.get('term') and term.get('term') not in seen_terms:
-                unique_terms.append(term)
-                seen_terms.add(term.get('term'))
-        
-        # 퀴즈 생성 (최대 5개)
-        import random
-        random.shuffle(unique_terms)
-        quiz_terms = unique_terms[:5]
-        
-        quizzes = []
-        for i, term in enumerate(quiz_terms):
-            # 정답이 아닌 다른 용어들 중에서 3개 선택
-            other_terms = [t for t in unique_terms if t != term]
-            if len(other_terms) >= 3:
-                wrong_answers = random.sample(other_terms, 3)
-                options = [term['description']] + [t['description'] for t in wrong_answers]
-                random.shuffle(options)
-                correct_index = options.index(term['description'])
-                
-                quizzes.append({
-                    "id": i + 1,
-                    "question": f"'{term['term']}'의 올바른 뜻은?",
-                    "option1": options[0],
-                    "option2": options[1],
-                    "option3": options[2],
-                    "option4": options[3],
-                    "correct": correct_index,
-                    "explanation": f"'{term['term']}'는 '{term['description']}'을 의미합니다."
-                })
+        # 중복 제거된 학습 용어 풀에서 퀴즈 생성 (최대 5개, seed를 주면 같은 퀴즈 재현)
+        pool = DistractorPool(all_terms)
+        quizzes = build_term_quizzes(pool, random.Random(seed), quiz_fallback_pool(db, pool))
         
-        return {"quizzes": quizzes, "total_terms": len(unique_terms)}
+        return {"quizzes": quizzes, "total_terms": len(pool)}
         
     except Exception as e:
         print(f"Error in get_terms_quiz: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate terms quiz: {str(e)}")
 
 @router.get("/terms-quiz-by-date/{date}")
-def get_terms_quiz_by_date(date: str, db: Session = Depends(get_db)):
+def get_terms_quiz_by_date(date: str, db: Session = Depends(get_db), seed: Optional[int] = None):
     """선택한 날짜의 모든 용어로 퀴즈를 생성합니다 (학습 여부와 상관없이)."""
     try:
-        # 선택한 날짜의 AI 정보 가져오기
-        ai_info = db.query(AIInfo).filter(AIInfo.date == date).first()
-        
-        if not ai_info:
+        if seed is None:
+            # 미리 생성해 둔 퀴즈 묶음의 변형을 돌아가며 제공
+            bundle = get_quiz_bundle(db, date)
+            if bundle is None:
+                return {"quizzes": [], "message": f"{date} 날짜의 AI 정보가 없습니다."}
+            if not bundle['total_terms']:
+                return {"quizzes": [], "message": f"{date} 날짜에 등록된 용어가 없습니다."}
+            variant, quizzes = next_variant(bundle)
+            return {"quizzes": quizzes, "total_terms": bundle['total_terms'], "variant": variant}
+        
+        # seed를 주면 같은 퀴즈를 재현할 수 있도록 날짜의 용어 풀에서 직접 생성
+        pool = date_pool(db, date)
+        
+        if not len(pool) and not db.query(AIInfo.id).filter(AIInfo.date == date).first():
             return {"quizzes": [], "message": f"{date} 날짜의 AI 정보가 없습니다."}
         
-        # 모든 용어 수집
-        all_terms = []
-        
-        # info1의 용어들
-        if ai_info.info1_terms:
-            try:
-                terms1 = json.loads(ai_info.info1_terms)
-                all_terms.extend(terms1)
-            except json.JSONDecodeError:
-                pass
-        
-        # info2의 용어들
-        if ai_info.info2_terms:
-            try:
-                terms2 = json.loads(ai_info.info2_terms)
-                all_terms.extend(terms2)
-            except json.JSONDecodeError:
-                pass
-        
-        # info3의 용어들
-        if ai_info.info3_terms:
-            try:
-                terms3 = json.loads(ai_info.info3_terms)
-                all_terms.extend(terms3)
-            except json.JSONDecodeError:
-                pass
-        
-        if not all_terms:
+        if not len(pool):
             return {"quizzes": [], "message": f"{date} 날짜에 등록된 용어가 없습니다."}
         
-        # 중복 제거
-        unique_terms = []
-        seen_terms = set()
-        for term in all_terms:
-            if term.get('term') and term.get('term') not in seen_terms:
-                unique_terms.append(term)
-                seen_terms.add(term.get('term'))
-        
-        # 퀴즈 생성 (최대 5개)
-        import random
-        random.shuffle(unique_terms)
-        quiz_terms = unique_terms[:5]
+        quizzes = build_term_quizzes(pool, random.Random(seed), quiz_fallback_pool(db, pool))
         
-        quizzes = []
-        for i, term in enumerate(quiz_terms):
-            # 정답이 아닌 다른 용어들 중에서 3개 선택
-            other_terms = [t for t in unique_terms if t != term]
-            if len(other_terms) >= 3:
-                wrong_answers = random.sample(other_terms, 3)
-                options = [term['description']] + [t['description'] for t in wrong_answers]
-                random.shuffle(options)
-                correct_index = options.index(term['description'])
-                
-                quizzes.append({
-                    "id": i + 1,
-                    "question": f"'{term['term']}'의 올바른 뜻은?",
-                    "option1": options[0],
-                    "option2": options[1],
-                    "option3": options[2],
-                    "option4": options[3],
-                    "correct": correct_index,
-                    "explanation": f"'{term['term']}'는 '{term['description']}'을 의미합니다."
-                })
-        
-        return {"quizzes": quizzes, "total_terms": len(unique_terms)}
+        return {"quizzes": quizzes, "total_terms": len(pool)}
         
     except Exception as e:
         print(f"Error in get_terms_quiz_by_date: {e}")
@@ -344,109 +287,45 @@ def get_terms_quiz_by_date(date: str, db: Session = Depends(get_db)):
 def get_learned_terms(session_id: str, db: Session = Depends(get_db)):
     """사용자가 학습한 모든 용어를 가져옵니다."""
     try:
-        from ..models import UserProgress
-        
         # 사용자의 학습 진행상황 가져오기
-        user_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date != '__stats__'
-        ).all()
+        events = load_session_events(db, session_id)
         
-        if not user_progress:
+        if not events.learned_info and not events.learned_terms:
             return {"terms": [], "message": "학습한 내용이 없습니다."}
         
-        # 학습한 날짜들의 모든 용어 수집
-        all_terms = []
-        learned_dates = []
+        # 학습 기록이 참조하는 모든 날짜의 용어를 용어 색인에서 한 번에 조회
+        referenced_dates = list(events.learned_info) + [date_part for date_part, _ in events.learned_terms]
+        index_by_date = get_terms_by_date(db, referenced_dates)
         
-        for progress in user_progress:
-            if progress.learned_info:
-                try:
-                    # AI 정보 전체 학습 기록 처리
-                    if not progress.date.startswith('__terms__'):
-                        learned_indices = json.loads(progress.learned_info)
-                        ai_info = db.query(AIInfo).filter(AIInfo.date == progress.date).first()
-                        if ai_info:
-                            learned_dates.append(progress.date)
-                            # 각 학습한 info의 용어들 가져오기
-                            for info_idx in learned_indices:
-                                if info_idx == 0 and ai_info.info1_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info1_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                                elif info_idx == 1 and ai_info.info2_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info2_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                                elif info_idx == 2 and ai_info.info3_terms:
-                                    try:
-                                        terms = json.loads(ai_info.info3_terms)
-                                        for term in terms:
-                                            term['learned_date'] = progress.date
-                                            term['info_index'] = info_idx
-                                        all_terms.extend(terms)
-                                    except json.JSONDecodeError:
-                                        pass
-                    
-                    # 개별 용어 학습 기록 처리
-                    elif progress.date.startswith('__terms__'):
-                        # __terms__{date}_{info_index} 형식에서 날짜와 info_index 추출
-                        # 예: __terms__2024-01-15_0 -> date: 2024-01-15, info_index: 0
-                        date_part = progress.date.replace('__terms__', '')
-                        if '_' in date_part:
-                            date_str, info_str = date_part.rsplit('_', 1)
-                            try:
-                                info_index = int(info_str)
-                                date_part = date_str
-                                
-                                ai_info = db.query(AIInfo).filter(AIInfo.date == date_part).first()
-                                if ai_info:
-                                    if date_part not in learned_dates:
-                                        learned_dates.append(date_part)
-                                    learned_terms = json.loads(progress.learned_info) if progress.learned_info else []
-                                    
-                                    # 해당 info의 모든 용어에서 학습한 용어만 필터링
-                                    info_terms = []
-                                    if info_index == 0 and ai_info.info1_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info1_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    elif info_index == 1 and ai_info.info2_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info2_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    elif info_index == 2 and ai_info.info3_terms:
-                                        try:
-                                            info_terms = json.loads(ai_info.info3_terms)
-                                        except json.JSONDecodeError:
-                                            pass
-                                    
-                                    # 학습한 용어만 필터링
-                                    for term in info_terms:
-                                        if term.get('term') in learned_terms:
-                                            term['learned_date'] = date_part
-                                            term['info_index'] = info_index
-                                            all_terms.append(term)
-                            except (ValueError, IndexError) as e:
-                                print(f"Error parsing date from {progress.date}: {e}")
-                                continue
-                except json.JSONDecodeError:
-                    continue
+        # (날짜, info_index)별 용어 목록 (이후 조회는 모두 dict 조회)
+        terms_by_info = {}
+        for date, entries in index_by_date.items():
+            for entry in entries:
+                terms_by_info.setdefault((date, entry['info_index']), []).append(entry)
         
-        print(f"Debug - Total terms found: {len(all_terms)}")
-        print(f"Debug - Learned dates: {learned_dates}")
+        # 학습한 날짜들의 모든 용어 수집
+        all_terms = []
+        learned_dates = set()
+        
+        # AI 정보 전체 학습 기록 처리
+        for learned_date, learned_indices in events.learned_info.items():
+            if index_by_date.get(learned_date):
+                learned_dates.add(learned_date)
+                # 각 학습한 info의 용어들 가져오기
+                for info_idx in learned_indices:
+                    for entry in terms_by_info.get((learned_date, info_idx), ()):
+                        all_terms.append({'term': entry['term'], 'description': entry['description'], 'learned_date': learned_date, 'info_index': info_idx})
+        
+        # 개별 용어 학습 기록 처리
+        for (date_part, info_index), learned_terms in events.learned_terms.items():
+            if index_by_date.get(date_part):
+                learned_dates.add(date_part)
+                
+                # 해당 info의 모든 용어에서 학습한 용어만 필터링
+                learned_set = set(learned_terms)
+                for entry in terms_by_info.get((date_part, info_index), ()):
+                    if entry['term'] in learned_set:
+                        all_terms.append({'term': entry['term'], 'description': entry['description'], 'learned_date': date_part, 'info_index': info_index})
         
         if not all_terms:
             return {"terms": [], "message": "학습한 용어가 없습니다."}
@@ -456,25 +335,19 @@ def get_learned_terms(session_id: str, db: Session = Depends(get_db)):
         seen_terms = set()
         
         for term in all_terms:
-            term_key = f"{term.get('term')}_{term.get('learned_date')}_{term.get('info_index')}"
+            term_key = (term['term'], term['learned_date'], term['info_index'])
             if term_key not in seen_terms:
                 unique_terms.append(term)
                 seen_terms.add(term_key)
         
-        # 날짜별로 그룹화 (중복 제거)
-        terms_by_date = {}
+        # 날짜별로 그룹화 (같은 날짜의 같은 용어는 처음 것만, dict로 확인)
+        grouped = {}
         for term in unique_terms:
-            date = term.get('learned_date', '')
-            if date not in terms_by_date:
-                terms_by_date[date] = []
-            # 같은 날짜에 같은 용어가 이미 있는지 확인
-            existing_term = next((t for t in terms_by_date[date] if t.get('term') == term.get('term')), None)
-            if not existing_term:
-                terms_by_date[date].append(term)
+            grouped.setdefault(term['learned_date'], {}).setdefault(term['term'], term)
+        terms_by_date = {date: list(terms.values()) for date, terms in grouped.items()}
         
-        # learned_dates 중복 제거 및 정렬
-        learned_dates = list(set(learned_dates))
-        learned_dates.sort(reverse=True)  # 최신 날짜부터
+        # 최신 날짜부터 정렬
+        learned_dates = sorted(learned_dates, reverse=True)
         
         return {
             "terms": unique_terms,
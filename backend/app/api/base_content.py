@@ -8,6 +8,7 @@ from ..database import get_db
 from ..models import BaseContent
 from ..schemas import BaseContentCreate, BaseContentResponse
 from ..utils import get_utc_now
+from ..search_index import index_document, remove_document, invalidate_search_documents
 
 router = APIRouter()
 
@@ -86,7 +87,10 @@ def add_base_content(content_data: BaseContentCreate, db: Session = Depends(get_
             created_at=get_utc_now()
         )
         db.add(db_content)
+        db.flush()
+        index_document(db, 'base_content', db_content)
         db.commit()
+        invalidate_search_documents('base_content', db_content.id)
         db.refresh(db_content)
         logger.info(f"Base content added successfully: {db_content.id}")
         return db_content
@@ -109,8 +113,10 @@ def update_base_content(content_id: int, content_data: BaseContentCreate, db: Se
         content.title = content_data.title
         content.content = content_data.content
         content.category = content_data.category
+        index_document(db, 'base_content', content)
         
         db.commit()
+        invalidate_search_documents('base_content', content_id)
         db.refresh(content)
         logger.info(f"Base content updated successfully: {content_id}")
         return content
@@ -130,7 +136,9 @@ def delete_base_content(content_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Base content not found")
         
         db.delete(content)
+        remove_document(db, 'base_content', content_id)
         db.commit()
+        invalidate_search_documents('base_content', content_id)
         logger.info(f"Base content deleted successfully: {content_id}")
         return {"message": "Base content deleted successfully"}
     except HTTPException:
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, timedelta
 import json
 
 from ..database import get_db
 from ..models import ActivityLog, User
 from ..auth import get_current_active_user
-from ..log_utils import log_activity
+from ..log_utils import log_activity, log_pipeline
+from ..log_partitions import clear_activity_logs
+from ..log_stats import log_stats_counter
+from ..log_export import EXPORT_FORMATS, export_chunks, gzip_chunks
+from ..log_stream import LOG_STREAM_HEARTBEAT_SECONDS, format_event, log_hub, make_predicate
+from ..log_queries import COUNT_MODES, MATCH_MODES, count_logs, filter_logs, keyset_page, serialize_log
 from ..utils import get_utc_now
 
 router = APIRouter()
@@ -38,8 +43,16 @@ def create_log(
         )
         
         db.add(activity_log)
+        db.flush()
+        log_hub.announce(db, [activity_log])
         db.commit()
         db.refresh(activity_log)
+        log_hub.committed([activity_log])
+        log_stats_counter.record([{
+            'log_type': activity_log.log_type,
+            'log_level': activity_log.log_level,
+            'created_at': activity_log.created_at
+        }])
         
         return {"message": "Log created successfully", "log_id": activity_log.id}
     
@@ -57,10 +70,22 @@ def get_logs(
     action: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    direction: str = "next",
+    pagination: str = "offset",
+    count: Optional[str] = None,
+    match: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """활동 로그 목록을 조회합니다. (관리자만)"""
+    """활동 로그 목록을 조회합니다. (관리자만)
+
+    pagination=cursor(또는 cursor 지정)면 (created_at, id) 키셋 페이지를 반환하고 next_cursor/prev_cursor로
+    다음(더 오래된)/이전(더 최신) 페이지를 조회합니다. 이때 total은 count=estimate|exact를 줄 때만 계산합니다.
+    cursor 없이 skip/limit만 주면 기존처럼 OFFSET 페이지와 정확한 total을 반환합니다.
+    username/action 검색은 match(contains|prefix|exact)를 주지 않으면 트라이그램 색인이 있을 때 부분 일치,
+    없으면 색인을 타는 접두어 일치로 찾습니다.
+    """
     
     try:
         print(f"🔍 로그 조회 요청 시작")
@@ -94,58 +119,46 @@ def get_logs(
                 detail=f"Internal error during log access: {str(e)}"
             )
     
-    query = db.query(ActivityLog)
-    
-    # 필터링
-    if log_type:
-        query = query.filter(ActivityLog.log_type == log_type)
-    if log_level:
-        query = query.filter(ActivityLog.log_level == log_level)
-    if username:
-        query = query.filter(ActivityLog.username.ilike(f"%{username}%"))
-    if action:
-        query = query.filter(ActivityLog.action.ilike(f"%{action}%"))
+    filters = {
+        "log_type": log_type,
+        "log_level": log_level,
+        "username": username,
+        "action": action,
+        "start_date": start_date,
+        "end_date": end_date,
+        "match": match
+    }
+    if count is not None and count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of {', '.join(COUNT_MODES)}")
+    if match is not None and match not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match must be one of {', '.join(MATCH_MODES)}")
     
-    # 날짜 범위 필터링
-    if start_date:
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(ActivityLog.created_at >= start_dt)
-        except ValueError:
-            pass
+    query = filter_logs(db.query(ActivityLog), **filters)
     
-    if end_date:
+    # 커서를 주거나 pagination=cursor면 키셋 페이지, 아니면 기존 skip/limit 페이지
+    use_cursor = cursor is not None or pagination == "cursor"
+    next_cursor = prev_cursor = None
+    if use_cursor:
         try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-            query = query.filter(ActivityLog.created_at < end_dt)
-        except ValueError:
-            pass
+            logs, next_cursor, prev_cursor = keyset_page(query, limit, cursor, direction)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        total_count, estimated = count_logs(db, query, filters, count or "none")
+    else:
+        logs = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).offset(skip).limit(limit).all()
+        total_count, estimated = count_logs(db, query, filters, count or "exact")
     
-    # 정렬 및 페이징
-    logs = query.order_by(ActivityLog.created_at.desc()).offset(skip).limit(limit).all()
-    total_count = query.count()
-    
-    # 응답 데이터 구성
-    logs_data = []
-    for log in logs:
-        logs_data.append({
-            "id": str(log.id),
-            "timestamp": log.created_at.isoformat(),
-            "type": log.log_type,
-            "level": log.log_level,
-            "user": log.username,
-            "action": log.action,
-            "details": log.details,
-            "ip": log.ip_address,
-            "user_agent": log.user_agent
-        })
-    
-    return {
-        "logs": logs_data,
+    result = {
+        "logs": [serialize_log(log) for log in logs],
         "total": total_count,
-        "skip": skip,
+        "total_is_estimate": estimated,
         "limit": limit
     }
+    if use_cursor:
+        result.update(next_cursor=next_cursor, prev_cursor=prev_cursor)
+    else:
+        result["skip"] = skip
+    return result
 
 @router.get("/test")
 def test_logs_api():
@@ -224,39 +237,133 @@ def get_log_stats(
             detail="Not enough permissions"
         )
     
-    # 전체 로그 수
-    total_logs = db.query(ActivityLog).count()
+    # 집계 쿼리 한 번으로 만든 스냅샷에 이후 기록된 로그를 더한 값 (LOG_STATS_CACHE_TTL_SECONDS마다 다시 집계)
+    return log_stats_counter.get(db)
+
+@router.get("/stream")
+async def stream_logs(
+    request: Request,
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """새 활동 로그를 Server-Sent Events로 실시간 전달합니다. (관리자만)
+
+    조건(타입/레벨 일치, 사용자명/액션 부분 일치)은 서버에서 적용하며, 연결된 동안 DB를 조회하지 않습니다.
+    """
     
-    # 레벨별 통계
-    error_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'error').count()
-    warning_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'warning').count()
-    info_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'info').count()
-    success_logs = db.query(ActivityLog).filter(ActivityLog.log_level == 'success').count()
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    # 인증에 쓴 DB 연결을 스트림이 끝날 때까지 잡고 있지 않도록 바로 반환
+    db.close()
     
-    # 타입별 통계
-    user_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'user').count()
-    system_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'system').count()
-    security_logs = db.query(ActivityLog).filter(ActivityLog.log_type == 'security').count()
+    subscription = log_hub.subscribe(make_predicate(log_type, log_level, username, action))
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many log stream subscribers")
     
-    # 오늘 로그 수
-    today = get_utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
-    today_logs = db.query(ActivityLog).filter(ActivityLog.created_at >= today).count()
+    async def events():
+        reported = 0
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                batch = await subscription.next_batch(LOG_STREAM_HEARTBEAT_SECONDS)
+                if subscription.dropped > reported:
+                    # 대기열이 넘쳐 버린 로그 수를 알려 목록을 다시 불러오게 함
+                    yield f"event: dropped\ndata: {subscription.dropped - reported}\n\n"
+                    reported = subscription.dropped
+                if not batch:
+                    yield ": keepalive\n\n"
+                for log_id, data in batch:
+                    yield format_event(log_id, data)
+        finally:
+            subscription.close()
     
-    return {
-        "total_logs": total_logs,
-        "today_logs": today_logs,
-        "by_level": {
-            "error": error_logs,
-            "warning": warning_logs,
-            "info": info_logs,
-            "success": success_logs
-        },
-        "by_type": {
-            "user": user_logs,
-            "system": system_logs,
-            "security": security_logs
-        }
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+@router.get("/export")
+def export_logs(
+    format: str = "ndjson",
+    gzip: bool = False,
+    log_type: Optional[str] = None,
+    log_level: Optional[str] = None,
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    match: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """조건에 맞는 활동 로그를 NDJSON 또는 CSV 파일로 스트리밍합니다. (관리자만, gzip=true면 압축)
+
+    조건은 GET /api/logs/와 같고, 오래된 로그부터 서버 측 커서로 나눠 읽어 바로 전송합니다.
+    """
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if match is not None and match not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match must be one of {', '.join(MATCH_MODES)}")
+    
+    filters = {
+        "log_type": log_type,
+        "log_level": log_level,
+        "username": username,
+        "action": action,
+        "start_date": start_date,
+        "end_date": end_date,
+        "match": match
     }
+    conditions = ", ".join(f"{key}={value}" for key, value in filters.items() if value)
+    log_activity(
+        db=db,
+        action="로그 내보내기",
+        details=f"형식: {format}{' (gzip)' if gzip else ''}, 조건: {conditions or '없음'}",
+        log_type="system",
+        log_level="info",
+        user_id=current_user.id,
+        username=current_user.username
+    )
+    
+    # 내보내기는 전용 세션에서 읽으므로 요청 세션은 바로 반환
+    bind = db.get_bind()
+    db.close()
+    
+    chunks = export_chunks(bind, filters, format)
+    filename = f"activity_logs_{get_utc_now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    media_type = EXPORT_FORMATS[format]
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    })
+
+@router.get("/pipeline")
+def get_log_pipeline_stats(current_user: User = Depends(get_current_active_user)):
+    """활동 로그 파이프라인 상태(큐 길이, 기록/버림/실패 건수)를 조회합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return {**log_pipeline.stats(), "stream": log_hub.stats()}
 
 @router.delete("/")
 def clear_logs(
@@ -272,8 +379,8 @@ def clear_logs(
         )
     
     try:
-        deleted_count = db.query(ActivityLog).delete()
-        db.commit()
+        # 파티션 테이블이면 행 삭제 대신 TRUNCATE
+        deleted_count = clear_activity_logs(db)
         
         # 로그 삭제 기록
         clear_log = ActivityLog(
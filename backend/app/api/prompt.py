@@ -9,6 +9,7 @@ from ..database import get_db
 from ..models import Prompt
 from ..schemas import PromptCreate, PromptResponse
 from ..utils import get_utc_now
+from ..search_index import index_document, remove_document, invalidate_search_documents
 
 router = APIRouter()
 
@@ -105,6 +106,8 @@ def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
         # 데이터베이스에 추가
         try:
             db.add(db_prompt)
+            db.flush()
+            index_document(db, 'prompt', db_prompt)
             logger.info("Added prompt to session")
         except Exception as add_error:
             logger.error(f"Error adding prompt to session: {add_error}")
@@ -114,6 +117,7 @@ def add_prompt(prompt_data: PromptCreate, db: Session = Depends(get_db)):
         # 커밋
         try:
             db.commit()
+            invalidate_search_documents('prompt', db_prompt.id)
             logger.info("Committed to database")
         except Exception as commit_error:
             logger.error(f"Error committing to database: {commit_error}")
@@ -153,8 +157,10 @@ def update_prompt(prompt_id: int, prompt_data: PromptCreate, db: Session = Depen
         prompt.title = prompt_data.title
         prompt.content = prompt_data.content
         prompt.category = prompt_data.category
+        index_document(db, 'prompt', prompt)
         
         db.commit()
+        invalidate_search_documents('prompt', prompt_id)
         db.refresh(prompt)
         return prompt
     except HTTPException:
@@ -172,7 +178,9 @@ def delete_prompt(prompt_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Prompt not found")
         
         db.delete(prompt)
+        remove_document(db, 'prompt', prompt_id)
         db.commit()
+        invalidate_search_documents('prompt', prompt_id)
         return {"message": "Prompt deleted successfully"}
     except HTTPException:
         raise
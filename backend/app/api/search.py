@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+import os
+
+from ..database import get_db
+from ..search_index import DOC_TYPES, search
+
+router = APIRouter()
+
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+
+@router.get("/")
+def search_content(q: str, type: Optional[str] = None, page: int = 1, size: int = 20, db: Session = Depends(get_db)):
+    """AI 정보, 프롬프트, 기반 내용, 용어를 검색합니다. (점수 순, 페이지 단위)"""
+    if type is not None and type not in DOC_TYPES:
+        raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(DOC_TYPES)}")
+    if page < 1 or not 1 <= size <= SEARCH_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page must be >= 1 and size between 1 and {SEARCH_MAX_PAGE_SIZE}")
+
+    total, results = search(db, q, type, offset=(page - 1) * size, limit=size)
+    return {
+        "query": q,
+        "type": type,
+        "page": page,
+        "size": size,
+        "total": total,
+        "results": results
+    }
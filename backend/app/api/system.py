@@ -9,6 +9,13 @@ import os
 
 from ..database import get_db
 from ..models import User, AIInfo, UserProgress, ActivityLog, BackupHistory, Quiz, Prompt, BaseContent, Term
+from ..models import LearnedInfoEvent, LearnedTermEvent, QuizAttempt, SessionStatsCounter, UserAchievement, AIInfoTerm, QuizBundle, SearchDocument, AIInfoSignature
+from ..term_index import backfill_term_index, invalidate_term_index, term_index_cache
+from ..quiz_bundles import invalidate_quiz_bundles
+from .ai_info import dates_cache
+from ..search_index import invalidate_search_documents, rebuild_search_index
+from ..near_duplicates import invalidate_near_duplicates, reindex_all as reindex_near_duplicates
+from ..log_stats import log_stats_counter
 from ..auth import get_current_active_user
 from ..log_utils import log_activity
 from ..utils import get_utc_now
@@ -33,7 +40,7 @@ async def create_backup(
     try:
         # 기본적으로 모든 테이블 백업
         if not include_tables:
-            include_tables = ['users', 'ai_info', 'user_progress', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term']
+            include_tables = ['users', 'ai_info', 'user_progress', 'learned_info_events', 'learned_term_events', 'quiz_attempts', 'activity_logs', 'quiz', 'prompt', 'base_content', 'term']
         
         backup_data = {
             "backup_info": {
@@ -51,6 +58,10 @@ async def create_backup(
             'users': User,
             'ai_info': AIInfo,
             'user_progress': UserProgress,
+            'learned_info_events': LearnedInfoEvent,
+            'learned_term_events': LearnedTermEvent,
+            'quiz_attempts': QuizAttempt,
+            'user_achievements': UserAchievement,
             'activity_logs': ActivityLog,
             'quiz': Quiz,
             'prompt': Prompt,
@@ -159,6 +170,10 @@ async def restore_backup(
                 'users': User,
                 'ai_info': AIInfo,
                 'user_progress': UserProgress,
+                'learned_info_events': LearnedInfoEvent,
+                'learned_term_events': LearnedTermEvent,
+                'quiz_attempts': QuizAttempt,
+                'user_achievements': UserAchievement,
                 'activity_logs': ActivityLog,
                 'quiz': Quiz,
                 'prompt': Prompt,
@@ -200,6 +215,9 @@ async def restore_backup(
                     
                     restored_tables.append(table_name)
             
+            # 학습 통계 카운터는 복원된 이벤트로부터 다시 계산되도록 초기화
+            db.query(SessionStatsCounter).delete()
+            
             # 사용자 테이블 특별 처리 (현재 사용자 보존)
             if 'users' in data:
                 db.query(User).delete()
@@ -224,6 +242,21 @@ async def restore_backup(
             
             db.commit()
             
+            # 용어 색인과 퀴즈 묶음은 복원된 AI 정보로부터 다시 생성
+            if 'ai_info' in restored_tables:
+                db.query(QuizBundle).delete()
+                backfill_term_index(db)
+                invalidate_quiz_bundles()
+                dates_cache.invalidate("all")
+                reindex_near_duplicates(db)
+            
+            # 검색 색인은 복원된 검색 대상 테이블로부터 다시 생성
+            if set(restored_tables) & {'ai_info', 'prompt', 'base_content', 'term'}:
+                rebuild_search_index(db)
+            
+            if 'activity_logs' in restored_tables:
+                log_stats_counter.invalidate()
+            
             # 복원 완료 로그 기록
             log_activity(
                 db=db,
@@ -343,6 +376,24 @@ def get_system_info(
         } if latest_backup else None
     }
 
+@router.get("/cache-stats")
+def get_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """응답 캐시의 적중/실패/제거 통계를 조회합니다. (관리자만)"""
+    
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    from ..progress_stats import stats_cache
+    
+    return {
+        "caches": [stats_cache.stats(), term_index_cache.stats(), dates_cache.stats()]
+    }
+
 @router.delete("/clear-all-data")
 def clear_all_data(
     confirm: bool = False,
@@ -374,12 +425,21 @@ def clear_all_data(
         # 모든 테이블 데이터 삭제
         db.query(ActivityLog).delete()
         db.query(UserProgress).delete()
+        db.query(LearnedInfoEvent).delete()
+        db.query(LearnedTermEvent).delete()
+        db.query(QuizAttempt).delete()
+        db.query(SessionStatsCounter).delete()
+        db.query(UserAchievement).delete()
         db.query(BackupHistory).delete()
         db.query(AIInfo).delete()
+        db.query(AIInfoTerm).delete()
+        db.query(AIInfoSignature).delete()
+        db.query(QuizBundle).delete()
         db.query(Quiz).delete()
         db.query(Prompt).delete()
         db.query(BaseContent).delete()
         db.query(Term).delete()
+        db.query(SearchDocument).delete()
         db.query(User).delete()
         
         # 관리자 계정 복원
@@ -387,6 +447,13 @@ def clear_all_data(
         db.add(admin_user)
         db.commit()
         db.refresh(admin_user)
+        invalidate_term_index()
+        term_index_cache.clear()
+        invalidate_quiz_bundles()
+        dates_cache.invalidate("all")
+        invalidate_search_documents()
+        invalidate_near_duplicates()
+        log_stats_counter.invalidate()
         
         # 데이터 삭제 로그 기록
         log_activity(
@@ -2,67 +2,53 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 import json
+import os
 
 from ..database import get_db
 from ..models import UserProgress
-from ..schemas import UserProgressCreate, UserProgressResponse
+from ..schemas import UserProgressCreate, UserProgressResponse, LearningEventBatch, LearningEventBatchResponse
 from ..log_utils import log_activity
 from ..utils import get_kst_date, get_utc_now
+from ..progress_stats import compute_session_stats, cached_session_payload, invalidate_session_stats
+from ..progress_store import load_session_events, load_stored_stats
+from ..achievements import EVENT_METRICS, evaluate_achievements, merge_achievements, unlocked_achievements
+from ..learning_calendar import LearningCalendar
+from ..stats_counters import counters_to_stats, read_counters, track_learned_info, track_learned_term, track_quiz_attempt
 
 router = APIRouter()
 
+# 기간별 통계 조회 시 허용하는 최대 일수
+PERIOD_STATS_MAX_DAYS = int(os.getenv("PERIOD_STATS_MAX_DAYS", "366"))
+
+# 배치 학습 이벤트 요청 한 번에 허용하는 최대 이벤트 수
+BATCH_MAX_EVENTS = int(os.getenv("BATCH_MAX_EVENTS", "500"))
+
 @router.get("/{session_id}", response_model=Dict[str, Any])
 def get_user_progress(session_id: str, db: Session = Depends(get_db)):
-    progress = db.query(UserProgress).filter(UserProgress.session_id == session_id).all()
-    result = {}
-    
-    # AI 정보 학습 기록
-    for p in progress:
-        if p.learned_info and not p.date.startswith('__'):
-            result[p.date] = json.loads(p.learned_info)
-    
-    # 통계 정보 추가
-    stats_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == '__stats__'
-    ).first()
-    
-    if stats_progress and stats_progress.stats:
-        try:
-            stats = json.loads(stats_progress.stats)
-            result.update(stats)
-        except json.JSONDecodeError:
-            pass
+    def build():
+        events = load_session_events(db, session_id)
+        
+        # AI 정보 학습 기록
+        result = {date: list(indices) for date, indices in events.learned_info.items()}
+        
+        # 통계 정보 추가 (증분 카운터가 저장된 통계보다 우선)
+        if events.stored_stats:
+            result.update(events.stored_stats)
+        result.update(counters_to_stats(read_counters(db, session_id, events)))
+        result['achievements'] = merge_achievements(unlocked_achievements(db, session_id), events.stored_stats)
+        
+        return result
     
-    return result
+    return cached_session_payload('progress', session_id, build)
 
 @router.post("/{session_id}/{date}/{info_index}")
 def update_user_progress(session_id: str, date: str, info_index: int, request: Request, db: Session = Depends(get_db)):
     """사용자의 학습 진행상황을 업데이트하고 통계를 계산합니다."""
-    progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id, 
-        UserProgress.date == date
-    ).first()
-    
-    if progress:
-        learned = json.loads(progress.learned_info) if progress.learned_info else []
-        if info_index not in learned:
-            learned.append(info_index)
-            progress.learned_info = json.dumps(learned)
-    else:
-        learned = [info_index]
-        progress = UserProgress(
-            session_id=session_id, 
-            date=date, 
-            learned_info=json.dumps(learned), 
-            stats=None
-        )
-        db.add(progress)
-    
+    # 학습 기록과 통계 카운터를 같은 트랜잭션에서 갱신
+    track_learned_info(db, session_id, date, info_index)
+    new_achievements = evaluate_achievements(db, session_id, EVENT_METRICS['info'])
     db.commit()
-    
-    # 통계 업데이트
-    update_user_statistics(session_id, db)
+    invalidate_session_stats(session_id)
     
     # 학습 활동 로그 기록
     log_activity(
@@ -76,7 +62,7 @@ def update_user_progress(session_id: str, date: str, info_index: int, request: R
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Progress updated successfully", "achievement_gained": True}
+    return {"message": "Progress updated successfully", "achievement_gained": True, "new_achievements": new_achievements}
 
 @router.post("/term-progress/{session_id}")
 def update_term_progress(session_id: str, term_data: dict, request: Request, db: Session = Depends(get_db)):
@@ -85,30 +71,11 @@ def update_term_progress(session_id: str, term_data: dict, request: Request, db:
     date = term_data.get('date', '')
     info_index = term_data.get('info_index', 0)
     
-    # 용어 학습 기록 저장
-    term_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == f'__terms__{date}_{info_index}'
-    ).first()
-    
-    if not term_progress:
-        term_progress = UserProgress(
-            session_id=session_id,
-            date=f'__terms__{date}_{info_index}',
-            learned_info=json.dumps([term]),
-            stats=None
-        )
-        db.add(term_progress)
-    else:
-        learned_terms = json.loads(term_progress.learned_info) if term_progress.learned_info else []
-        if term not in learned_terms:
-            learned_terms.append(term)
-            term_progress.learned_info = json.dumps(learned_terms)
-    
+    # 용어 학습 기록과 통계 카운터를 같은 트랜잭션에서 갱신
+    track_learned_term(db, session_id, date, info_index, term)
+    new_achievements = evaluate_achievements(db, session_id, EVENT_METRICS['term'])
     db.commit()
-    
-    # 통계 업데이트
-    update_user_statistics(session_id, db)
+    invalidate_session_stats(session_id)
     
     # 용어 학습 활동 로그 기록
     log_activity(
@@ -122,258 +89,144 @@ def update_term_progress(session_id: str, term_data: dict, request: Request, db:
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Term progress updated successfully", "achievement_gained": True}
+    return {"message": "Term progress updated successfully", "achievement_gained": True, "new_achievements": new_achievements}
 
-def update_user_statistics(session_id: str, db: Session):
-    """사용자의 통계를 계산하고 업데이트합니다."""
-    # AI 정보 학습 기록 가져오기
-    ai_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
-    ).all()
-    
-    # 용어 학습 기록 가져오기
-    terms_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
-    ).all()
-    
-    total_learned = 0
-    total_terms_learned = 0
-    learned_dates = []
-    
-    # AI 정보 학습 통계
-    for p in ai_progress:
-        if p.learned_info:
-            try:
-                learned_data = json.loads(p.learned_info)
-                total_learned += len(learned_data)
-                learned_dates.append(p.date)
-            except json.JSONDecodeError:
-                continue
-    
-    # 용어 학습 통계
-    for p in terms_progress:
-        if p.learned_info:
-            try:
-                learned_data = json.loads(p.learned_info)
-                total_terms_learned += len(learned_data)
-            except json.JSONDecodeError:
-                continue
+def _validate_learning_event(event, today: str):
+    """배치 이벤트를 검사하고 (날짜, 오류 메시지)를 반환합니다."""
+    from datetime import datetime
+    
+    if event.type not in ('info', 'term', 'quiz'):
+        return None, f"Unknown event type: {event.type}"
+    if not event.session_id:
+        return None, "session_id is required"
+    
+    date = event.date or (today if event.type == 'quiz' else None)
+    if not date:
+        return None, "date is required"
+    try:
+        datetime.strptime(date, '%Y-%m-%d')
+    except ValueError:
+        return None, "Invalid date format. Use YYYY-MM-DD"
+    
+    if event.type in ('info', 'term') and (event.info_index is None or event.info_index < 0):
+        return None, "info_index is required"
+    if event.type == 'term' and not event.term:
+        return None, "term is required"
+    if event.type == 'quiz' and (event.score is None or event.score < 0):
+        return None, "score is required"
+    if event.type == 'quiz':
+        error = _quiz_totals_error(event.score, event.total_questions if event.total_questions is not None else 1)
+        if error:
+            return None, error
+    return date, None
+
+def _quiz_totals_error(score, total_questions):
+    """퀴즈 문항 수와 맞힌 수(score)가 올바른지 검사하고 오류 메시지를 반환합니다. (단건/배치 공통)"""
+    if total_questions < 0:
+        return "total_questions must not be negative"
+    if score > total_questions:
+        return "score must not exceed total_questions"
+    return None
+
+@router.post("/batch", response_model=LearningEventBatchResponse)
+def ingest_learning_events(batch: LearningEventBatch, request: Request, db: Session = Depends(get_db)):
+    """오프라인/대기 중이던 학습 이벤트(AI 정보, 용어, 퀴즈)를 한 트랜잭션으로 반영합니다."""
+    if len(batch.events) > BATCH_MAX_EVENTS:
+        raise HTTPException(status_code=413, detail=f"Too many events. Maximum is {BATCH_MAX_EVENTS} per batch")
     
-    # 연속 학습일 계산
-    streak_days = 0
-    last_learned_date = None
+    today = get_kst_date()
+    results = []
+    summary = {}  # session_id -> {'info': n, 'term': n, 'quiz': n}
     
-    if learned_dates:
-        # 날짜 정렬
-        learned_dates.sort()
-        last_learned_date = learned_dates[-1]
-        
-        # 연속 학습일 계산
-        current_date = last_learned_date
-        streak_count = 0
+    try:
+        for index, event in enumerate(batch.events):
+            result = {"index": index, "type": event.type, "session_id": event.session_id, "status": "applied", "detail": None}
+            results.append(result)
+            
+            date, error = _validate_learning_event(event, today)
+            if error:
+                result.update(status="error", detail=error)
+                continue
+            
+            # 세션 카운터는 첫 이벤트에서 한 번만 불러오고 이후에는 증분 갱신
+            if event.type == 'info':
+                inserted = track_learned_info(db, event.session_id, date, event.info_index)
+            elif event.type == 'term':
+                inserted = track_learned_term(db, event.session_id, date, event.info_index, event.term)
+            else:
+                total_questions = event.total_questions if event.total_questions is not None else 1
+                quiz_score = int((event.score / total_questions) * 100) if total_questions > 0 else 0
+                track_quiz_attempt(db, event.session_id, date, event.score, total_questions, quiz_score)
+                inserted = True
+            
+            if not inserted:
+                result["status"] = "duplicate"
+                continue
+            counts = summary.setdefault(event.session_id, {'info': 0, 'term': 0, 'quiz': 0})
+            counts[event.type] += 1
         
-        while current_date in learned_dates:
-            streak_count += 1
-            # 이전 날짜 계산
-            from datetime import datetime, timedelta
-            current_dt = datetime.strptime(current_date, '%Y-%m-%d')
-            current_dt = current_dt - timedelta(days=1)
-            current_date = current_dt.strftime('%Y-%m-%d')
+        # 성취는 세션마다 이번 배치에서 바뀐 지표만 한 번 평가
+        new_achievements = {}
+        for session_id, counts in summary.items():
+            metrics = [metric for kind, count in counts.items() if count for metric in EVENT_METRICS[kind]]
+            new_achievements[session_id] = evaluate_achievements(db, session_id, metrics)
         
-        streak_days = streak_count
-    
-    # 기존 통계 가져오기
-    stats_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == '__stats__'
-    ).first()
+        # 활동 로그는 세션당 한 건씩 같은 트랜잭션에 포함
+        for session_id, counts in summary.items():
+            log_activity(
+                db=db,
+                action="학습 기록 일괄 반영",
+                details=f"AI 정보 {counts['info']}건, 용어 {counts['term']}건, 퀴즈 {counts['quiz']}건을 일괄 반영했습니다.",
+                log_type="user",
+                log_level="info",
+                username=session_id,
+                session_id=session_id,
+                ip_address=request.client.host if request.client else None,
+                commit=False
+            )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to apply learning events: {str(e)}")
+    
+    for session_id in summary:
+        invalidate_session_stats(session_id)
     
-    current_stats = {}
-    if stats_progress and stats_progress.stats:
-        try:
-            current_stats = json.loads(stats_progress.stats)
-        except json.JSONDecodeError:
-            current_stats = {}
-    
-    # 새로운 통계 (용어 학습 포함)
-    new_stats = {
-        'total_learned': total_learned,
-        'total_terms_learned': total_terms_learned,
-        'total_terms_available': total_terms_learned,  # 프론트엔드 호환성
-        'streak_days': streak_days,
-        'max_streak': current_stats.get('max_streak', streak_days),  # 최대 연속일
-        'last_learned_date': last_learned_date,
-        'quiz_score': current_stats.get('quiz_score', 0),
-        'achievements': current_stats.get('achievements', [])
+    return {
+        "results": results,
+        "applied": sum(1 for result in results if result["status"] == "applied"),
+        "duplicates": sum(1 for result in results if result["status"] == "duplicate"),
+        "errors": sum(1 for result in results if result["status"] == "error"),
+        "sessions": list(summary),
+        "new_achievements": new_achievements
     }
-    
-    # 통계 저장
-    if stats_progress:
-        stats_progress.stats = json.dumps(new_stats)
-    else:
-        stats_progress = UserProgress(
-            session_id=session_id,
-            date='__stats__',
-            learned_info=None,
-            stats=json.dumps(new_stats)
-        )
-        db.add(stats_progress)
-    
-    db.commit()
 
 @router.get("/stats/{session_id}")
 def get_user_stats_legacy(session_id: str, db: Session = Depends(get_db)):
     """레거시 통계 엔드포인트 (하위 호환성을 위해 유지)"""
-    progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id, 
-        UserProgress.date == '__stats__'
-    ).first()
-    
-    # 오늘 날짜
-    today = get_kst_date()
-    
-    # 오늘 학습 데이터 가져오기
-    today_ai_info = 0
-    today_terms = 0
-    today_quiz_score = 0
-    today_quiz_correct = 0
-    today_quiz_total = 0
-    
-    # 오늘 AI 정보 학습 수
-    today_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == today
-    ).first()
-    
-    if today_progress and today_progress.learned_info:
-        try:
-            today_ai_info = len(json.loads(today_progress.learned_info))
-        except json.JSONDecodeError:
-            today_ai_info = 0
-    
-    # 오늘 용어 학습 수
-    today_terms_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__terms__{today}%')
-    ).all()
-    
-    for term_progress in today_terms_progress:
-        if term_progress.learned_info:
-            try:
-                today_terms += len(json.loads(term_progress.learned_info))
-            except json.JSONDecodeError:
-                continue
-    
-    # 오늘 퀴즈 점수 누적 계산
-    today_quiz_correct = 0
-    today_quiz_total = 0
-    today_quiz_score = 0
-    
-    # 오늘 날짜의 모든 퀴즈 기록 가져오기
-    today_quiz_progress_list = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).all()
-    
-    for quiz_progress in today_quiz_progress_list:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                today_quiz_correct += quiz_data.get('correct', 0)
-                today_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    # 오늘 누적 퀴즈 점수 계산
-    today_quiz_score = int((today_quiz_correct / today_quiz_total) * 100) if today_quiz_total > 0 else 0
-    
-    # 전체 누적 퀴즈 통계 계산
-    total_quiz_correct = 0
-    total_quiz_questions = 0
-    
-    # 모든 퀴즈 기록 가져오기
-    all_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__quiz__%')
-    ).all()
-    
-    for quiz_progress in all_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                total_quiz_correct += quiz_data.get('correct', 0)
-                total_quiz_questions += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    # 전체 누적 퀴즈 점수 계산
-    cumulative_quiz_score = int((total_quiz_correct / total_quiz_questions) * 100) if total_quiz_questions > 0 else 0
-    
-    # 총 AI 정보 수 계산 (모든 날짜의 AI 정보 수)
-    total_ai_info_available = 0
-    all_ai_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
-    ).all()
-    
-    for p in all_ai_progress:
-        if p.learned_info:
-            try:
-                learned_data = json.loads(p.learned_info)
-                total_ai_info_available += len(learned_data)
-            except json.JSONDecodeError:
-                continue
-    
-    # 총 용어 수 계산 (모든 날짜의 용어 수)
-    total_terms_available = 0
-    all_terms_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
-    ).all()
-    
-    for p in all_terms_progress:
-        if p.learned_info:
-            try:
-                learned_data = json.loads(p.learned_info)
-                total_terms_available += len(learned_data)
-            except json.JSONDecodeError:
-                continue
-    
-    if progress and progress.stats:
-        stats = json.loads(progress.stats)
-        stats.update({
-            'today_ai_info': today_ai_info,
-            'today_terms': today_terms,
-            'today_quiz_score': today_quiz_score,
-            'today_quiz_correct': today_quiz_correct,
-            'today_quiz_total': today_quiz_total,
-            'total_ai_info_available': total_ai_info_available,
-            'total_terms_available': total_terms_available,
-            'cumulative_quiz_score': cumulative_quiz_score,
-            'total_quiz_correct': total_quiz_correct,
-            'total_quiz_questions': total_quiz_questions
-        })
+    def build():
+        computed = compute_session_stats(db, session_id)
+        
+        extra = {
+            'today_ai_info': computed['today_ai_info'],
+            'today_terms': computed['today_terms_total'],
+            'today_quiz_score': computed['today_quiz_score'],
+            'today_quiz_correct': computed['today_quiz_correct'],
+            'today_quiz_total': computed['today_quiz_total'],
+            'total_ai_info_available': computed['total_learned'],
+            'total_terms_available': computed['total_terms_available'],
+            'cumulative_quiz_score': computed['cumulative_quiz_score'],
+            'total_quiz_correct': computed['total_quiz_correct'],
+            'total_quiz_questions': computed['total_quiz_questions']
+        }
+        
+        stats = dict(computed['stored_stats']) if computed['stored_stats'] is not None else {}
+        stats.update(counters_to_stats(read_counters(db, session_id)))
+        stats['achievements'] = merge_achievements(unlocked_achievements(db, session_id), computed['stored_stats'])
+        stats.update(extra)
         return stats
     
-    return {
-        'total_learned': 0,
-        'streak_days': 0,
-        'last_learned_date': None,
-        'quiz_score': 0,
-        'achievements': [],
-        'today_ai_info': today_ai_info,
-        'today_terms': today_terms,
-        'today_quiz_score': today_quiz_score,
-        'today_quiz_correct': today_quiz_correct,
-        'today_quiz_total': today_quiz_total,
-        'total_ai_info_available': total_ai_info_available,
-        'total_terms_available': total_terms_available,
-        'cumulative_quiz_score': cumulative_quiz_score,
-        'total_quiz_correct': total_quiz_correct,
-        'total_quiz_questions': total_quiz_questions
-    }
+    return cached_session_payload('stats_legacy', session_id, build)
 
 @router.post("/stats/{session_id}")
 def update_user_stats(session_id: str, stats: Dict[str, Any], db: Session = Depends(get_db)):
@@ -394,6 +247,7 @@ def update_user_stats(session_id: str, stats: Dict[str, Any], db: Session = Depe
         db.add(progress)
     
     db.commit()
+    invalidate_session_stats(session_id)
     return {"message": "Stats updated successfully"}
 
 @router.post("/quiz-score/{session_id}")
@@ -401,6 +255,9 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
     """퀴즈 점수를 업데이트합니다."""
     score = score_data.get('score', 0)
     total_questions = score_data.get('total_questions', 1)
+    error = _quiz_totals_error(score, total_questions)
+    if error:
+        raise HTTPException(status_code=422, detail=error)
     
     # 점수 계산 (백분율)
     quiz_score = int((score / total_questions) * 100) if total_questions > 0 else 0
@@ -408,75 +265,12 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
     # 오늘 날짜
     today = get_kst_date()
     
-    # 오늘 퀴즈 세션 번호 찾기
-    existing_quiz_sessions = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).count()
-    
-    session_number = existing_quiz_sessions + 1
-    
-    # 오늘 퀴즈 상세 정보 저장 (세션 번호 포함)
-    today_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == f'__quiz__{today}_{session_number}'
-    ).first()
-    
-    quiz_detail = {
-        'correct': score,
-        'total': total_questions,
-        'score': quiz_score
-    }
-    
-    if today_quiz_progress:
-        today_quiz_progress.stats = json.dumps(quiz_detail)
-    else:
-        today_quiz_progress = UserProgress(
-            session_id=session_id,
-            date=f'__quiz__{today}_{session_number}',
-            learned_info=None,
-            stats=json.dumps(quiz_detail)
-        )
-        db.add(today_quiz_progress)
-    
-    # 기존 통계 가져오기
-    stats_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == '__stats__'
-    ).first()
-    
-    current_stats = {}
-    if stats_progress and stats_progress.stats:
-        try:
-            current_stats = json.loads(stats_progress.stats)
-        except json.JSONDecodeError:
-            current_stats = {}
-    
-    # 새로운 통계 (퀴즈 점수 업데이트)
-    new_stats = {
-        'total_learned': current_stats.get('total_learned', 0),
-        'streak_days': current_stats.get('streak_days', 0),
-        'last_learned_date': current_stats.get('last_learned_date'),
-        'quiz_score': quiz_score,
-        'achievements': current_stats.get('achievements', [])
-    }
-    
-    # 통계 저장
-    if stats_progress:
-        stats_progress.stats = json.dumps(new_stats)
-    else:
-        stats_progress = UserProgress(
-            session_id=session_id,
-            date='__stats__',
-            learned_info=None,
-            stats=json.dumps(new_stats)
-        )
-        db.add(stats_progress)
-    
+    # 오늘 퀴즈 응시 기록과 통계 카운터를 같은 트랜잭션에서 갱신
+    # 성취는 바뀐 지표(퀴즈 점수) 규칙만 같은 트랜잭션에서 평가
+    track_quiz_attempt(db, session_id, today, score, total_questions, quiz_score)
+    new_achievements = evaluate_achievements(db, session_id, EVENT_METRICS['quiz'])
     db.commit()
-    
-    # 성취 확인
-    check_achievements(session_id, db)
+    invalidate_session_stats(session_id)
     
     # 퀴즈 완료 활동 로그 기록
     log_activity(
@@ -490,86 +284,22 @@ def update_quiz_score(session_id: str, score_data: dict, request: Request, db: S
         ip_address=request.client.host if request.client else None
     )
     
-    return {"message": "Quiz score updated successfully", "quiz_score": quiz_score}
+    return {"message": "Quiz score updated successfully", "quiz_score": quiz_score, "new_achievements": new_achievements}
 
 @router.get("/achievements/{session_id}")
 def check_achievements(session_id: str, db: Session = Depends(get_db)):
     """사용자의 성취를 확인하고 업데이트합니다."""
-    stats = get_user_stats(session_id, db)
-    achievements = stats.get('achievements', [])
-    new_achievements = []
-    
-    # AI 정보 학습 성취
-    if stats['total_learned'] >= 1 and 'first_learn' not in achievements:
-        new_achievements.append('first_learn')
-        achievements.append('first_learn')
-    
-    if stats['total_learned'] >= 3 and 'beginner' not in achievements:
-        new_achievements.append('beginner')
-        achievements.append('beginner')
-    
-    if stats['total_learned'] >= 5 and 'learner' not in achievements:
-        new_achievements.append('learner')
-        achievements.append('learner')
-    
-    if stats['total_learned'] >= 10 and 'first_10' not in achievements:
-        new_achievements.append('first_10')
-        achievements.append('first_10')
-    
-    if stats['total_learned'] >= 20 and 'knowledge_seeker' not in achievements:
-        new_achievements.append('knowledge_seeker')
-        achievements.append('knowledge_seeker')
-    
-    if stats['total_learned'] >= 50 and 'first_50' not in achievements:
-        new_achievements.append('first_50')
-        achievements.append('first_50')
-    
-    # 용어 학습 성취
-    if stats.get('total_terms_learned', 0) >= 1 and 'first_term' not in achievements:
-        new_achievements.append('first_term')
-        achievements.append('first_term')
-    
-    if stats.get('total_terms_learned', 0) >= 5 and 'term_collector' not in achievements:
-        new_achievements.append('term_collector')
-        achievements.append('term_collector')
-    
-    if stats.get('total_terms_learned', 0) >= 10 and 'term_master' not in achievements:
-        new_achievements.append('term_master')
-        achievements.append('term_master')
-    
-    # 연속 학습 성취
-    if stats['streak_days'] >= 3 and 'three_day_streak' not in achievements:
-        new_achievements.append('three_day_streak')
-        achievements.append('three_day_streak')
-    
-    if stats['streak_days'] >= 7 and 'week_streak' not in achievements:
-        new_achievements.append('week_streak')
-        achievements.append('week_streak')
-    
-    if stats['streak_days'] >= 14 and 'two_week_streak' not in achievements:
-        new_achievements.append('two_week_streak')
-        achievements.append('two_week_streak')
-    
-    # 퀴즈 성취
-    if stats['quiz_score'] >= 60 and 'quiz_beginner' not in achievements:
-        new_achievements.append('quiz_beginner')
-        achievements.append('quiz_beginner')
-    
-    if stats['quiz_score'] >= 80 and 'quiz_master' not in achievements:
-        new_achievements.append('quiz_master')
-        achievements.append('quiz_master')
-    
-    if stats['quiz_score'] >= 100 and 'perfect_quiz' not in achievements:
-        new_achievements.append('perfect_quiz')
-        achievements.append('perfect_quiz')
-    
-    # 새로운 성취가 있으면 업데이트
-    if new_achievements:
-        stats['achievements'] = achievements
-        update_user_stats(session_id, stats, db)
+    # 모든 규칙을 평가하고, 아직 알리지 않은 성취(학습/퀴즈 요청에서 달성한 것 포함)를 새 성취로 반환
+    if evaluate_achievements(db, session_id):
+        invalidate_session_stats(session_id)
+    rows = unlocked_achievements(db, session_id)
+    new_achievements = merge_achievements([row for row in rows if not row.notified])
+    for row in rows:
+        row.notified = True
+    db.commit()
     
     return {
-        "current_achievements": achievements,
+        "current_achievements": merge_achievements(rows, load_stored_stats(db, session_id)),
         "new_achievements": new_achievements
     }
 
@@ -584,68 +314,43 @@ def get_period_stats(session_id: str, start_date: str, end_date: str, db: Sessio
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     
+    total_days = (end_dt - start_dt).days + 1
+    if total_days < 1:
+        raise HTTPException(status_code=400, detail="end_date must not be earlier than start_date")
+    if total_days > PERIOD_STATS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Period too long. Maximum is {PERIOD_STATS_MAX_DAYS} days")
+    
     # 기간 내 모든 날짜 생성
-    date_list = []
-    current_dt = start_dt
-    while current_dt <= end_dt:
-        date_list.append(current_dt.strftime('%Y-%m-%d'))
-        current_dt += timedelta(days=1)
+    date_list = [(start_dt + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(total_days)]
+    
+    # 기간 내 학습 이벤트를 한 번의 쿼리로 가져와 메모리에서 날짜별로 집계
+    events = load_session_events(db, session_id, start_date, end_date)
+    
+    terms_by_date = {}
+    for (term_date, _info_index), terms in events.learned_terms.items():
+        terms_by_date.setdefault(term_date, set()).update(terms)
+    
+    quiz_by_date = {}
+    for attempt in events.quiz_attempts:
+        totals = quiz_by_date.setdefault(attempt['date'], [0, 0])
+        totals[0] += attempt['correct']
+        totals[1] += attempt['total']
+    
+    # 기간 내 날짜별 학습 여부 (비트맵)
+    activity = LearningCalendar(date for date, indices in events.learned_info.items() if indices).activity_bitmap(start_date, end_date)
     
     period_data = []
     
-    for date in date_list:
+    for date, active in zip(date_list, activity):
         # AI 정보 학습 수 - 해당 날짜에 학습한 AI 정보 개수
-        ai_progress_list = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date == date,
-            UserProgress.info_index.isnot(None)  # AI 정보 학습 기록만
-        ).all()
-        
-        ai_count = len(ai_progress_list)  # 해당 날짜에 학습한 AI 정보 개수
-        
-        # 용어 학습 수 - 해당 날짜에 학습한 용어 개수
-        terms_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date.like(f'__terms__{date}%')
-        ).all()
+        ai_count = len(events.learned_info.get(date, []))
         
-        terms_count = 0
-        unique_terms = set()  # 중복 제거를 위한 set
-        
-        for term_progress in terms_progress:
-            if term_progress.learned_info:
-                try:
-                    terms = json.loads(term_progress.learned_info)
-                    if isinstance(terms, list):
-                        unique_terms.update(terms)  # 중복 제거
-                    elif isinstance(terms, dict) and 'terms' in terms:
-                        unique_terms.update(terms['terms'])  # term-progress 형식
-                except json.JSONDecodeError:
-                    continue
-        
-        terms_count = len(unique_terms)
+        # 용어 학습 수 - 해당 날짜에 학습한 용어 개수 (중복 제거)
+        terms_count = len(terms_by_date.get(date, ()))
         
         # 퀴즈 점수
-        quiz_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date.like(f'__quiz__{date}%')
-        ).all()
-        
-        quiz_score = 0
-        quiz_correct = 0
-        quiz_total = 0
-        
-        for quiz_progress in quiz_progress:
-            if quiz_progress.stats:
-                try:
-                    quiz_data = json.loads(quiz_progress.stats)
-                    quiz_correct += quiz_data.get('correct', 0)
-                    quiz_total += quiz_data.get('total', 0)
-                except json.JSONDecodeError:
-                    continue
-        
-        if quiz_total > 0:
-            quiz_score = int((quiz_correct / quiz_total) * 100)
+        quiz_correct, quiz_total = quiz_by_date.get(date, (0, 0))
+        quiz_score = int((quiz_correct / quiz_total) * 100) if quiz_total > 0 else 0
         
         period_data.append({
             'date': date,
@@ -653,167 +358,36 @@ def get_period_stats(session_id: str, start_date: str, end_date: str, db: Sessio
             'terms': terms_count,
             'quiz_score': quiz_score,
             'quiz_correct': quiz_correct,
-            'quiz_total': quiz_total
+            'quiz_total': quiz_total,
+            'learned': bool(active)
         })
     
     return {
         'period_data': period_data,
         'start_date': start_date,
         'end_date': end_date,
-        'total_days': len(period_data)
+        'total_days': len(period_data),
+        'active_days': sum(activity)
     }
 
 @router.get("/stats/{session_id}")
 def get_user_stats(session_id: str, db: Session = Depends(get_db)):
     """사용자 통계 정보를 조회합니다 (대시보드용)"""
-    from datetime import datetime, timedelta
-    
-    # KST 함수는 utils 모듈에서 가져오거나 기본 datetime 사용
-    try:
-        from ..utils import get_kst_date, get_kst_now
-    except ImportError:
-        # utils 모듈이 없을 경우 기본 datetime 사용
-        # 이미 utils에서 import한 함수 사용
-    
-    today = get_kst_date()
-    
-    # 오늘 AI 정보 학습 수
-    today_ai_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date == today
-    ).first()
-    
-    today_ai_info = 0
-    if today_ai_progress and today_ai_progress.learned_info:
-        try:
-            today_ai_info = len(json.loads(today_ai_progress.learned_info))
-        except json.JSONDecodeError:
-            pass
-    
-    # 오늘 용어 학습 수
-    today_terms_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__terms__{today}%')
-    ).all()
-    
-    today_terms = 0
-    unique_terms = set()
-    for term_progress in today_terms_progress:
-        if term_progress.learned_info:
-            try:
-                terms = json.loads(term_progress.learned_info)
-                unique_terms.update(terms)
-            except json.JSONDecodeError:
-                continue
-    today_terms = len(unique_terms)
-    
-    # 오늘 퀴즈 점수
-    today_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like(f'__quiz__{today}%')
-    ).all()
-    
-    today_quiz_score = 0
-    today_quiz_correct = 0
-    today_quiz_total = 0
-    
-    for quiz_progress in today_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                today_quiz_correct += quiz_data.get('correct', 0)
-                today_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    if today_quiz_total > 0:
-        today_quiz_score = int((today_quiz_correct / today_quiz_total) * 100)
-    
-    # 총 학습량 계산
-    all_ai_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        ~UserProgress.date.like('__%')
-    ).all()
-    
-    total_learned = 0
-    for progress in all_ai_progress:
-        if progress.learned_info:
-            try:
-                total_learned += len(json.loads(progress.learned_info))
-            except json.JSONDecodeError:
-                continue
-    
-    # 총 용어 학습량
-    all_terms_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__terms__%')
-    ).all()
-    
-    total_terms_learned = 0
-    all_unique_terms = set()
-    for term_progress in all_terms_progress:
-        if term_progress.learned_info:
-            try:
-                terms = json.loads(term_progress.learned_info)
-                all_unique_terms.update(terms)
-            except json.JSONDecodeError:
-                continue
-    total_terms_learned = len(all_unique_terms)
-    
-    # 누적 퀴즈 점수
-    all_quiz_progress = db.query(UserProgress).filter(
-        UserProgress.session_id == session_id,
-        UserProgress.date.like('__quiz__%')
-    ).all()
-    
-    cumulative_quiz_correct = 0
-    cumulative_quiz_total = 0
-    
-    for quiz_progress in all_quiz_progress:
-        if quiz_progress.stats:
-            try:
-                quiz_data = json.loads(quiz_progress.stats)
-                cumulative_quiz_correct += quiz_data.get('correct', 0)
-                cumulative_quiz_total += quiz_data.get('total', 0)
-            except json.JSONDecodeError:
-                continue
-    
-    cumulative_quiz_score = 0
-    if cumulative_quiz_total > 0:
-        cumulative_quiz_score = int((cumulative_quiz_correct / cumulative_quiz_total) * 100)
-    
-    # 연속 학습일 계산 (간단한 구현)
-    streak_days = 0
-    current_date = datetime.now()
-    for i in range(30):  # 최근 30일 확인
-        check_date = (current_date - timedelta(days=i)).strftime('%Y-%m-%d')
-        day_progress = db.query(UserProgress).filter(
-            UserProgress.session_id == session_id,
-            UserProgress.date == check_date
-        ).first()
+    def build():
+        computed = compute_session_stats(db, session_id)
         
-        if day_progress and day_progress.learned_info:
-            try:
-                learned = json.loads(day_progress.learned_info)
-                if learned:  # 해당 날짜에 학습이 있으면
-                    streak_days += 1
-                else:
-                    break  # 학습이 없으면 연속 기록 중단
-            except json.JSONDecodeError:
-                break
-        else:
-            break
-    
-    return {
-        "today_ai_info": today_ai_info,
-        "today_terms": today_terms,
-        "today_quiz_score": today_quiz_score,
-        "today_quiz_correct": today_quiz_correct,
-        "today_quiz_total": today_quiz_total,
-        "total_learned": total_learned,
-        "total_terms_learned": total_terms_learned,
-        "cumulative_quiz_score": cumulative_quiz_score,
-        "cumulative_quiz_correct": cumulative_quiz_correct,
-        "cumulative_quiz_total": cumulative_quiz_total,
-        "streak_days": streak_days
-    } 
\ No newline at end of file
+        return {
+            "today_ai_info": computed['today_ai_info'],
+            "today_terms": computed['today_terms'],
+            "today_quiz_score": computed['today_quiz_score'],
+            "today_quiz_correct": computed['today_quiz_correct'],
+            "today_quiz_total": computed['today_quiz_total'],
+            "total_learned": computed['total_learned'],
+            "total_terms_learned": computed['total_terms_learned'],
+            "cumulative_quiz_score": computed['cumulative_quiz_score'],
+            "cumulative_quiz_correct": computed['total_quiz_correct'],
+            "cumulative_quiz_total": computed['total_quiz_questions'],
+            "streak_days": computed['streak_days']
+        }
+    
+    return cached_session_payload('stats', session_id, build)
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+import copy
+import json
+import os
+import threading
+import time
+
+# redis가 없을 경우를 대비한 fallback (다중 워커 배포에서만 필요)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+class MemoryCacheBackend:
+    """프로세스 내 LRU + TTL 캐시"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """(찾음 여부, 값)을 반환합니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return False, None
+            self._entries.move_to_end(key)
+        return True, copy.deepcopy(value)
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        return {
+            "backend": "memory",
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+class RedisCacheBackend:
+    """여러 워커가 공유하는 Redis 캐시 (만료와 제거는 Redis가 관리)"""
+
+    def __init__(self, url: str, prefix: str = "aimh:"):
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    def set(self, key, value, ttl: float):
+        self._client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), px=max(int(ttl * 1000), 1))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def info(self):
+        return {"backend": "redis", "prefix": self.prefix}
+
+def create_backend(max_entries: int = 1024):
+    """환경 변수(CACHE_BACKEND, REDIS_URL)에 따라 캐시 백엔드를 생성합니다."""
+    if os.getenv("CACHE_BACKEND", "memory") == "redis":
+        redis_url = os.getenv("REDIS_URL")
+        if REDIS_AVAILABLE and redis_url:
+            return RedisCacheBackend(redis_url)
+        print("⚠️ Redis 캐시를 사용할 수 없어 메모리 캐시를 사용합니다.")
+    return MemoryCacheBackend(max_entries)
+
+class ResponseCache:
+    """계산된 응답을 키 단위로 캐시하고 적중/실패 횟수를 집계합니다."""
+
+    def __init__(self, name: str, ttl: float, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend or MemoryCacheBackend()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # 여러 요청 스레드가 함께 갱신하는 적중/실패 횟수 보호
+
+    def _key(self, key):
+        return f"{self.name}:{key}"
+
+    def _count(self, hits: int = 0, misses: int = 0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get_or_compute(self, key, compute):
+        """캐시된 값을 반환하고, 없으면 compute()로 계산해 저장합니다."""
+        if self.ttl <= 0:
+            return compute()
+        found, value = self.backend.get(self._key(key))
+        if found:
+            self._count(hits=1)
+            return value
+        self._count(misses=1)
+        value = compute()
+        self.backend.set(self._key(key), value, self.ttl)
+        return value
+
+    def get_many_or_compute(self, keys, compute_missing):
+        """여러 키를 한 번에 조회하고, 없는 키들은 compute_missing(없는 키 목록) -> {키: 값}으로 한꺼번에 계산합니다."""
+        if self.ttl <= 0:
+            return compute_missing(list(keys)) if keys else {}
+        result = {}
+        missing = []
+        for key in keys:
+            found, value = self.backend.get(self._key(key))
+            if found:
+                result[key] = value
+            else:
+                missing.append(key)
+        self._count(hits=len(result), misses=len(missing))
+        if missing:
+            for key, value in compute_missing(missing).items():
+                self.backend.set(self._key(key), value, self.ttl)
+                result[key] = value
+        return result
+
+    def invalidate(self, *keys):
+        self.backend.delete(*[self._key(key) for key in keys])
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "name": self.name,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self.backend.info()
+        }
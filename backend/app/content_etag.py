@@ -0,0 +1,40 @@
+from sqlalchemy.orm import Session
+import hashlib
+import json
+import os
+
+from .models import AIInfo
+
+# 날짜별 AI 정보 응답 캐시 헤더 설정
+AI_INFO_CACHE_CONTROL = os.getenv("AI_INFO_CACHE_CONTROL", "public, max-age=60, must-revalidate")
+
+def content_hash(infos) -> str:
+    """AI 정보 응답 내용(infos 목록)의 해시"""
+    payload = json.dumps(infos, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+def format_etag(hash_value: str) -> str:
+    return f'"{hash_value}"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더(여러 값, 약한 ETag, *)가 ETag와 일치하는지 확인합니다."""
+    if not if_none_match or not etag:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def lookup_etag(db: Session, date: str):
+    """날짜의 현재 ETag를 반환합니다. 없으면 None
+
+    다른 워커에서 내용이 바뀌어도 오래된 304를 보내지 않도록 프로세스 내에 캐시하지 않고,
+    요청마다 date 색인으로 content_hash 컬럼 하나만 읽습니다.
+    """
+    hash_value = db.query(AIInfo.content_hash).filter(AIInfo.date == date).scalar()
+    return format_etag(hash_value) if hash_value else None
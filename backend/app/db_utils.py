@@ -0,0 +1,39 @@
+from sqlalchemy import func, insert, cast, Date
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+
+def dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+def insert_ignore_statement(db: Session, model, values, conflict_columns):
+    """고유 키 충돌 시 아무것도 하지 않는 단일 INSERT 문을 만듭니다. (PostgreSQL/SQLite)
+
+    지원하지 않는 DB에서는 None을 반환하므로 호출자가 조회 후 삽입으로 대체해야 합니다.
+    """
+    name = dialect_name(db)
+    if name == 'postgresql':
+        return postgresql.insert(model).values(**values).on_conflict_do_nothing(index_elements=conflict_columns)
+    if name == 'sqlite':
+        return sqlite.insert(model).values(**values).on_conflict_do_nothing(index_elements=conflict_columns)
+    return None
+
+def insert_ignore(db: Session, model, values, conflict_columns, exists=None) -> bool:
+    """`INSERT ... ON CONFLICT DO NOTHING`을 실행하고 실제로 삽입되었는지 반환합니다. (커밋은 호출자 책임)
+
+    `exists`는 ON CONFLICT를 지원하지 않는 DB에서 쓸 존재 여부 조회 함수입니다.
+    """
+    statement = insert_ignore_statement(db, model, values, conflict_columns)
+    if statement is None:
+        if exists is not None and exists():
+            return False
+        statement = insert(model).values(**values)
+    return db.execute(statement).rowcount == 1
+
+def day_difference(db: Session, later, earlier):
+    """두 'YYYY-MM-DD' 문자열 컬럼/값의 일수 차이를 계산하는 SQL 식. 지원하지 않는 DB면 None"""
+    name = dialect_name(db)
+    if name == 'postgresql':
+        return cast(later, Date) - cast(earlier, Date)
+    if name == 'sqlite':
+        return func.julianday(later) - func.julianday(earlier)
+    return None
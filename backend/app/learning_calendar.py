@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+
+def to_ordinal(value: str) -> int:
+    """'YYYY-MM-DD' 문자열을 날짜 서수(정수)로 변환합니다."""
+    return date.fromisoformat(value).toordinal()
+
+def from_ordinal(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+def live_streak(run: int, last_learned_date: str, today: str) -> int:
+    """마지막 학습일에서 끝나는 연속 구간이 오늘 기준으로 유효한 길이를 반환합니다.
+
+    오늘 또는 어제까지 학습했다면 연속 학습이 이어지는 것으로 봅니다. (오늘은 아직 끝나지 않았음)
+    """
+    if not run or not last_learned_date:
+        return 0
+    return run if to_ordinal(today) - to_ordinal(last_learned_date) <= 1 else 0
+
+class LearningCalendar:
+    """학습한 날짜 집합을 비트셋(파이썬 정수)으로 표현합니다.
+
+    날짜는 생성 시 한 번만 서수로 변환하고, 비트 i는 `origin + i` 일의 학습 여부입니다.
+    연속 구간 계산은 날짜 단위 반복 대신 정수 비트 연산으로 처리합니다.
+    """
+
+    def __init__(self, dates=()):
+        ordinals = set()
+        for value in dates:
+            try:
+                ordinals.add(to_ordinal(value))
+            except ValueError:
+                continue  # 형식이 잘못된 레거시 날짜는 연속 학습 계산에서 제외
+        self.origin = min(ordinals) if ordinals else 0
+        self.last = max(ordinals) if ordinals else None
+        # 바이트 배열에 비트를 모은 뒤 한 번에 정수로 변환 (날짜마다 큰 정수를 새로 만들지 않음)
+        buffer = bytearray((self.last - self.origin) // 8 + 1 if ordinals else 0)
+        for ordinal in ordinals:
+            position = ordinal - self.origin
+            buffer[position >> 3] |= 1 << (position & 7)
+        self.bits = int.from_bytes(buffer, 'little')
+        self.active_days = len(ordinals)
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def is_active(self, value: str) -> bool:
+        position = to_ordinal(value) - self.origin
+        return position >= 0 and bool(self.bits >> position & 1)
+
+    def run_ending_at(self, ordinal: int) -> int:
+        """지정한 날짜에서 끝나는 연속 학습 일수"""
+        position = ordinal - self.origin
+        if position < 0 or not self.bits >> position & 1:
+            return 0
+        # position 이하에서 가장 높은 0 비트의 위치를 찾아 구간 길이를 구함
+        window = (1 << (position + 1)) - 1
+        gaps = ~self.bits & window
+        return position + 1 - gaps.bit_length()
+
+    def last_run(self) -> int:
+        """마지막 학습일에서 끝나는 연속 학습 일수"""
+        return self.run_ending_at(self.last) if self.last is not None else 0
+
+    def current_streak(self, today: str) -> int:
+        """오늘 기준 연속 학습 일수 (`live_streak`과 같은 기준)"""
+        if self.last is None:
+            return 0
+        return live_streak(self.last_run(), from_ordinal(self.last), today)
+
+    def max_streak(self) -> int:
+        """가장 긴 연속 학습 일수"""
+        if not self.bits:
+            return 0
+        return max(len(run) for run in bin(self.bits)[2:].split('0'))
+
+    def activity_bitmap(self, start: str, end: str):
+        """start~end 기간의 날짜별 학습 여부 목록 (0/1)"""
+        start_ordinal = to_ordinal(start)
+        length = to_ordinal(end) - start_ordinal + 1
+        if length <= 0:
+            return []
+        offset = start_ordinal - self.origin
+        window = self.bits >> offset if offset >= 0 else self.bits << -offset
+        window &= (1 << length) - 1
+        # bin()은 높은 비트부터 출력하므로 뒤집어 날짜 순서로 맞춤
+        return [int(bit) for bit in reversed(format(window, f'0{length}b'))]
+
+def day_offset(value: str, days: int) -> str:
+    return (date.fromisoformat(value) + timedelta(days=days)).isoformat()
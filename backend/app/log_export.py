@@ -0,0 +1,75 @@
+from sqlalchemy.orm import Session
+import csv
+import io
+import json
+import os
+import zlib
+
+from .log_queries import filter_logs, serialize_log
+from .models import ActivityLog
+
+# 서버 측 커서에서 한 번에 가져올 행 수이자 응답 조각 하나에 담는 행 수
+LOG_EXPORT_BATCH_SIZE = int(os.getenv("LOG_EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+EXPORT_FIELDS = ["id", "timestamp", "type", "level", "user", "user_id", "session_id", "action", "details", "ip", "user_agent"]
+
+_COLUMNS = (
+    ActivityLog.id, ActivityLog.created_at, ActivityLog.log_type, ActivityLog.log_level, ActivityLog.username,
+    ActivityLog.user_id, ActivityLog.session_id, ActivityLog.action, ActivityLog.details,
+    ActivityLog.ip_address, ActivityLog.user_agent
+)
+
+def export_entry(row):
+    return {**serialize_log(row), "user_id": row.user_id, "session_id": row.session_id}
+
+def _rows(db: Session, filters: dict, batch_size: int):
+    query = filter_logs(db.query(*_COLUMNS), **filters)
+    # yield_per는 PostgreSQL(psycopg2)에서 서버 측 커서를 사용해 결과를 batch_size행씩 받아옴
+    return query.order_by(ActivityLog.created_at, ActivityLog.id).yield_per(batch_size)
+
+def export_chunks(bind, filters: dict, format: str = "ndjson", batch_size: int = None):
+    """조건에 맞는 로그를 오래된 순으로 NDJSON 또는 CSV 문자열 조각으로 내보냅니다.
+
+    전용 세션에서 batch_size행씩 읽어 조각마다 바로 내보내므로 메모리 사용량은 전체 행 수와 무관합니다.
+    CSV는 엑셀에서 한글이 깨지지 않도록 BOM으로 시작합니다.
+    """
+    batch_size = batch_size or LOG_EXPORT_BATCH_SIZE
+    db = Session(bind=bind)
+    try:
+        buffer = io.StringIO()
+        writer = None
+        if format == "csv":
+            buffer.write('\ufeff')
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+        pending = 0
+        for row in _rows(db, filters, batch_size):
+            entry = export_entry(row)
+            if writer is not None:
+                writer.writerow(entry)
+            else:
+                buffer.write(json.dumps(entry, ensure_ascii=False))
+                buffer.write('\n')
+            pending += 1
+            if pending >= batch_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+def gzip_chunks(chunks, level: int = 6):
+    """문자열 조각들을 UTF-8로 인코딩해 gzip 스트림 조각으로 압축합니다."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
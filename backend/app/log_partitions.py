@@ -0,0 +1,259 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timezone
+import os
+import re
+import threading
+
+from .db_utils import dialect_name
+from .log_stats import log_stats_counter
+from .models import ActivityLog
+from .utils import get_utc_now
+
+# 활동 로그 보관 기간(개월, 기본 0은 삭제하지 않음)과 미리 만들어 둘 월별 파티션 수
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "0"))
+LOG_PARTITION_PREMAKE_MONTHS = int(os.getenv("LOG_PARTITION_PREMAKE_MONTHS", "2"))
+# 파티션이 아닌 테이블(SQLite 등)이나 기본 파티션에서 오래된 로그를 지울 때 한 번에 지우는 행 수
+LOG_RETENTION_DELETE_BATCH = int(os.getenv("LOG_RETENTION_DELETE_BATCH", "5000"))
+
+PARENT_TABLE = "activity_logs"
+DEFAULT_PARTITION = "activity_logs_default"
+_PARTITION_NAME = re.compile(r'^activity_logs_y(\d{4})m(\d{2})$')
+
+def add_months(month: date, months: int) -> date:
+    """월 첫날에 months개월을 더한 월의 첫날"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+def partition_name(month: date) -> str:
+    return f"activity_logs_y{month.year:04d}m{month.month:02d}"
+
+def parse_partition_name(name: str):
+    """파티션 이름의 월 첫날 (월별 파티션이 아니면 None)"""
+    match = _PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+def retention_cutoff(today: date, months: int = None) -> date:
+    """이 날짜(월 첫날) 이전의 로그는 보관 기간이 지난 것으로 봅니다. 보관 기간이 0이면 None"""
+    months = LOG_RETENTION_MONTHS if months is None else months
+    if months <= 0:
+        return None
+    return add_months(month_start(today), -months)
+
+def create_partition_statement(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+def move_default_rows_statements(month: date):
+    """기본 파티션에 들어가 있던 month의 행을 새 월 파티션으로 옮기며 파티션을 만드는 SQL 목록 (한 트랜잭션에서 실행)
+
+    기본 파티션에 범위가 겹치는 행이 있으면 PostgreSQL이 파티션 생성을 거부하므로, 행을 임시 테이블로 빼고
+    파티션을 만든 뒤 부모 테이블로 다시 넣습니다. (다시 넣은 행은 새 파티션으로 들어감)
+    """
+    staging = f"{partition_name(month)}_staging"
+    bounds = f"created_at >= '{month.isoformat()}' AND created_at < '{add_months(month, 1).isoformat()}'"
+    return [
+        f"CREATE TEMP TABLE {staging} (LIKE {DEFAULT_PARTITION}) ON COMMIT DROP",
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {bounds} RETURNING *) INSERT INTO {staging} SELECT * FROM moved",
+        create_partition_statement(month),
+        f"INSERT INTO {PARENT_TABLE} SELECT * FROM {staging}",
+    ]
+
+def is_partitioned(db: Session) -> bool:
+    """activity_logs가 PostgreSQL 범위 파티션 테이블인지 확인합니다."""
+    if dialect_name(db) != 'postgresql':
+        return False
+    kind = db.execute(text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+                      {'name': PARENT_TABLE}).scalar()
+    return kind == 'p'
+
+def list_partitions(db: Session):
+    """월별 파티션 목록 [(월 첫날, 이름)] (오래된 순)"""
+    rows = db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = :name
+    """), {'name': PARENT_TABLE}).scalars()
+    partitions = [(parse_partition_name(name), name) for name in rows]
+    return sorted(partition for partition in partitions if partition[0] is not None)
+
+def default_partition_exists(db: Session) -> bool:
+    return db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {'name': DEFAULT_PARTITION}).scalar()
+
+def ensure_partitions(db: Session, today: date = None, ahead: int = None):
+    """이번 달부터 ahead개월 뒤까지의 월별 파티션을 만듭니다. 만든(이미 있던 것 포함) 파티션 이름 목록
+
+    파티션이 없던 달의 로그가 이미 기본 파티션에 들어가 있으면 경고를 남기고 새 파티션으로 옮깁니다.
+    """
+    today = today or get_utc_now().date()
+    ahead = LOG_PARTITION_PREMAKE_MONTHS if ahead is None else ahead
+    existing = {month for month, _ in list_partitions(db)}
+    has_default = default_partition_exists(db)
+    names = []
+    for offset in range(ahead + 1):
+        month = add_months(month_start(today), offset)
+        if month not in existing and has_default:
+            stranded = db.execute(text(
+                f"SELECT COUNT(*) FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end"
+            ), {'start': month.isoformat(), 'end': add_months(month, 1).isoformat()}).scalar()
+            if stranded:
+                print(f"⚠️ 기본 파티션의 로그 {stranded}건을 새 파티션 {partition_name(month)}(으)로 옮깁니다.")
+                for statement in move_default_rows_statements(month):
+                    db.execute(text(statement))
+                names.append(partition_name(month))
+                continue
+        db.execute(text(create_partition_statement(month)))
+        names.append(partition_name(month))
+    db.commit()
+    return names
+
+def apply_retention(db: Session, today: date = None, months: int = None):
+    """보관 기간이 지난 로그를 정리합니다.
+
+    파티션 테이블이면 기간이 지난 월 파티션을 통째로 삭제하고 기본 파티션의 오래된 행을 지우며,
+    아니면(SQLite, 변환 전 테이블) 오래된 행을 LOG_RETENTION_DELETE_BATCH개씩 나눠 삭제합니다.
+    """
+    cutoff = retention_cutoff(today or get_utc_now().date(), months)
+    report = {'cutoff': cutoff.isoformat() if cutoff else None, 'dropped_partitions': [], 'deleted_rows': 0}
+    if cutoff is None:
+        return report
+
+    cutoff_dt = datetime(cutoff.year, cutoff.month, cutoff.day, tzinfo=timezone.utc)
+    if is_partitioned(db):
+        for month, name in list_partitions(db):
+            # 파티션의 마지막 날이 기준일 이전이면 전체가 보관 기간을 지난 것
+            if add_months(month, 1) <= cutoff:
+                db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                report['dropped_partitions'].append(name)
+        db.commit()
+        # 파티션이 없던 기간에 기본 파티션으로 들어간 오래된 로그는 행 단위로 나눠 삭제
+        if default_partition_exists(db):
+            while True:
+                deleted = db.execute(text(
+                    f"DELETE FROM {DEFAULT_PARTITION} WHERE ctid IN "
+                    f"(SELECT ctid FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff LIMIT :batch)"
+                ), {'cutoff': cutoff_dt, 'batch': LOG_RETENTION_DELETE_BATCH}).rowcount
+                db.commit()
+                if not deleted:
+                    break
+                report['deleted_rows'] += deleted
+        if report['dropped_partitions'] or report['deleted_rows']:
+            log_stats_counter.invalidate()
+        return report
+
+    while True:
+        ids = [log_id for (log_id,) in db.query(ActivityLog.id).filter(ActivityLog.created_at < cutoff_dt).limit(LOG_RETENTION_DELETE_BATCH)]
+        if not ids:
+            break
+        db.query(ActivityLog).filter(ActivityLog.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        report['deleted_rows'] += len(ids)
+    if report['deleted_rows']:
+        log_stats_counter.invalidate()
+    return report
+
+def run_log_maintenance(db: Session, today: date = None):
+    """파티션 테이블이면 앞으로 쓸 파티션을 만들고, 보관 기간이 지난 로그를 정리합니다."""
+    partitions = ensure_partitions(db, today) if is_partitioned(db) else []
+    return {'partitions': partitions, **apply_retention(db, today)}
+
+def clear_activity_logs(db: Session) -> int:
+    """모든 활동 로그를 삭제하고 삭제한 건수를 반환합니다. (파티션 테이블은 TRUNCATE)"""
+    if is_partitioned(db):
+        count = db.query(ActivityLog).count()
+        db.execute(text(f"TRUNCATE TABLE {PARENT_TABLE}"))
+        db.commit()
+        log_stats_counter.invalidate()
+        return count
+    count = db.query(ActivityLog).delete()
+    db.commit()
+    log_stats_counter.invalidate()
+    return count
+
+def conversion_statements(first_month: date, today: date, ahead: int = None):
+    """기존 activity_logs를 월별 범위 파티션 테이블로 바꾸는 SQL 목록 (한 트랜잭션에서 실행)
+
+    기존 테이블 이름을 바꾼 뒤 같은 컬럼의 파티션 부모 테이블을 만들고, 기존 행이 있는 달부터
+    ahead개월 뒤까지의 파티션과 기본 파티션을 만든 다음 행을 옮기고 기존 테이블을 삭제합니다.
+    id 시퀀스는 그대로 이어 씁니다.
+    """
+    ahead = LOG_PARTITION_PREMAKE_MONTHS if ahead is None else ahead
+    statements = [
+        f"LOCK TABLE {PARENT_TABLE} IN ACCESS EXCLUSIVE MODE",
+        f"ALTER TABLE {PARENT_TABLE} RENAME TO {PARENT_TABLE}_legacy",
+        f"ALTER TABLE {PARENT_TABLE}_legacy RENAME CONSTRAINT {PARENT_TABLE}_pkey TO {PARENT_TABLE}_legacy_pkey",
+        f"""CREATE TABLE {PARENT_TABLE} (
+            id INTEGER NOT NULL DEFAULT nextval('{PARENT_TABLE}_id_seq'),
+            user_id INTEGER,
+            username VARCHAR,
+            action VARCHAR NOT NULL,
+            details TEXT,
+            log_type VARCHAR,
+            log_level VARCHAR,
+            ip_address VARCHAR,
+            user_agent TEXT,
+            session_id VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)""",
+        f"ALTER SEQUENCE {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id",
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT",
+    ]
+    month = month_start(first_month)
+    last = add_months(month_start(today), ahead)
+    while month <= last:
+        statements.append(create_partition_statement(month))
+        month = add_months(month, 1)
+    statements += [
+        f"""INSERT INTO {PARENT_TABLE} (id, user_id, username, action, details, log_type, log_level, ip_address, user_agent, session_id, created_at)
+            SELECT id, user_id, username, action, details, log_type, log_level, ip_address, user_agent, session_id, COALESCE(created_at, now())
+            FROM {PARENT_TABLE}_legacy""",
+        f"DROP TABLE {PARENT_TABLE}_legacy",
+        f"CREATE INDEX IF NOT EXISTS ix_activity_logs_created_type_level ON {PARENT_TABLE} (created_at, log_type, log_level)",
+    ]
+    return statements
+
+def convert_to_partitioned(db: Session, today: date = None):
+    """PostgreSQL의 기존 activity_logs를 월별 파티션 테이블로 변환합니다. 이미 변환되어 있으면 아무것도 하지 않습니다."""
+    if dialect_name(db) != 'postgresql':
+        raise ValueError("Partitioning requires PostgreSQL")
+    if is_partitioned(db):
+        return False
+    today = today or get_utc_now().date()
+    oldest = db.execute(text(f"SELECT MIN(created_at) FROM {PARENT_TABLE}")).scalar()
+    try:
+        for statement in conversion_statements(month_start(oldest) if oldest else today, today):
+            db.execute(text(statement))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+def start_retention_worker(session_factory, interval_seconds: float):
+    """주기적으로 파티션 생성과 보관 기간 정리를 실행하는 백그라운드 스레드를 시작합니다. 중지용 Event를 반환합니다."""
+    stop_event = threading.Event()
+
+    def run():
+        while not stop_event.wait(interval_seconds):
+            db = session_factory()
+            try:
+                report = run_log_maintenance(db)
+                if report['dropped_partitions'] or report['deleted_rows']:
+                    print(f"🧹 활동 로그 정리: 파티션 {len(report['dropped_partitions'])}개, 행 {report['deleted_rows']}개 삭제")
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ 활동 로그 정리 실패: {str(e)}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=run, name="activity-log-retention", daemon=True)
+    thread.start()
+    return stop_event
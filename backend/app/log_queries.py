@@ -0,0 +1,238 @@
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+import base64
+import json
+import os
+
+from .cache import ResponseCache, create_backend
+from .db_utils import dialect_name
+from .models import ActivityLog
+
+# 필터별 로그 건수(근사치)를 캐시하는 시간 (정확한 COUNT는 전체 스캔이 필요해 페이지마다 계산하지 않음)
+LOG_COUNT_CACHE_TTL_SECONDS = float(os.getenv("LOG_COUNT_CACHE_TTL_SECONDS", "30"))
+
+count_cache = ResponseCache("activity-log-counts", LOG_COUNT_CACHE_TTL_SECONDS, create_backend(256))
+
+# 사용자명/액션 검색 방식 (auto: pg_trgm 색인이 있으면 부분 일치, 없으면 LOG_TEXT_MATCH_FALLBACK)
+# contains를 직접 지정하면 색인 없이 '%검색어%'로 전체를 훑는 기존 방식
+LOG_TEXT_MATCH = os.getenv("LOG_TEXT_MATCH", "auto")
+LOG_TEXT_MATCH_FALLBACK = os.getenv("LOG_TEXT_MATCH_FALLBACK", "prefix")
+
+COUNT_MODES = ("exact", "estimate", "none")
+MATCH_MODES = ("contains", "prefix", "exact")
+TEXT_COLUMNS = ("username", "action")
+
+_state = {'trigram': None}
+
+def text_index_statements(dialect: str, trigram: bool):
+    """사용자명/액션 검색용 색인 SQL 목록 (migrate_log_search.py에서 실행)
+
+    prefix/exact 검색은 lower(컬럼) 색인을, PostgreSQL에 pg_trgm이 있으면 부분 일치 검색은 GIN 트라이그램 색인을 씁니다.
+    """
+    statements = []
+    for column in TEXT_COLUMNS:
+        if dialect == 'postgresql':
+            # text_pattern_ops는 DB 콜레이션과 관계없이 LIKE 'abc%'를 색인 범위 검색으로 바꿀 수 있게 함
+            statements.append(f"CREATE INDEX IF NOT EXISTS ix_activity_logs_{column}_lower ON activity_logs (lower({column}) text_pattern_ops)")
+            if trigram:
+                statements.append(f"CREATE INDEX IF NOT EXISTS ix_activity_logs_{column}_trgm ON activity_logs USING GIN ({column} gin_trgm_ops)")
+        else:
+            statements.append(f"CREATE INDEX IF NOT EXISTS ix_activity_logs_{column}_lower ON activity_logs (lower({column}))")
+    return statements
+
+def ensure_text_indexes(db: Session) -> bool:
+    """검색용 색인을 만들고 트라이그램 색인을 만들었는지 반환합니다. (pg_trgm 확장을 설치할 권한이 없으면 lower 색인만)"""
+    dialect = dialect_name(db)
+    trigram = False
+    if dialect == 'postgresql':
+        try:
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            db.commit()
+            trigram = True
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ pg_trgm 확장을 사용할 수 없어 접두어 검색 색인만 만듭니다: {str(e)}")
+    for statement in text_index_statements(dialect, trigram):
+        db.execute(text(statement))
+    db.commit()
+    _state['trigram'] = None
+    return trigram
+
+def trigram_available(db: Session) -> bool:
+    """PostgreSQL이고 사용자명/액션 트라이그램 색인이 모두 있는지 (프로세스당 한 번 확인)"""
+    if _state['trigram'] is None:
+        names = [f"ix_activity_logs_{column}_trgm" for column in TEXT_COLUMNS]
+        _state['trigram'] = dialect_name(db) == 'postgresql' and db.execute(text(
+            "SELECT COUNT(*) FROM pg_indexes WHERE tablename = 'activity_logs' AND indexname = ANY(:names)"
+        ), {'names': names}).scalar() == len(names)
+    return _state['trigram']
+
+def resolve_match_mode(db: Session) -> str:
+    """LOG_TEXT_MATCH 설정과 DB의 트라이그램 지원 여부로 실제 검색 방식을 정합니다."""
+    if LOG_TEXT_MATCH in MATCH_MODES:
+        return LOG_TEXT_MATCH
+    if LOG_TEXT_MATCH == 'trigram' or trigram_available(db):
+        return 'contains'
+    return LOG_TEXT_MATCH_FALLBACK if LOG_TEXT_MATCH_FALLBACK in MATCH_MODES else 'prefix'
+
+def _escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def text_match(column, term: str, mode: str, dialect: str):
+    """검색 방식에 맞는 조건식을 만듭니다. (대소문자 구분 없음, 검색어의 %와 _는 문자 그대로)
+
+    contains는 ILIKE '%검색어%'(트라이그램 색인), prefix/exact는 lower(컬럼) 색인을 타는 조건입니다.
+    """
+    if mode == 'contains':
+        return column.ilike(f"%{_escape_like(term)}%", escape='\\')
+    lowered = term.lower()
+    if mode == 'exact':
+        return func.lower(column) == lowered
+    if dialect == 'postgresql':
+        return func.lower(column).like(f"{_escape_like(lowered)}%", escape='\\')
+    # SQLite 등은 LIKE가 식 색인을 쓰지 못하므로 접두어를 범위 조건으로 바꿈
+    upper = lowered[:-1] + chr(ord(lowered[-1]) + 1)
+    return and_(func.lower(column) >= lowered, func.lower(column) < upper)
+
+def filter_logs(query, log_type=None, log_level=None, username=None, action=None, start_date=None, end_date=None,
+                match: str = None):
+    """활동 로그 조회 조건을 적용합니다. (날짜는 'YYYY-MM-DD', 형식이 틀리면 무시)
+
+    사용자명/액션 검색 방식(match)을 주지 않으면 resolve_match_mode로 정합니다.
+    """
+    if log_type:
+        query = query.filter(ActivityLog.log_type == log_type)
+    if log_level:
+        query = query.filter(ActivityLog.log_level == log_level)
+    if username or action:
+        db = query.session
+        match = match or resolve_match_mode(db)
+        dialect = dialect_name(db)
+        if username:
+            query = query.filter(text_match(ActivityLog.username, username, match, dialect))
+        if action:
+            query = query.filter(text_match(ActivityLog.action, action, match, dialect))
+
+    if start_date:
+        try:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+            query = query.filter(ActivityLog.created_at >= start_dt)
+        except ValueError:
+            pass
+
+    if end_date:
+        try:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            query = query.filter(ActivityLog.created_at < end_dt)
+        except ValueError:
+            pass
+    return query
+
+def serialize_log(log):
+    """로그 한 건의 응답 형식 (ORM 객체나 RETURNING 행)"""
+    return {
+        "id": str(log.id),
+        "timestamp": log.created_at.isoformat() if log.created_at else None,
+        "type": log.log_type,
+        "level": log.log_level,
+        "user": log.username,
+        "action": log.action,
+        "details": log.details,
+        "ip": log.ip_address,
+        "user_agent": log.user_agent
+    }
+
+def encode_cursor(log) -> str:
+    """로그의 (created_at, id)를 불투명한 커서 문자열로 만듭니다."""
+    raw = json.dumps([log.created_at.isoformat(), log.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    """커서 문자열을 (created_at, id)로 되돌립니다. 잘못된 커서면 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(log_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def keyset_page(query, limit: int, cursor: str = None, direction: str = "next"):
+    """(created_at, id) 기준 최신순 키셋 페이지를 조회합니다. (로그 목록, 다음 커서, 이전 커서)
+
+    OFFSET 없이 커서 위치부터 인덱스를 따라 limit+1행만 읽으므로 깊은 페이지도 첫 페이지와 비용이 같습니다.
+    next는 커서보다 오래된 로그, prev는 커서보다 최신 로그를 가져옵니다.
+    """
+    if direction not in ("next", "prev"):
+        raise ValueError("direction must be 'next' or 'prev'")
+    newer = direction == "prev"
+    if cursor:
+        created_at, log_id = decode_cursor(cursor)
+        if newer:
+            query = query.filter(or_(ActivityLog.created_at > created_at,
+                                     and_(ActivityLog.created_at == created_at, ActivityLog.id > log_id)))
+        else:
+            query = query.filter(or_(ActivityLog.created_at < created_at,
+                                     and_(ActivityLog.created_at == created_at, ActivityLog.id < log_id)))
+    if newer:
+        query = query.order_by(ActivityLog.created_at.asc(), ActivityLog.id.asc())
+    else:
+        query = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+
+    logs = query.limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+    if newer:
+        logs.reverse()
+    if not logs:
+        return logs, None, None
+
+    # 커서를 지나 온 쪽에는 항상 로그가 있고, 진행 방향은 limit+1번째 행이 있을 때만 더 있음
+    more_older = has_more if not newer else bool(cursor)
+    more_newer = has_more if newer else bool(cursor)
+    next_cursor = encode_cursor(logs[-1]) if more_older else None
+    prev_cursor = encode_cursor(logs[0]) if more_newer else None
+    return logs, next_cursor, prev_cursor
+
+def _table_estimate(db: Session):
+    """플래너 통계(pg_class.reltuples)의 activity_logs 행 수. 파티션 테이블이면 파티션 합계, 통계가 없으면 None
+
+    아직 ANALYZE되지 않은 테이블/파티션은 reltuples가 -1이므로 0으로 보고, 모두 그렇다면 None을 반환합니다.
+    """
+    estimate = db.execute(text("""
+        SELECT SUM(GREATEST(reltuples, 0)), BOOL_AND(reltuples < 0)
+        FROM pg_class
+        WHERE relname = 'activity_logs' AND relkind = 'r'
+           OR oid IN (SELECT inhrelid FROM pg_inherits JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                      WHERE parent.relname = 'activity_logs')
+    """)).first()
+    total, unanalyzed = estimate
+    if total is None or unanalyzed:
+        return None
+    return int(total)
+
+def _plan_estimate(db: Session, query):
+    """EXPLAIN으로 얻은 조회 결과 행 수 추정치"""
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + compiled.string, compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def count_logs(db: Session, query, filters: dict, mode: str = "estimate"):
+    """조회 조건에 맞는 로그 건수와 근사치 여부를 반환합니다. (mode가 none이면 (None, False))
+
+    estimate는 PostgreSQL이면 플래너 통계(조건이 없으면 reltuples, 있으면 EXPLAIN 추정치)를 쓰고,
+    그 외 DB에서는 조건별로 LOG_COUNT_CACHE_TTL_SECONDS 동안 캐시한 COUNT를 씁니다.
+    """
+    if mode == "none":
+        return None, False
+    if mode == "exact":
+        return query.count(), False
+    if dialect_name(db) == 'postgresql':
+        active = {key: value for key, value in filters.items() if value}
+        estimate = _table_estimate(db) if not active else _plan_estimate(db, query)
+        if estimate is not None:
+            return estimate, True
+    key = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+    return count_cache.get_or_compute(key, query.count), True
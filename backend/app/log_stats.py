@@ -0,0 +1,104 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from datetime import timezone
+import os
+import threading
+import time
+
+from .models import ActivityLog
+from .utils import get_utc_now
+
+# 로그 통계를 DB에서 다시 집계하는 주기 (그 사이에는 이 프로세스가 기록한 로그만 더해서 반환)
+LOG_STATS_CACHE_TTL_SECONDS = float(os.getenv("LOG_STATS_CACHE_TTL_SECONDS", "60"))
+
+LOG_LEVELS = ('error', 'warning', 'info', 'success')
+LOG_TYPES = ('user', 'system', 'security')
+
+def empty_stats():
+    return {
+        "total_logs": 0,
+        "today_logs": 0,
+        "by_level": {level: 0 for level in LOG_LEVELS},
+        "by_type": {log_type: 0 for log_type in LOG_TYPES}
+    }
+
+def today_start(now=None):
+    return (now or get_utc_now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def aggregate_log_stats(db: Session, since) -> dict:
+    """전체/오늘/레벨별/타입별 로그 수를 COUNT(*) FILTER 집계 쿼리 한 번으로 계산합니다."""
+    columns = [func.count(), func.count().filter(ActivityLog.created_at >= since)]
+    columns += [func.count().filter(ActivityLog.log_level == level) for level in LOG_LEVELS]
+    columns += [func.count().filter(ActivityLog.log_type == log_type) for log_type in LOG_TYPES]
+    row = list(db.query(*columns).one())
+    stats = empty_stats()
+    stats["total_logs"], stats["today_logs"] = row[0], row[1]
+    stats["by_level"] = dict(zip(LOG_LEVELS, row[2:2 + len(LOG_LEVELS)]))
+    stats["by_type"] = dict(zip(LOG_TYPES, row[2 + len(LOG_LEVELS):]))
+    return stats
+
+class LogStatsCounter:
+    """집계 결과 스냅샷에 그 이후 이 프로세스가 기록한 로그를 더해 두는 통계 카운터
+
+    로그 기록 경로가 record()로 알려주므로 조회 시에는 DB를 읽지 않습니다. 스냅샷은
+    LOG_STATS_CACHE_TTL_SECONDS마다(날짜가 바뀌거나 invalidate되면 즉시) 다시 집계해
+    다른 워커가 기록한 로그와 보관 기간 정리를 반영합니다.
+    """
+
+    def __init__(self, ttl: float = LOG_STATS_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = None
+        self._day = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self.refreshes = 0
+
+    def invalidate(self):
+        """다음 조회에서 다시 집계합니다. (로그 삭제/정리 후 호출)"""
+        with self._lock:
+            self._stats = None
+            self._generation += 1
+
+    def record(self, rows):
+        """기록된 로그들(log_type, log_level, created_at 키를 가진 dict)을 카운터에 더합니다."""
+        with self._lock:
+            stats = self._stats
+            if stats is None:
+                return
+            for row in rows:
+                stats["total_logs"] += 1
+                created_at = row.get('created_at')
+                if created_at is not None and created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                if created_at is None or created_at >= self._day:
+                    stats["today_logs"] += 1
+                if row.get('log_level') in stats["by_level"]:
+                    stats["by_level"][row['log_level']] += 1
+                if row.get('log_type') in stats["by_type"]:
+                    stats["by_type"][row['log_type']] += 1
+
+    def get(self, db: Session, now=None) -> dict:
+        """현재 통계를 반환합니다. 스냅샷이 없거나 만료되었으면 집계 쿼리로 새로 만듭니다."""
+        day = today_start(now)
+        with self._lock:
+            if self._stats is not None and self._day == day and time.monotonic() - self._loaded_at < self.ttl:
+                return _copy(self._stats)
+            generation = self._generation
+        # 집계 쿼리 동안 로그 기록 스레드를 막지 않도록 잠금 밖에서 실행
+        # (그 사이 기록된 로그는 빠지거나 두 번 셀 수 있지만 다음 집계에서 바로잡힘)
+        stats = aggregate_log_stats(db, day)
+        with self._lock:
+            if generation != self._generation:
+                # 집계하는 동안 로그가 삭제되었으면 이 결과는 저장하지 않음
+                return _copy(stats)
+            self._stats = stats
+            self._day = day
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            return _copy(stats)
+
+def _copy(stats):
+    return {**stats, "by_level": dict(stats["by_level"]), "by_type": dict(stats["by_type"])}
+
+log_stats_counter = LogStatsCounter()
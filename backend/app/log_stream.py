@@ -0,0 +1,236 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from collections import deque
+import asyncio
+import json
+import os
+import select
+import threading
+
+from .log_queries import serialize_log
+from .models import ActivityLog
+
+# 실시간 로그 전달 방식 (auto: PostgreSQL이면 LISTEN/NOTIFY로 모든 워커에 전달, memory: 기록한 워커의 구독자에게만)
+LOG_STREAM_BACKEND = os.getenv("LOG_STREAM_BACKEND", "auto")
+# 구독자별 대기 로그 수 (느린 구독자는 오래된 로그부터 버림)
+LOG_STREAM_QUEUE_MAX = int(os.getenv("LOG_STREAM_QUEUE_MAX", "1000"))
+LOG_STREAM_MAX_SUBSCRIBERS = int(os.getenv("LOG_STREAM_MAX_SUBSCRIBERS", "100"))
+# 새 로그가 없을 때 연결 유지용 주석을 보내는 간격
+LOG_STREAM_HEARTBEAT_SECONDS = float(os.getenv("LOG_STREAM_HEARTBEAT_SECONDS", "15"))
+
+NOTIFY_CHANNEL = "activity_logs"
+# NOTIFY 페이로드 최대 크기(8000바이트)를 넘지 않도록 id 목록을 나눠 보냄
+_NOTIFY_PAYLOAD_MAX = 7900
+
+def make_predicate(log_type=None, log_level=None, username=None, action=None):
+    """구독 조건 함수 (타입/레벨은 일치, 사용자명/액션은 대소문자 무시 부분 일치). 조건이 없으면 None"""
+    if not any((log_type, log_level, username, action)):
+        return None
+    username = username.lower() if username else None
+    action = action.lower() if action else None
+
+    def predicate(entry):
+        return ((not log_type or entry["type"] == log_type)
+                and (not log_level or entry["level"] == log_level)
+                and (not username or username in (entry["user"] or "").lower())
+                and (not action or action in (entry["action"] or "").lower()))
+    return predicate
+
+def notify_payloads(ids):
+    """로그 id 목록을 NOTIFY 페이로드 크기에 맞게 쉼표로 이은 문자열 목록으로 나눕니다."""
+    payloads = []
+    current = ""
+    for log_id in ids:
+        part = str(log_id)
+        if current and len(current) + len(part) + 1 > _NOTIFY_PAYLOAD_MAX:
+            payloads.append(current)
+            current = part
+        else:
+            current = f"{current},{part}" if current else part
+    if current:
+        payloads.append(current)
+    return payloads
+
+class Subscription:
+    """구독자 한 명의 제한된 대기열 (로그 기록 스레드가 넣고 SSE 응답이 이벤트 루프에서 꺼냄)"""
+
+    def __init__(self, hub, predicate, max_queue, loop):
+        self.hub = hub
+        self.predicate = predicate
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._loop = loop
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+        self.closed = False
+
+    def push(self, entry, data) -> bool:
+        """조건에 맞는 로그를 대기열에 넣습니다. (어느 스레드에서나 호출 가능)"""
+        if self.closed or (self.predicate is not None and not self.predicate(entry)):
+            return False
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append((entry["id"], data))
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # 이벤트 루프가 이미 닫힘 (연결 종료 직후)
+            self.close()
+        return True
+
+    async def next_batch(self, timeout: float):
+        """대기 중인 로그를 모두 꺼냅니다. timeout초 동안 없으면 빈 목록"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+        return batch
+
+    def close(self):
+        self.closed = True
+        self.hub.unsubscribe(self)
+
+class LogHub:
+    """새 활동 로그를 구독자들에게 나눠 주는 프로세스 내 pub/sub
+
+    memory 모드에서는 로그를 기록한 뒤 바로 구독자에게 전달하고, postgres 모드에서는 기록하는
+    트랜잭션에서 NOTIFY로 id를 알리고 각 워커의 LISTEN 스레드가 받은 id의 로그를 읽어 전달합니다.
+    구독자가 없으면 어떤 모드에서도 로그를 다시 읽지 않습니다.
+    """
+
+    def __init__(self, max_queue=LOG_STREAM_QUEUE_MAX, max_subscribers=LOG_STREAM_MAX_SUBSCRIBERS):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.remote = False
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.counters = {'published': 0, 'delivered': 0, 'notified': 0}
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self, predicate=None, loop=None) -> Subscription:
+        """구독을 시작합니다. 구독자가 너무 많으면 None (이벤트 루프 안에서 호출)"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(self, predicate, self.max_queue, loop or asyncio.get_running_loop())
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, logs):
+        """로그 행들을 조건이 맞는 구독자에게 전달합니다. (직렬화는 로그마다 한 번)"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+        for log in logs:
+            entry = serialize_log(log)
+            data = json.dumps(entry, ensure_ascii=False)
+            self.counters['published'] += 1
+            for subscription in subscribers:
+                if subscription.push(entry, data):
+                    self.counters['delivered'] += 1
+
+    def returning_columns(self, db: Session):
+        """로그 INSERT에 붙일 RETURNING 컬럼 (전달할 곳이 없거나 DB가 지원하지 않으면 None)"""
+        if not db.get_bind().dialect.insert_returning:
+            return None
+        if self.remote:
+            return [ActivityLog.id]
+        if self.subscriber_count:
+            return list(ActivityLog.__table__.c)
+        return None
+
+    def announce(self, db: Session, logs):
+        """postgres 모드에서 기록 중인 트랜잭션에 NOTIFY를 추가합니다. (커밋 시 다른 워커에 전달됨)"""
+        if not self.remote or not logs:
+            return
+        for payload in notify_payloads(log.id for log in logs):
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {'channel': NOTIFY_CHANNEL, 'payload': payload})
+            self.counters['notified'] += 1
+
+    def committed(self, logs):
+        """커밋된 로그를 memory 모드 구독자에게 전달합니다. (postgres 모드는 LISTEN 스레드가 전달)"""
+        if not self.remote and logs:
+            self.publish(logs)
+
+    def stats(self):
+        return {
+            "backend": "postgres" if self.remote else "memory",
+            "subscribers": self.subscriber_count,
+            "dropped": sum(subscription.dropped for subscription in list(self._subscribers)),
+            **self.counters
+        }
+
+    def listen(self, engine, session_factory, stop_event, poll_seconds: float = 1.0):
+        """NOTIFY를 받아 해당 로그를 읽고 이 워커의 구독자에게 전달합니다. (백그라운드 스레드에서 실행)"""
+        while not stop_event.is_set():
+            raw = None
+            try:
+                # LISTEN 상태와 autocommit 설정이 풀로 돌아가지 않도록 풀에서 분리한 전용 연결 사용
+                raw = engine.raw_connection()
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {NOTIFY_CHANNEL}")
+                while not stop_event.is_set():
+                    if select.select([connection], [], [], poll_seconds) == ([], [], []):
+                        continue
+                    connection.poll()
+                    ids = []
+                    while connection.notifies:
+                        ids += [int(log_id) for log_id in connection.notifies.pop(0).payload.split(',') if log_id]
+                    if ids and self.subscriber_count:
+                        self._publish_ids(session_factory, ids)
+            except Exception as e:
+                print(f"⚠️ 로그 스트림 LISTEN 연결 오류: {str(e)}")
+                stop_event.wait(5)
+            finally:
+                if raw is not None:
+                    raw.close()
+
+    def _publish_ids(self, session_factory, ids):
+        db = session_factory()
+        try:
+            logs = db.query(ActivityLog).filter(ActivityLog.id.in_(ids)).order_by(
+                ActivityLog.created_at, ActivityLog.id
+            ).all()
+            self.publish(logs)
+        finally:
+            db.close()
+
+log_hub = LogHub()
+
+def use_notify(engine) -> bool:
+    if LOG_STREAM_BACKEND == 'memory':
+        return False
+    return engine.dialect.name == 'postgresql'
+
+def start_log_stream(engine, session_factory):
+    """PostgreSQL이면 LISTEN 스레드를 시작하고 중지용 Event를 반환합니다. (memory 모드면 None)"""
+    if not use_notify(engine):
+        return None
+    log_hub.remote = True
+    stop_event = threading.Event()
+    thread = threading.Thread(target=log_hub.listen, args=(engine, session_factory, stop_event),
+                              name="activity-log-listen", daemon=True)
+    thread.start()
+    return stop_event
+
+def format_event(log_id, data) -> str:
+    """SSE 이벤트 한 건 (id로 브라우저가 마지막으로 받은 로그를 기억)"""
+    return f"id: {log_id}\nevent: log\ndata: {data}\n\n"
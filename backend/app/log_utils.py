@@ -1,6 +1,214 @@
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 from typing import Optional
+from types import SimpleNamespace
+from collections import deque
+import os
+import threading
+import time
+
 from .models import ActivityLog
+from .log_stats import log_stats_counter
+from .log_stream import log_hub
+from .utils import get_utc_now
+
+# 활동 로그 파이프라인 설정 (sync: 요청 안에서 바로 기록, async: 백그라운드에서 묶어서 기록)
+LOG_PIPELINE_MODE = os.getenv("LOG_PIPELINE_MODE", "async")
+LOG_FLUSH_INTERVAL_MS = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "200"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "200"))
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))
+# 큐가 가득 찼을 때 자리가 날 때까지 기다리는 최대 시간 (넘으면 버리고 drop 카운터 증가)
+LOG_ENQUEUE_TIMEOUT_MS = float(os.getenv("LOG_ENQUEUE_TIMEOUT_MS", "50"))
+
+class LogPipeline:
+    """활동 로그를 제한된 큐에 모았다가 백그라운드 스레드가 여러 행 INSERT 한 번으로 기록합니다.
+
+    시작하지 않았거나 sync 모드면 호출 즉시 별도 세션으로 기록합니다. (스크립트/테스트)
+    """
+
+    def __init__(self, batch_size=LOG_BATCH_SIZE, flush_interval_ms=LOG_FLUSH_INTERVAL_MS,
+                 max_queue=LOG_QUEUE_MAX, enqueue_timeout_ms=LOG_ENQUEUE_TIMEOUT_MS):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self.session_factory = None
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._writing = False
+        self._stopping = False
+        self._thread = None
+        self.counters = {'enqueued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, session_factory):
+        """백그라운드 기록 스레드를 시작합니다."""
+        if self.running:
+            return
+        self.session_factory = session_factory
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 로그를 모두 기록한 뒤 스레드를 멈춥니다. (종료 시 호출)"""
+        if not self.running:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, row) -> bool:
+        """로그 한 건을 큐에 넣습니다. 큐가 가득 차 제한 시간 안에 자리가 나지 않으면 버리고 False"""
+        deadline = time.monotonic() + self.enqueue_timeout
+        with self._condition:
+            while len(self._queue) >= self.max_queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopping:
+                    self.counters['dropped'] += 1
+                    return False
+                self._condition.wait(remaining)
+            self._queue.append(row)
+            self.counters['enqueued'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """큐가 빌 때까지 기다립니다. (스레드가 없으면 큐에 쌓이는 로그가 없음)"""
+        if not self.running:
+            return not self._queue
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._condition.notify_all()
+            while self._queue or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, self.flush_interval))
+        return True
+
+    def write(self, rows, bind=None):
+        """로그 행들을 여러 행 INSERT 한 번으로 기록합니다. 실패하면 버리고 failed 카운터를 올립니다.
+
+        실시간 로그 구독자가 있으면 RETURNING으로 기록된 행을 받아 로그 스트림에 전달합니다.
+        """
+        if not rows:
+            return
+        db = Session(bind=bind) if bind is not None else self.session_factory()
+        try:
+            statement = insert(ActivityLog).values(rows)
+            columns = log_hub.returning_columns(db)
+            if columns:
+                statement = statement.returning(*columns)
+            result = db.execute(statement)
+            written = result.all() if columns else []
+            log_hub.announce(db, written)
+            db.commit()
+            log_stats_counter.record(rows)
+            log_hub.committed(written)
+            with self._condition:
+                self.counters['written'] += len(rows)
+                self.counters['batches'] += 1
+        except Exception as e:
+            db.rollback()
+            with self._condition:
+                self.counters['failed'] += len(rows)
+            print(f"⚠️ 로그 기록 실패 ({len(rows)}건): {str(e)}")
+        finally:
+            db.close()
+
+    def stats(self):
+        with self._condition:
+            queued = len(self._queue)
+        return {
+            "mode": "async" if self.running else "sync",
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000,
+            **self.counters
+        }
+
+    def _take_batch(self) -> bool:
+        with self._condition:
+            if not self._queue:
+                return False
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._writing = True
+            # 자리가 나기를 기다리던 enqueue를 깨움
+            self._condition.notify_all()
+        try:
+            self.write(batch)
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._queue) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                stopping = self._stopping
+            while self._take_batch():
+                with self._condition:
+                    if len(self._queue) < self.batch_size and not self._stopping:
+                        break
+            if stopping:
+                with self._condition:
+                    if not self._queue:
+                        return
+
+log_pipeline = LogPipeline()
+
+def start_log_pipeline(session_factory):
+    """비동기 로그 기록을 시작합니다. (LOG_PIPELINE_MODE=sync면 시작하지 않음)"""
+    if LOG_PIPELINE_MODE == "async":
+        log_pipeline.start(session_factory)
+
+def stop_log_pipeline():
+    log_pipeline.stop()
+
+_PENDING_LOGS = 'pending_activity_logs'
+_COMMITTING_LOGS = 'committing_activity_logs'
+_LOG_HOOKS = 'activity_log_hooks'
+
+def _before_commit(db: Session):
+    # 호출자 트랜잭션의 로그를 flush해 id를 받고, 커밋 뒤 전달할 값을 미리 복사 (커밋 후에는 객체가 만료됨)
+    pending = db.info.pop(_PENDING_LOGS, None)
+    if not pending:
+        return
+    db.flush()
+    written = [SimpleNamespace(**{column.name: getattr(log, column.name) for column in ActivityLog.__table__.c})
+               for log in pending]
+    log_hub.announce(db, written)
+    db.info[_COMMITTING_LOGS] = written
+
+def _after_commit(db: Session):
+    written = db.info.pop(_COMMITTING_LOGS, None)
+    if written:
+        log_stats_counter.record([vars(log) for log in written])
+        log_hub.committed(written)
+
+def _after_rollback(db: Session):
+    db.info.pop(_PENDING_LOGS, None)
+    db.info.pop(_COMMITTING_LOGS, None)
+
+def _track_transaction_log(db: Session, activity_log):
+    """호출자 트랜잭션에 추가한 로그가 커밋되면 통계 카운터와 실시간 로그 스트림에 알리도록 등록합니다."""
+    if not db.info.get(_LOG_HOOKS):
+        event.listen(db, "before_commit", _before_commit)
+        event.listen(db, "after_commit", _after_commit)
+        event.listen(db, "after_rollback", _after_rollback)
+        db.info[_LOG_HOOKS] = True
+    db.info.setdefault(_PENDING_LOGS, []).append(activity_log)
 
 def log_activity(
     db: Session,
@@ -11,24 +219,36 @@ def log_activity(
     user_id: Optional[int] = None,
     username: Optional[str] = None,
     session_id: Optional[str] = None,
-    ip_address: Optional[str] = None
+    ip_address: Optional[str] = None,
+    commit: bool = True
 ):
-    """활동 로그를 기록하는 유틸리티 함수"""
-    try:
-        activity_log = ActivityLog(
-            user_id=user_id,
-            username=username,
-            action=action,
-            details=details,
-            log_type=log_type,
-            log_level=log_level,
-            ip_address=ip_address,
-            session_id=session_id
-        )
-        db.add(activity_log)
-        db.commit()
-        return activity_log
-    except Exception as e:
-        db.rollback()
-        print(f"⚠️ 로그 기록 실패: {str(e)}")
-        return None 
\ No newline at end of file
+    """활동 로그를 기록하는 유틸리티 함수
+
+    commit=False면 호출자의 트랜잭션에 포함하고(커밋되면 통계 카운터와 로그 스트림에 반영),
+    아니면 로그 파이프라인으로 보내 호출자의 세션과 분리해 기록합니다.
+    (파이프라인이 실행 중이면 비동기, 아니면 별도 세션으로 즉시 기록)
+    """
+    values = {
+        'user_id': user_id,
+        'username': username,
+        'action': action,
+        'details': details,
+        'log_type': log_type,
+        'log_level': log_level,
+        'ip_address': ip_address,
+        'session_id': session_id,
+        'created_at': get_utc_now()
+    }
+    if not commit:
+        try:
+            activity_log = ActivityLog(**values)
+            db.add(activity_log)
+            _track_transaction_log(db, activity_log)
+            return activity_log
+        except Exception as e:
+            print(f"⚠️ 로그 기록 실패: {str(e)}")
+            return None
+    if log_pipeline.running:
+        return log_pipeline.enqueue(values)
+    log_pipeline.write([values], bind=db.get_bind())
+    return True
@@ -3,7 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import os
 
-from .api import ai_info, quiz, prompt, base_content, term, auth, logs, system, user_progress
+from .api import ai_info, quiz, prompt, base_content, term, auth, logs, system, user_progress, search
 
 app = FastAPI()
 
@@ -137,6 +137,41 @@ async def not_found_handler(request: Request, exc: HTTPException):
         content={"error": "Not found", "path": str(request.url)}
     )
 
+# 백그라운드 작업
+@app.on_event("startup")
+def start_background_jobs():
+    """활동 로그 기록 스레드와 학습 통계 카운터 재계산 작업을 시작합니다."""
+    from .database import SessionLocal
+    from .log_utils import start_log_pipeline
+    start_log_pipeline(SessionLocal)
+    
+    interval = float(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+    if interval > 0:
+        from .stats_counters import start_reconcile_worker
+        app.state.stats_reconcile_stop = start_reconcile_worker(SessionLocal, interval)
+    
+    # 활동 로그 월별 파티션 생성과 보관 기간 정리
+    retention_interval = float(os.getenv("LOG_RETENTION_INTERVAL_SECONDS", "86400"))
+    if retention_interval > 0:
+        from .log_partitions import start_retention_worker
+        app.state.log_retention_stop = start_retention_worker(SessionLocal, retention_interval)
+    
+    # 실시간 로그 스트림 (PostgreSQL이면 다른 워커가 기록한 로그도 LISTEN/NOTIFY로 전달)
+    from .database import engine
+    from .log_stream import start_log_stream
+    app.state.log_stream_stop = start_log_stream(engine, SessionLocal)
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    for name in ("stats_reconcile_stop", "log_retention_stop", "log_stream_stop"):
+        stop_event = getattr(app.state, name, None)
+        if stop_event:
+            stop_event.set()
+    
+    # 큐에 남은 활동 로그를 모두 기록한 뒤 종료
+    from .log_utils import stop_log_pipeline
+    stop_log_pipeline()
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(logs.router, prefix="/api/logs", tags=["Activity Logs"])
 app.include_router(system.router, prefix="/api/system", tags=["System Management"])
@@ -145,4 +180,5 @@ app.include_router(ai_info.router, prefix="/api/ai-info")
 app.include_router(quiz.router, prefix="/api/quiz")
 app.include_router(prompt.router, prefix="/api/prompt")
 app.include_router(base_content.router, prefix="/api/base-content")
-app.include_router(term.router, prefix="/api/term") 
\ No newline at end of file
+app.include_router(term.router, prefix="/api/term")
+app.include_router(search.router, prefix="/api/search", tags=["Search"]) 
\ No newline at end of file
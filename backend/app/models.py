@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -28,6 +28,11 @@ class ActivityLog(Base):
     user_agent = Column(Text, nullable=True)  # 사용자 에이전트
     session_id = Column(String, nullable=True)  # 세션 ID
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # PostgreSQL에서는 created_at 기준 월별 범위 파티션으로 변환 가능 (migrate_log_partitions.py)
+    __table_args__ = (
+        Index('ix_activity_logs_created_type_level', 'created_at', 'log_type', 'log_level'),
+    )
 
 # 백업 히스토리 모델 추가
 class BackupHistory(Base):
@@ -57,8 +62,65 @@ class AIInfo(Base):
     info3_title = Column(Text)
     info3_content = Column(Text)
     info3_terms = Column(Text)  # JSON 직렬화된 용어 리스트
+    content_hash = Column(String, nullable=True)  # 응답 내용 해시 (ETag, add_ai_info에서 계산)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# AI 정보별 용어 색인 (add_ai_info에서 info{1,2,3}_terms JSON을 정규화해 저장)
+class AIInfoTerm(Base):
+    __tablename__ = "ai_info_terms"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(String, nullable=False)
+    info_index = Column(Integer, nullable=False)  # 0, 1, 2
+    position = Column(Integer, nullable=False)  # 원래 JSON 목록에서의 순서
+    term = Column(Text, nullable=False)
+    description = Column(Text, nullable=False, default="")
+    
+    __table_args__ = (
+        UniqueConstraint('date', 'info_index', 'position', name='uq_ai_info_terms_key'),
+    )
+
+# 날짜별 미리 생성한 용어 퀴즈 묶음 (용어 내용이 바뀔 때만 다시 생성)
+class QuizBundle(Base):
+    __tablename__ = "quiz_bundles"
+    
+    date = Column(String, primary_key=True)
+    terms_hash = Column(String, nullable=False)  # 생성에 사용한 용어 목록의 해시
+    total_terms = Column(Integer, nullable=False, default=0)
+    variants = Column(Text, nullable=False)  # JSON 직렬화된 퀴즈 변형 목록
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# AI 정보별 MinHash 서명 (유사 중복 검사용 LSH 색인의 원본, add_ai_info에서 저장)
+class AIInfoSignature(Base):
+    __tablename__ = "ai_info_signatures"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(String, nullable=False, index=True)
+    info_index = Column(Integer, nullable=False)  # 0, 1, 2
+    title = Column(Text, nullable=False, default="")
+    signature = Column(Text, nullable=False)  # 쉼표로 구분한 16진수 MinHash 값
+    
+    __table_args__ = (
+        UniqueConstraint('date', 'info_index', name='uq_ai_info_signatures_key'),
+    )
+
+# 검색 색인 문서 (AI 정보, 프롬프트, 기반 내용, 용어를 토큰화해 저장, PostgreSQL에서는 tsvector/GIN 색인 추가)
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    doc_type = Column(String, nullable=False)  # ai_info, prompt, base_content, term
+    doc_key = Column(String, nullable=False)  # AI 정보는 날짜, 나머지는 id
+    title = Column(Text, nullable=False, default="")
+    snippet = Column(Text, nullable=False, default="")
+    title_tokens = Column(Text, nullable=False, default="")  # 공백으로 구분한 색인 토큰
+    body_tokens = Column(Text, nullable=False, default="")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('doc_type', 'doc_key', name='uq_search_documents_key'),
+    )
+
 class Quiz(Base):
     __tablename__ = "quiz"
     
@@ -83,6 +145,83 @@ class UserProgress(Base):
     stats = Column(Text)         # JSON 직렬화 문자열
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+# 정규화된 학습 이벤트 모델 (user_progress의 JSON 기록을 대체)
+class LearnedInfoEvent(Base):
+    __tablename__ = "learned_info_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    date = Column(String, nullable=False)  # YYYY-MM-DD
+    info_index = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('session_id', 'date', 'info_index', name='uq_learned_info_events_key'),
+        Index('ix_learned_info_events_session_date', 'session_id', 'date'),
+    )
+
+class LearnedTermEvent(Base):
+    __tablename__ = "learned_term_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    date = Column(String, nullable=False)  # YYYY-MM-DD
+    info_index = Column(Integer, nullable=False)
+    term = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('session_id', 'date', 'info_index', 'term', name='uq_learned_term_events_key'),
+        Index('ix_learned_term_events_session_date', 'session_id', 'date'),
+    )
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    date = Column(String, nullable=False)  # YYYY-MM-DD
+    session_number = Column(Integer, nullable=False)  # 같은 날의 몇 번째 퀴즈인지
+    correct = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    score = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('session_id', 'date', 'session_number', name='uq_quiz_attempts_key'),
+        Index('ix_quiz_attempts_session_date', 'session_id', 'date'),
+    )
+
+# 세션별 학습 통계 카운터 (학습 이벤트마다 증분 갱신)
+class SessionStatsCounter(Base):
+    __tablename__ = "session_stats_counters"
+    
+    session_id = Column(String, primary_key=True)
+    total_learned = Column(Integer, nullable=False, default=0)
+    total_terms_learned = Column(Integer, nullable=False, default=0)
+    streak_days = Column(Integer, nullable=False, default=0)
+    max_streak = Column(Integer, nullable=False, default=0)
+    last_learned_date = Column(String, nullable=True)  # YYYY-MM-DD
+    quiz_correct = Column(Integer, nullable=False, default=0)
+    quiz_total = Column(Integer, nullable=False, default=0)
+    quiz_score = Column(Integer, nullable=False, default=0)  # 마지막 퀴즈 점수
+    needs_reconcile = Column(Boolean, nullable=False, default=False)  # 증분 갱신이 불가능한 이벤트 발생 시
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+# 세션별 획득 성취 (규칙 평가로 새로 달성한 성취만 추가)
+class UserAchievement(Base):
+    __tablename__ = "user_achievements"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False)
+    achievement_id = Column(String, nullable=False)
+    notified = Column(Boolean, nullable=False, default=False)  # 성취 확인 API로 사용자에게 알렸는지
+    unlocked_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('session_id', 'achievement_id', name='uq_user_achievements_key'),
+    )
+
 class Prompt(Base):
     __tablename__ = "prompt"
     
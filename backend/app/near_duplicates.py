@@ -0,0 +1,207 @@
+from sqlalchemy.orm import Session
+import hashlib
+import os
+import threading
+import time
+
+from .models import AIInfo, AIInfoSignature
+from .text_normalize import normalize_many
+
+# MinHash 서명 길이와 LSH 밴드 구성 (밴드 16개 × 4행이면 유사도 약 0.5 이상인 쌍이 후보로 잡힘)
+NEAR_DUP_SIGNATURE_SIZE = 64
+NEAR_DUP_BANDS = 16
+NEAR_DUP_SHINGLE_SIZE = int(os.getenv("NEAR_DUP_SHINGLE_SIZE", "3"))
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.6"))
+# 프로세스 내 LSH 색인을 테이블에서 다시 읽는 주기 (다른 워커에서 추가된 정보 반영)
+NEAR_DUP_INDEX_TTL_SECONDS = float(os.getenv("NEAR_DUP_INDEX_TTL_SECONDS", "600"))
+
+_ROWS_PER_BAND = NEAR_DUP_SIGNATURE_SIZE // NEAR_DUP_BANDS
+_MAX_HASH = (1 << 64) - 1
+
+def shingles(normalized: str):
+    """정규화한 문자열의 문자 n-gram 집합 (한글은 띄어쓰기와 조사 변화에 덜 민감하도록 문자 단위)"""
+    size = NEAR_DUP_SHINGLE_SIZE
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def minhash_signature(normalized: str):
+    """정규화한 문자열의 MinHash 서명 (정수 NEAR_DUP_SIGNATURE_SIZE개, 내용이 없으면 None)
+
+    n-gram마다 64비트 해시를 한 번만 계산하고 해시값으로 칸을 나눠 칸별 최솟값을 취하는
+    one-permutation 방식이므로 계산량은 n-gram 수에 비례합니다. 빈 칸은 오른쪽 칸의 값으로 채웁니다.
+    """
+    grams = shingles(normalized)
+    if not grams:
+        return None
+    size = NEAR_DUP_SIGNATURE_SIZE
+    signature = [_MAX_HASH] * size
+    for gram in grams:
+        value = int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'little')
+        slot = value % size
+        value //= size
+        if value < signature[slot]:
+            signature[slot] = value
+    if _MAX_HASH in signature:
+        original = list(signature)
+        for i in range(size):
+            if original[i] == _MAX_HASH:
+                # 가장 가까운 오른쪽(순환) 칸의 값을 거리만큼 구분해서 빌려옴
+                distance = next(d for d in range(1, size) if original[(i + d) % size] != _MAX_HASH)
+                signature[i] = original[(i + distance) % size] + distance * (_MAX_HASH // size)
+    return signature
+
+def similarity(first, second) -> float:
+    """두 서명에서 추정한 Jaccard 유사도"""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+def _bands(signature):
+    return [(band, tuple(signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND])) for band in range(NEAR_DUP_BANDS)]
+
+class LSHIndex:
+    """밴드별 해시 버킷으로 유사 후보만 골라내는 색인 (전체 이력과 쌍별 비교하지 않음)"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.items = {}  # (date, info_index) -> (제목, 서명)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, key, title, signature):
+        self.remove(key)
+        self.items[key] = (title, signature)
+        for band in _bands(signature):
+            self.buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        entry = self.items.pop(key, None)
+        if entry is None:
+            return
+        for band in _bands(entry[1]):
+            bucket = self.buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band]
+
+    def remove_date(self, date):
+        for key in [key for key in self.items if key[0] == date]:
+            self.remove(key)
+
+    def query(self, signature, threshold=NEAR_DUP_THRESHOLD, exclude_date=None):
+        """유사도가 threshold 이상인 항목을 유사도 순으로 반환합니다. [(key, 제목, 유사도)]"""
+        candidates = set()
+        for band in _bands(signature):
+            candidates.update(self.buckets.get(band, ()))
+        matches = []
+        for key in candidates:
+            if key[0] == exclude_date:
+                continue
+            title, other = self.items[key]
+            score = similarity(signature, other)
+            if score >= threshold:
+                matches.append((key, title, score))
+        matches.sort(key=lambda match: (-match[2], match[0]))
+        return matches
+
+def info_text(title, content):
+    """제목과 내용을 정규화해 이어 붙인 문자열 (긴 내용이 정규화 캐시를 차지하지 않도록 일괄 API 사용)"""
+    return ''.join(normalize_many([title or '', content or '']))
+
+def ai_info_items(ai_info):
+    """AI 정보 행의 (info_index, 제목, 내용) 목록 (제목과 내용이 있는 정보만)"""
+    items = []
+    for info_index in range(3):
+        title = getattr(ai_info, f'info{info_index + 1}_title')
+        content = getattr(ai_info, f'info{info_index + 1}_content')
+        if title and content:
+            items.append((info_index, title, content))
+    return items
+
+def _encode(signature):
+    return ','.join(format(value, 'x') for value in signature)
+
+def _decode(raw):
+    return [int(value, 16) for value in raw.split(',')]
+
+def rebuild_signatures(db: Session, ai_info):
+    """AI 정보 한 건의 서명을 다시 저장합니다. (커밋과 invalidate_near_duplicates 호출은 호출자 책임)"""
+    delete_signatures(db, ai_info.date)
+    for info_index, title, content in ai_info_items(ai_info):
+        signature = minhash_signature(info_text(title, content))
+        if signature is not None:
+            db.add(AIInfoSignature(date=ai_info.date, info_index=info_index, title=title, signature=_encode(signature)))
+
+def delete_signatures(db: Session, date: str):
+    """날짜의 서명을 삭제합니다. (커밋은 호출자 책임)"""
+    db.query(AIInfoSignature).filter(AIInfoSignature.date == date).delete(synchronize_session=False)
+
+# 프로세스 내 LSH 색인과 다시 읽어야 할 날짜
+_state = {'index': None, 'loaded_at': 0.0, 'stale': set()}
+_state_lock = threading.Lock()
+
+def invalidate_near_duplicates(*dates):
+    """커밋 후 호출해 바뀐 날짜를 다음 검사에서 다시 읽게 합니다. 날짜를 주지 않으면 색인 전체를 다시 만듭니다."""
+    with _state_lock:
+        if dates:
+            _state['stale'].update(dates)
+        else:
+            _state['index'] = None
+            _state['stale'].clear()
+
+def _load(index, rows):
+    for row in rows:
+        index.add((row.date, row.info_index), row.title, _decode(row.signature))
+
+def _refresh_index(db: Session) -> LSHIndex:
+    """LSH 색인을 필요한 만큼 다시 읽어 반환합니다. (_state_lock을 잡은 상태에서 호출)"""
+    columns = (AIInfoSignature.date, AIInfoSignature.info_index, AIInfoSignature.title, AIInfoSignature.signature)
+    now = time.monotonic()
+    index = _state['index']
+    if index is None or now - _state['loaded_at'] >= NEAR_DUP_INDEX_TTL_SECONDS:
+        index = LSHIndex()
+        _load(index, db.query(*columns))
+        _state.update(index=index, loaded_at=now)
+    elif _state['stale']:
+        stale = list(_state['stale'])
+        for date in stale:
+            index.remove_date(date)
+        _load(index, db.query(*columns).filter(AIInfoSignature.date.in_(stale)))
+    _state['stale'].clear()
+    return index
+
+def find_near_duplicates(db: Session, items, exclude_date=None, threshold=None):
+    """(info_index, 제목, 내용) 목록 각각과 비슷한 기존 AI 정보를 찾습니다.
+
+    exclude_date의 정보(같은 날짜에 다시 저장하는 경우 자기 자신)는 제외합니다.
+    """
+    threshold = NEAR_DUP_THRESHOLD if threshold is None else threshold
+    signatures = [(info_index, minhash_signature(info_text(title, content))) for info_index, title, content in items]
+    candidates = []
+    with _state_lock:
+        index = _refresh_index(db)
+        for info_index, signature in signatures:
+            if signature is None:
+                continue
+            for (date, match_index), title, score in index.query(signature, threshold, exclude_date):
+                candidates.append({
+                    "info_index": info_index,
+                    "date": date,
+                    "match_index": match_index,
+                    "title": title,
+                    "similarity": round(score, 3)
+                })
+    return candidates
+
+def reindex_all(db: Session):
+    """모든 AI 정보의 서명을 다시 만듭니다. 처리한 날짜 수를 반환합니다."""
+    db.query(AIInfoSignature).delete(synchronize_session=False)
+    count = 0
+    columns = [AIInfo.date] + [getattr(AIInfo, f'info{i}_{field}') for i in (1, 2, 3) for field in ('title', 'content')]
+    for ai_info in db.query(*columns).all():
+        rebuild_signatures(db, ai_info)
+        count += 1
+    db.commit()
+    invalidate_near_duplicates()
+    return count
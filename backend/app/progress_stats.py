@@ -0,0 +1,87 @@
+from sqlalchemy.orm import Session
+import os
+
+from .cache import ResponseCache, create_backend
+from .learning_calendar import LearningCalendar
+from .progress_store import load_session_events
+from .utils import get_kst_date
+
+# 세션별 통계 응답 캐시 (쓰기 엔드포인트에서 무효화)
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "30"))
+STATS_CACHE_MAX_ENTRIES = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "2048"))
+STATS_CACHE_KINDS = ('progress', 'stats', 'stats_legacy')
+
+stats_cache = ResponseCache("session-stats", STATS_CACHE_TTL_SECONDS, create_backend(STATS_CACHE_MAX_ENTRIES))
+
+def _stats_cache_key(kind: str, session_id: str, today: str):
+    # 오늘 기준 값이 포함되므로 KST 날짜가 바뀌면 자연히 다른 키가 됨
+    return f"{kind}:{session_id}:{today}"
+
+def cached_session_payload(kind: str, session_id: str, compute):
+    """세션 통계 응답을 캐시에서 가져오거나 compute()로 계산합니다."""
+    return stats_cache.get_or_compute(_stats_cache_key(kind, session_id, get_kst_date()), compute)
+
+def invalidate_session_stats(session_id: str):
+    """세션의 모든 통계 응답 캐시를 무효화합니다."""
+    today = get_kst_date()
+    stats_cache.invalidate(*[_stats_cache_key(kind, session_id, today) for kind in STATS_CACHE_KINDS])
+
+def compute_session_stats(db: Session, session_id: str, today: str = None):
+    """세션의 학습 통계를 단일 쿼리 + 단일 패스로 계산합니다.
+
+    학습 이벤트는 `load_session_events`가 한 번의 쿼리로 불러오므로
+    쿼리 수는 학습 기록 길이와 관계없이 항상 1회입니다.
+    """
+    if today is None:
+        today = get_kst_date()
+    events = load_session_events(db, session_id)
+
+    today_ai_info = len(events.learned_info.get(today, []))
+    total_learned = 0
+    learned_dates = set()
+    for date, indices in events.learned_info.items():
+        total_learned += len(indices)
+        if indices:
+            learned_dates.add(date)
+
+    today_terms_total = 0
+    today_unique_terms = set()
+    total_terms_available = 0
+    all_unique_terms = set()
+    for (date, _info_index), terms in events.learned_terms.items():
+        total_terms_available += len(terms)
+        all_unique_terms.update(terms)
+        if date == today:
+            today_terms_total += len(terms)
+            today_unique_terms.update(terms)
+
+    today_quiz_correct = 0
+    today_quiz_total = 0
+    total_quiz_correct = 0
+    total_quiz_questions = 0
+    for attempt in events.quiz_attempts:
+        total_quiz_correct += attempt['correct']
+        total_quiz_questions += attempt['total']
+        if attempt['date'] == today:
+            today_quiz_correct += attempt['correct']
+            today_quiz_total += attempt['total']
+
+    # 연속 학습일 계산 (공용 학습 달력의 비트 연산, 기록 길이 제한 없음)
+    streak_days = LearningCalendar(learned_dates).current_streak(today)
+
+    return {
+        'stored_stats': events.stored_stats,
+        'today_ai_info': today_ai_info,
+        'today_terms': len(today_unique_terms),
+        'today_terms_total': today_terms_total,
+        'today_quiz_correct': today_quiz_correct,
+        'today_quiz_total': today_quiz_total,
+        'today_quiz_score': int((today_quiz_correct / today_quiz_total) * 100) if today_quiz_total > 0 else 0,
+        'total_learned': total_learned,
+        'total_terms_learned': len(all_unique_terms),
+        'total_terms_available': total_terms_available,
+        'total_quiz_correct': total_quiz_correct,
+        'total_quiz_questions': total_quiz_questions,
+        'cumulative_quiz_score': int((total_quiz_correct / total_quiz_questions) * 100) if total_quiz_questions > 0 else 0,
+        'streak_days': streak_days
+    }
@@ -0,0 +1,286 @@
+from sqlalchemy import select, union_all, literal, null, cast, func, or_, and_, Integer, String, Text
+from sqlalchemy.orm import Session
+import json
+
+from .models import UserProgress, LearnedInfoEvent, LearnedTermEvent, QuizAttempt
+from .db_utils import insert_ignore
+
+STATS_KEY = '__stats__'
+TERMS_PREFIX = '__terms__'
+QUIZ_PREFIX = '__quiz__'
+
+# 동시 퀴즈 제출로 회차 번호가 겹칠 때 다시 시도하는 횟수
+QUIZ_NUMBER_RETRIES = 5
+
+def _loads(text):
+    """JSON 문자열을 파싱합니다. 실패하면 None을 반환합니다."""
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+def _split_dated_key(key, prefix):
+    """`{prefix}{date}_{n}` 형식의 레거시 키를 (date, n)으로 분리합니다."""
+    body = key[len(prefix):]
+    if '_' not in body:
+        return None, None
+    date, number = body.rsplit('_', 1)
+    try:
+        return date, int(number)
+    except ValueError:
+        return None, None
+
+class SessionEvents:
+    """한 세션의 학습 이벤트 스냅샷 (이벤트 테이블 + 레거시 행 병합 결과)"""
+
+    def __init__(self):
+        self.learned_info = {}    # date -> [info_index, ...]
+        self.learned_terms = {}   # (date, info_index) -> [term, ...]
+        self.quiz_attempts = []   # [{'date', 'session_number', 'correct', 'total', 'score'}, ...]
+        self.stored_stats = None  # __stats__ 행의 JSON (dict)
+
+    def add_info(self, date, info_index):
+        indices = self.learned_info.setdefault(date, [])
+        if info_index not in indices:
+            indices.append(info_index)
+
+    def add_term(self, date, info_index, term):
+        terms = self.learned_terms.setdefault((date, info_index), [])
+        if term not in terms:
+            terms.append(term)
+
+    def add_quiz(self, date, session_number, correct, total, score=None):
+        if score is None:
+            score = int((correct / total) * 100) if total > 0 else 0
+        self.quiz_attempts.append({
+            'date': date,
+            'session_number': session_number,
+            'correct': correct,
+            'total': total,
+            'score': score
+        })
+
+    def add_legacy_row(self, date, learned_info, stats):
+        """레거시 user_progress 행을 이벤트 형태로 변환해 병합합니다."""
+        if date == STATS_KEY:
+            parsed = _loads(stats)
+            self.stored_stats = parsed if isinstance(parsed, dict) else None
+        elif date.startswith(TERMS_PREFIX):
+            term_date, info_index = _split_dated_key(date, TERMS_PREFIX)
+            terms = _loads(learned_info)
+            if term_date is None or not isinstance(terms, list):
+                return
+            for term in terms:
+                self.add_term(term_date, info_index, term)
+        elif date.startswith(QUIZ_PREFIX):
+            quiz_date, session_number = _split_dated_key(date, QUIZ_PREFIX)
+            quiz_data = _loads(stats)
+            if quiz_date is None or not isinstance(quiz_data, dict):
+                return
+            self.add_quiz(
+                quiz_date,
+                session_number,
+                quiz_data.get('correct', 0),
+                quiz_data.get('total', 0),
+                quiz_data.get('score')
+            )
+        elif not date.startswith('__'):
+            learned = _loads(learned_info)
+            if not isinstance(learned, list):
+                return
+            if not learned:
+                self.learned_info.setdefault(date, [])
+            for info_index in learned:
+                self.add_info(date, info_index)
+
+def _date_window(column, start_date, end_date, prefix=''):
+    """날짜(또는 `{prefix}{date}_{n}` 키) 컬럼에 대한 범위 조건을 만듭니다."""
+    conditions = []
+    if start_date:
+        conditions.append(column >= f'{prefix}{start_date}')
+    if end_date:
+        # 접두사 키는 `{date}_{n}` 형식이므로 '~'(> '_')로 상한을 닫음
+        conditions.append(column <= (f'{prefix}{end_date}~' if prefix else end_date))
+    return and_(*conditions)
+
+def _session_events_query(session_id: str, start_date: str = None, end_date: str = None):
+    """이벤트 테이블과 레거시 행을 하나의 UNION ALL 쿼리로 묶습니다."""
+    windowed = bool(start_date or end_date)
+    null_int = cast(null(), Integer)
+    null_str = cast(null(), String)
+    null_text = cast(null(), Text)
+
+    info = select(
+        literal('info').label('kind'), LearnedInfoEvent.id.label('seq'), LearnedInfoEvent.date,
+        LearnedInfoEvent.info_index.label('number'), null_str.label('term'),
+        null_int.label('correct'), null_int.label('total'),
+        null_text.label('learned_info'), null_text.label('stats')
+    ).where(LearnedInfoEvent.session_id == session_id)
+    if windowed:
+        info = info.where(_date_window(LearnedInfoEvent.date, start_date, end_date))
+
+    term = select(
+        literal('term'), LearnedTermEvent.id, LearnedTermEvent.date,
+        LearnedTermEvent.info_index, LearnedTermEvent.term,
+        null_int, null_int, null_text, null_text
+    ).where(LearnedTermEvent.session_id == session_id)
+    if windowed:
+        term = term.where(_date_window(LearnedTermEvent.date, start_date, end_date))
+
+    quiz = select(
+        literal('quiz'), QuizAttempt.id, QuizAttempt.date,
+        QuizAttempt.session_number, null_str,
+        QuizAttempt.correct, QuizAttempt.total, null_text, null_text
+    ).where(QuizAttempt.session_id == session_id)
+    if windowed:
+        quiz = quiz.where(_date_window(QuizAttempt.date, start_date, end_date))
+
+    # 아직 마이그레이션되지 않은 레거시 행 (이중 읽기)
+    legacy = select(
+        literal('legacy'), UserProgress.id, UserProgress.date,
+        null_int, null_str, null_int, null_int,
+        UserProgress.learned_info, UserProgress.stats
+    ).where(UserProgress.session_id == session_id)
+    if windowed:
+        legacy = legacy.where(or_(
+            _date_window(UserProgress.date, start_date, end_date),
+            _date_window(UserProgress.date, start_date, end_date, TERMS_PREFIX),
+            _date_window(UserProgress.date, start_date, end_date, QUIZ_PREFIX)
+        ))
+
+    combined = union_all(info, term, quiz, legacy).subquery()
+    return select(combined).order_by(combined.c.kind, combined.c.seq)
+
+def load_session_events(db: Session, session_id: str, start_date: str = None, end_date: str = None) -> SessionEvents:
+    """세션의 학습 이벤트를 한 번의 쿼리로 불러옵니다.
+
+    `start_date`/`end_date`(YYYY-MM-DD, 양 끝 포함)를 주면 해당 기간의 이벤트만 읽으며,
+    이 경우 `__stats__` 행은 포함되지 않습니다.
+    """
+    events = SessionEvents()
+    query = _session_events_query(session_id, start_date, end_date)
+    for kind, _seq, date, number, term, correct, total, learned_info, stats in db.execute(query):
+        if kind == 'info':
+            events.add_info(date, number)
+        elif kind == 'term':
+            events.add_term(date, number, term)
+        elif kind == 'quiz':
+            events.add_quiz(date, number, correct or 0, total or 0)
+        else:
+            events.add_legacy_row(date, learned_info, stats)
+    return events
+
+def load_stored_stats(db: Session, session_id: str):
+    """세션의 `__stats__` 행(JSON)을 불러옵니다. 없으면 None을 반환합니다."""
+    text = db.query(UserProgress.stats).filter(
+        UserProgress.session_id == session_id,
+        UserProgress.date == STATS_KEY
+    ).scalar()
+    return _loads(text)
+
+def record_learned_info(db: Session, session_id: str, date: str, info_index: int) -> bool:
+    """AI 정보 학습 이벤트를 추가합니다. 새로 추가된 경우 True를 반환합니다. (커밋은 호출자 책임)
+
+    고유 키(session_id, date, info_index)에 대한 단일 INSERT ... ON CONFLICT DO NOTHING이므로
+    동시 요청에서도 중복 행이 생기지 않습니다.
+    """
+    return insert_ignore(
+        db, LearnedInfoEvent,
+        {'session_id': session_id, 'date': date, 'info_index': info_index},
+        ['session_id', 'date', 'info_index'],
+        exists=lambda: db.query(LearnedInfoEvent.id).filter(
+            LearnedInfoEvent.session_id == session_id,
+            LearnedInfoEvent.date == date,
+            LearnedInfoEvent.info_index == info_index
+        ).first() is not None
+    )
+
+def record_learned_term(db: Session, session_id: str, date: str, info_index: int, term: str) -> bool:
+    """용어 학습 이벤트를 추가합니다. 새로 추가된 경우 True를 반환합니다. (커밋은 호출자 책임)"""
+    return insert_ignore(
+        db, LearnedTermEvent,
+        {'session_id': session_id, 'date': date, 'info_index': info_index, 'term': term},
+        ['session_id', 'date', 'info_index', 'term'],
+        exists=lambda: db.query(LearnedTermEvent.id).filter(
+            LearnedTermEvent.session_id == session_id,
+            LearnedTermEvent.date == date,
+            LearnedTermEvent.info_index == info_index,
+            LearnedTermEvent.term == term
+        ).first() is not None
+    )
+
+def record_quiz_attempt(db: Session, session_id: str, date: str, correct: int, total: int, score: int) -> int:
+    """퀴즈 응시 기록을 추가하고 배정된 회차 번호를 반환합니다. (커밋은 호출자 책임)
+
+    회차 번호는 같은 날 최대 회차 + 1로 정하고 INSERT ... ON CONFLICT DO NOTHING으로 추가합니다.
+    동시 요청이 같은 번호를 먼저 차지하면 삽입이 무시되므로 번호를 다시 구해 재시도합니다.
+    """
+    same_day = and_(QuizAttempt.session_id == session_id, QuizAttempt.date == date)
+    for _ in range(QUIZ_NUMBER_RETRIES):
+        number = db.execute(
+            select(func.coalesce(func.max(QuizAttempt.session_number), 0) + 1).where(same_day)
+        ).scalar()
+        values = {
+            'session_id': session_id,
+            'date': date,
+            'session_number': number,
+            'correct': correct,
+            'total': total,
+            'score': score
+        }
+        if insert_ignore(db, QuizAttempt, values, ['session_id', 'date', 'session_number']):
+            return number
+    raise RuntimeError(f"퀴즈 회차 번호 배정 실패: {session_id} {date}")
+
+def migrate_legacy_rows(db: Session, session_id: str = None):
+    """레거시 user_progress 행을 이벤트 테이블로 옮기고 원본 행을 삭제합니다.
+
+    `__stats__` 행은 그대로 유지합니다. 세션 단위로 커밋하므로 중간에 실패해도
+    다시 실행하면 남은 세션부터 이어서 처리합니다.
+    """
+    query = db.query(UserProgress.session_id).filter(UserProgress.date != STATS_KEY)
+    if session_id is not None:
+        query = query.filter(UserProgress.session_id == session_id)
+    session_ids = [row[0] for row in query.distinct().all()]
+
+    migrated = {'sessions': 0, 'rows': 0, 'info': 0, 'terms': 0, 'quiz': 0}
+    for sid in session_ids:
+        legacy_rows = db.query(UserProgress).filter(
+            UserProgress.session_id == sid,
+            UserProgress.date != STATS_KEY
+        ).all()
+
+        legacy = SessionEvents()
+        for row in legacy_rows:
+            legacy.add_legacy_row(row.date, row.learned_info, row.stats)
+
+        for date, indices in legacy.learned_info.items():
+            for info_index in indices:
+                if record_learned_info(db, sid, date, info_index):
+                    migrated['info'] += 1
+        for (date, info_index), terms in legacy.learned_terms.items():
+            for term in terms:
+                if record_learned_term(db, sid, date, info_index, term):
+                    migrated['terms'] += 1
+
+        # 이미 사용 중인 회차 번호와 겹치지 않도록 퀴즈 회차를 배정
+        taken = {}
+        for date, number in db.query(QuizAttempt.date, QuizAttempt.session_number).filter(QuizAttempt.session_id == sid):
+            taken.setdefault(date, set()).add(number)
+        for attempt in legacy.quiz_attempts:
+            numbers = taken.setdefault(attempt['date'], set())
+            number = attempt['session_number']
+            if number is None or number in numbers:
+                number = max(numbers, default=0) + 1
+            numbers.add(number)
+            db.add(QuizAttempt(session_id=sid, **{**attempt, 'session_number': number}))
+            migrated['quiz'] += 1
+
+        for row in legacy_rows:
+            db.delete(row)
+        db.commit()
+        migrated['sessions'] += 1
+        migrated['rows'] += len(legacy_rows)
+    return migrated
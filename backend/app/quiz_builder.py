@@ -0,0 +1,124 @@
+from sqlalchemy.orm import Session
+import os
+import random
+import threading
+import time
+
+from .models import AIInfoTerm
+from .term_index import get_terms_by_date, term_index_version
+
+# 오답 풀을 다시 읽는 주기 (다른 워커에서 바뀐 용어 반영)
+DISTRACTOR_POOL_TTL_SECONDS = float(os.getenv("DISTRACTOR_POOL_TTL_SECONDS", "600"))
+QUIZ_QUESTION_COUNT = 5
+QUIZ_WRONG_ANSWERS = 3
+
+class DistractorPool:
+    """용어 배열에서 오답 보기를 인덱스로 뽑는 풀
+
+    용어 id는 배열 인덱스입니다. 정답 id와 이미 뽑은 보기(같은 설명 포함)는 거절하고 다시 뽑으므로
+    보기 하나를 뽑는 비용은 풀 크기와 관계없이 평균 O(1)입니다.
+    """
+
+    def __init__(self, terms):
+        self.terms = []
+        seen = set()
+        for term in terms:
+            if term.get('term') and term['term'] not in seen:
+                seen.add(term['term'])
+                self.terms.append({'term': term['term'], 'description': term.get('description') or ''})
+
+    def __len__(self):
+        return len(self.terms)
+
+    def draw(self, count, rng, exclude_descriptions, exclude_id=None):
+        """exclude_id와 exclude_descriptions에 없는 설명을 가진 용어를 최대 count개 뽑습니다."""
+        size = len(self.terms)
+        excluded = set(exclude_descriptions)
+        picked = []
+        attempts = 0
+        # 풀이 충분히 크면 대부분 첫 시도에 성공하므로 시도 횟수를 제한하고, 작은 풀은 순차 탐색으로 마무리
+        while len(picked) < count and attempts < count * 8 and size > 1:
+            attempts += 1
+            index = rng.randrange(size)
+            description = self.terms[index]['description']
+            if index == exclude_id or description in excluded:
+                continue
+            excluded.add(description)
+            picked.append(self.terms[index])
+        if len(picked) < count:
+            for index in rng.sample(range(size), size):
+                if len(picked) >= count:
+                    break
+                description = self.terms[index]['description']
+                if index == exclude_id or description in excluded:
+                    continue
+                excluded.add(description)
+                picked.append(self.terms[index])
+        return picked
+
+def build_term_quizzes(pool: DistractorPool, rng=None, fallback_pool: DistractorPool = None, count: int = QUIZ_QUESTION_COUNT):
+    """풀의 용어로 4지선다 퀴즈를 최대 count개 만듭니다.
+
+    풀 안에서 오답이 부족하면 fallback_pool(전체 용어)에서 채우고, 그래도 부족한 문제는 건너뜁니다.
+    """
+    rng = rng or random.Random()
+    quizzes = []
+    for correct_id in rng.sample(range(len(pool)), min(count, len(pool))):
+        term = pool.terms[correct_id]
+        wrong_answers = pool.draw(QUIZ_WRONG_ANSWERS, rng, [term['description']], exclude_id=correct_id)
+        if len(wrong_answers) < QUIZ_WRONG_ANSWERS and fallback_pool is not None:
+            used = [term['description']] + [t['description'] for t in wrong_answers]
+            wrong_answers += fallback_pool.draw(QUIZ_WRONG_ANSWERS - len(wrong_answers), rng, used)
+        if len(wrong_answers) < QUIZ_WRONG_ANSWERS:
+            continue
+
+        options = [term['description']] + [t['description'] for t in wrong_answers]
+        rng.shuffle(options)
+        correct_index = options.index(term['description'])
+
+        quizzes.append({
+            "id": len(quizzes) + 1,
+            "question": f"'{term['term']}'의 올바른 뜻은?",
+            "option1": options[0],
+            "option2": options[1],
+            "option3": options[2],
+            "option4": options[3],
+            "correct": correct_index,
+            "explanation": f"'{term['term']}'는 '{term['description']}'을 의미합니다."
+        })
+    return quizzes
+
+# 날짜별/전체 오답 풀 (용어 색인 버전이 바뀌면 다시 만듦)
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _cached_pool(key, build):
+    version = term_index_version()
+    now = time.monotonic()
+    with _pools_lock:
+        cached = _pools.get(key)
+        if cached and cached[0] == version and now - cached[1] < DISTRACTOR_POOL_TTL_SECONDS:
+            return cached[2]
+    pool = build()
+    with _pools_lock:
+        _pools[key] = (version, now, pool)
+    return pool
+
+def date_pool(db: Session, date: str) -> DistractorPool:
+    """날짜의 용어로 만든 오답 풀"""
+    return _cached_pool(('date', date), lambda: DistractorPool(get_terms_by_date(db, [date])[date]))
+
+def global_pool(db: Session) -> DistractorPool:
+    """색인된 모든 용어로 만든 오답 풀 (풀이 작을 때 오답 보충용)"""
+    def build():
+        rows = db.query(AIInfoTerm.term, AIInfoTerm.description).order_by(AIInfoTerm.id)
+        return DistractorPool({'term': term, 'description': description} for term, description in rows)
+    return _cached_pool(('global',), build)
+
+def quiz_fallback_pool(db: Session, pool: DistractorPool):
+    """풀만으로 오답 3개를 만들 수 없을 때만 전체 용어 풀을 불러옵니다."""
+    return global_pool(db) if len(pool) <= QUIZ_WRONG_ANSWERS else None
+
+def clear_pools():
+    with _pools_lock:
+        _pools.clear()
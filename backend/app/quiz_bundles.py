@@ -0,0 +1,98 @@
+from sqlalchemy.orm import Session
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+from .models import AIInfo, QuizBundle
+from .quiz_builder import DistractorPool, build_term_quizzes, quiz_fallback_pool
+from .term_index import get_terms_by_date
+
+# 날짜마다 미리 만들어 두는 퀴즈 변형 수와 메모리 캐시 유지 시간
+QUIZ_BUNDLE_VARIANTS = int(os.getenv("QUIZ_BUNDLE_VARIANTS", "8"))
+QUIZ_BUNDLE_CACHE_TTL_SECONDS = float(os.getenv("QUIZ_BUNDLE_CACHE_TTL_SECONDS", "300"))
+
+# date -> (불러온 시각, 묶음), date -> 변형 순번
+_bundles = {}
+_rotation = {}
+_bundles_lock = threading.Lock()
+
+def terms_hash(entries) -> str:
+    """용어 목록의 내용 해시 (퀴즈 묶음 재생성 여부 판단용)"""
+    payload = json.dumps([[entry['info_index'], entry['term'], entry['description']] for entry in entries], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _to_bundle(row: QuizBundle):
+    return {'date': row.date, 'total_terms': row.total_terms, 'variants': json.loads(row.variants)}
+
+def refresh_quiz_bundle(db: Session, date: str, entries=None, force: bool = False):
+    """날짜의 퀴즈 묶음을 용어 내용이 바뀐 경우에만 다시 생성합니다. (커밋은 호출자 책임)
+
+    `entries`를 주면 용어 색인 대신 그 용어 목록을 사용합니다. (아직 커밋 전인 AI 정보 저장 시)
+    """
+    if entries is None:
+        entries = get_terms_by_date(db, [date])[date]
+    content_hash = terms_hash(entries)
+    row = db.get(QuizBundle, date)
+    if row is not None and row.terms_hash == content_hash and not force:
+        return _to_bundle(row)
+
+    pool = DistractorPool(entries)
+    fallback = quiz_fallback_pool(db, pool)
+    # 날짜와 변형 번호로 시드를 정하므로 같은 내용이면 항상 같은 묶음이 생성됨
+    variants = [build_term_quizzes(pool, random.Random(f"{date}:{i}"), fallback) for i in range(QUIZ_BUNDLE_VARIANTS)] if len(pool) else []
+
+    if row is None:
+        row = QuizBundle(date=date)
+        db.add(row)
+    row.terms_hash = content_hash
+    row.total_terms = len(pool)
+    row.variants = json.dumps(variants, ensure_ascii=False)
+    return _to_bundle(row)
+
+def delete_quiz_bundle(db: Session, date: str):
+    """날짜의 퀴즈 묶음을 삭제합니다. (커밋은 호출자 책임)"""
+    db.query(QuizBundle).filter(QuizBundle.date == date).delete(synchronize_session=False)
+
+def invalidate_quiz_bundles(*dates):
+    """메모리의 퀴즈 묶음을 무효화합니다. 날짜를 주지 않으면 전체를 비웁니다."""
+    with _bundles_lock:
+        if dates:
+            for date in dates:
+                _bundles.pop(date, None)
+        else:
+            _bundles.clear()
+
+def get_quiz_bundle(db: Session, date: str):
+    """날짜의 퀴즈 묶음을 메모리 → 묶음 테이블 → 새로 생성 순으로 찾습니다. AI 정보가 없으면 None"""
+    now = time.monotonic()
+    with _bundles_lock:
+        cached = _bundles.get(date)
+    if cached and now - cached[0] < QUIZ_BUNDLE_CACHE_TTL_SECONDS:
+        return cached[1]
+
+    row = db.get(QuizBundle, date)
+    if row is not None:
+        bundle = _to_bundle(row)
+    elif db.query(AIInfo.id).filter(AIInfo.date == date).first():
+        # 묶음 도입 전에 등록된 날짜는 처음 요청될 때 생성
+        bundle = refresh_quiz_bundle(db, date)
+        db.commit()
+    else:
+        return None
+
+    with _bundles_lock:
+        _bundles[date] = (now, bundle)
+    return bundle
+
+def next_variant(bundle):
+    """묶음의 퀴즈 변형을 순서대로 돌아가며 반환합니다. (변형 번호, 퀴즈 목록)"""
+    if not bundle['variants']:
+        return None, []
+    with _bundles_lock:
+        counter = _rotation.setdefault(bundle['date'], itertools.count())
+        index = next(counter) % len(bundle['variants'])
+    return index, bundle['variants'][index]
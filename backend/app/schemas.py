@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # User Schemas (실제 Supabase 스키마에 맞춤)
@@ -42,11 +42,20 @@ class AIInfoCreate(BaseModel):
     date: str
     infos: List[AIInfoItem]
 
+class DuplicateCandidate(BaseModel):
+    info_index: int  # 저장/검사한 정보의 순서
+    date: str  # 비슷한 기존 정보의 날짜
+    match_index: int
+    title: str
+    similarity: float
+
 class AIInfoResponse(BaseModel):
     id: int
     date: str
     infos: List[AIInfoItem]
     created_at: str
+    duplicates: List[DuplicateCandidate] = []
+    duplicate_titles: List[str] = []  # 같은 날짜에 이미 있거나 요청 안에서 반복된 제목 (정규화 기준)
 
     class Config:
         from_attributes = True
@@ -95,6 +104,33 @@ class UserProgressResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class LearningEvent(BaseModel):
+    type: str  # 'info' | 'term' | 'quiz'
+    session_id: str
+    date: Optional[str] = None  # 퀴즈는 생략 시 오늘 날짜
+    info_index: Optional[int] = None
+    term: Optional[str] = None
+    score: Optional[int] = None
+    total_questions: Optional[int] = None
+
+class LearningEventBatch(BaseModel):
+    events: List[LearningEvent]
+
+class LearningEventResult(BaseModel):
+    index: int
+    type: str
+    session_id: str
+    status: str  # 'applied' | 'duplicate' | 'error'
+    detail: Optional[str] = None
+
+class LearningEventBatchResponse(BaseModel):
+    results: List[LearningEventResult]
+    applied: int
+    duplicates: int
+    errors: int
+    sessions: List[str]
+    new_achievements: Dict[str, List[str]] = {}
+
 # Prompt Schemas
 class PromptCreate(BaseModel):
     title: str
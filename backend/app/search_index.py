@@ -0,0 +1,229 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+import math
+import os
+import re
+import threading
+import time
+
+from .db_utils import dialect_name, insert_ignore
+from .models import AIInfo, BaseContent, Prompt, SearchDocument, Term
+from .term_index import parse_ai_info_terms
+from .text_normalize import normalize_text
+
+# 검색 백엔드 (auto: PostgreSQL이고 search_vector 컬럼이 있으면 tsvector, 아니면 프로세스 내 색인)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+# 프로세스 내 색인을 테이블에서 다시 읽는 주기 (다른 워커에서 바뀐 문서 반영)
+SEARCH_INDEX_TTL_SECONDS = float(os.getenv("SEARCH_INDEX_TTL_SECONDS", "300"))
+SEARCH_SNIPPET_LENGTH = 160
+TITLE_WEIGHT = 3
+
+DOC_TYPES = ('ai_info', 'prompt', 'base_content', 'term')
+
+_HANGUL_RUN = re.compile(r'([가-힣]+)')
+
+def tokenize(text):
+    """검색용 토큰 목록을 만듭니다.
+
+    단어마다 normalize_text로 정규화한 뒤 한글 구간은 음절 바이그램으로 나누고(조사가 붙어도 일치),
+    영문/숫자 구간은 그대로 토큰으로 사용합니다.
+    """
+    tokens = []
+    for word in (text or '').split():
+        for run in _HANGUL_RUN.split(normalize_text(word)):
+            if not run:
+                continue
+            if len(run) > 1 and _HANGUL_RUN.fullmatch(run):
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+    return tokens
+
+def _ai_info_document(ai_info):
+    titles, bodies = [], []
+    for i in (1, 2, 3):
+        title = getattr(ai_info, f'info{i}_title')
+        content = getattr(ai_info, f'info{i}_content')
+        if title and content:
+            titles.append(title)
+            bodies.append(content)
+    bodies.extend(f"{entry['term']} {entry['description']}" for entry in parse_ai_info_terms(ai_info))
+    return ai_info.date, ' / '.join(titles), '\n'.join(bodies)
+
+def _document(doc_type, obj):
+    """(doc_key, 제목, 본문)"""
+    if doc_type == 'ai_info':
+        return _ai_info_document(obj)
+    if doc_type == 'term':
+        return str(obj.id), obj.term or '', obj.description or ''
+    return str(obj.id), obj.title or '', f"{obj.content or ''}\n{obj.category or ''}"
+
+_MODELS = {'ai_info': AIInfo, 'prompt': Prompt, 'base_content': BaseContent, 'term': Term}
+
+def index_document(db: Session, doc_type: str, obj):
+    """객체 하나의 검색 문서를 추가하거나 갱신합니다. (커밋과 invalidate_search_documents 호출은 호출자 책임)"""
+    doc_key, title, body = _document(doc_type, obj)
+    values = {
+        'title': title,
+        'snippet': ' '.join(body.split())[:SEARCH_SNIPPET_LENGTH],
+        'title_tokens': ' '.join(tokenize(title)),
+        'body_tokens': ' '.join(tokenize(body)),
+    }
+    inserted = insert_ignore(db, SearchDocument, {'doc_type': doc_type, 'doc_key': doc_key, **values},
+                             ['doc_type', 'doc_key'], exists=lambda: _document_query(db, doc_type, doc_key).first() is not None)
+    if not inserted:
+        _document_query(db, doc_type, doc_key).update(values, synchronize_session=False)
+    return doc_key
+
+def remove_document(db: Session, doc_type: str, doc_key):
+    """검색 문서를 삭제합니다. (커밋은 호출자 책임)"""
+    _document_query(db, doc_type, str(doc_key)).delete(synchronize_session=False)
+
+def _document_query(db: Session, doc_type: str, doc_key: str):
+    return db.query(SearchDocument).filter(SearchDocument.doc_type == doc_type, SearchDocument.doc_key == doc_key)
+
+class InvertedIndex:
+    """토큰 → {문서: 가중 빈도} 역색인 (SQLite 등 tsvector가 없을 때 사용)"""
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}  # (doc_type, doc_key) -> (토큰 가중치, 제목, 요약)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, doc, title, snippet, title_tokens, body_tokens):
+        self.remove(doc)
+        weights = {}
+        for token in title_tokens:
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in body_tokens:
+            weights[token] = weights.get(token, 0) + 1
+        for token, weight in weights.items():
+            self.postings.setdefault(token, {})[doc] = weight
+        self.docs[doc] = (weights, title, snippet)
+
+    def remove(self, doc):
+        entry = self.docs.pop(doc, None)
+        if entry is None:
+            return
+        for token in entry[0]:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(doc, None)
+                if not posting:
+                    del self.postings[token]
+
+    def search(self, tokens, doc_type=None, offset=0, limit=20):
+        """모든 토큰을 포함하는 문서를 TF-IDF 점수 순으로 반환합니다. (전체 개수, 결과 목록)"""
+        postings = [self.postings.get(token) for token in tokens]
+        if not postings or not all(postings):
+            return 0, []
+        # 가장 짧은 목록부터 교집합
+        postings.sort(key=len)
+        total_docs = len(self.docs)
+        scores = {}
+        for doc, weight in postings[0].items():
+            if doc_type is None or doc[0] == doc_type:
+                scores[doc] = weight * math.log(1 + total_docs / len(postings[0]))
+        for posting in postings[1:]:
+            idf = math.log(1 + total_docs / len(posting))
+            scores = {doc: score + posting[doc] * idf for doc, score in scores.items() if doc in posting}
+            if not scores:
+                return 0, []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(ranked), [
+            {'type': doc[0], 'id': doc[1], 'title': self.docs[doc][1], 'snippet': self.docs[doc][2], 'score': round(score, 4)}
+            for doc, score in ranked[offset:offset + limit]
+        ]
+
+# 프로세스 내 색인과 다시 읽어야 할 문서 목록
+_state = {'index': None, 'loaded_at': 0.0, 'stale': set(), 'postgres': None}
+_state_lock = threading.Lock()
+
+def invalidate_search_documents(doc_type=None, *doc_keys):
+    """커밋 후 호출해 바뀐 문서를 다음 검색에서 다시 읽게 합니다. 인자가 없으면 색인 전체를 다시 만듭니다."""
+    with _state_lock:
+        if doc_type is None:
+            _state['index'] = None
+            _state['stale'].clear()
+        else:
+            _state['stale'].update((doc_type, str(key)) for key in doc_keys)
+
+def _add_row(index, row):
+    index.add((row.doc_type, row.doc_key), row.title, row.snippet, row.title_tokens.split(), row.body_tokens.split())
+
+def _refresh_memory_index(db: Session) -> InvertedIndex:
+    """프로세스 내 색인을 필요한 만큼 다시 읽어 반환합니다. (_state_lock을 잡은 상태에서 호출)"""
+    columns = (SearchDocument.doc_type, SearchDocument.doc_key, SearchDocument.title, SearchDocument.snippet,
+               SearchDocument.title_tokens, SearchDocument.body_tokens)
+    now = time.monotonic()
+    index = _state['index']
+    if index is None or now - _state['loaded_at'] >= SEARCH_INDEX_TTL_SECONDS:
+        index = InvertedIndex()
+        for row in db.query(*columns):
+            _add_row(index, row)
+        _state.update(index=index, loaded_at=now)
+        _state['stale'].clear()
+    elif _state['stale']:
+        # 바뀐 문서만 유형별 IN 쿼리로 다시 읽음
+        by_type = {}
+        for doc_type, doc_key in _state['stale']:
+            by_type.setdefault(doc_type, []).append(doc_key)
+            index.remove((doc_type, doc_key))
+        for doc_type, doc_keys in by_type.items():
+            rows = db.query(*columns).filter(SearchDocument.doc_type == doc_type, SearchDocument.doc_key.in_(doc_keys))
+            for row in rows:
+                _add_row(index, row)
+        _state['stale'].clear()
+    return index
+
+def _use_postgres(db: Session) -> bool:
+    if SEARCH_BACKEND == 'memory':
+        return False
+    if SEARCH_BACKEND == 'postgres':
+        return True
+    if _state['postgres'] is None:
+        _state['postgres'] = dialect_name(db) == 'postgresql' and any(
+            column['name'] == 'search_vector' for column in inspect(db.get_bind()).get_columns('search_documents')
+        )
+    return _state['postgres']
+
+def _search_postgres(db: Session, tokens, doc_type, offset, limit):
+    # search_vector는 저장한 토큰을 그대로 어휘로 사용하므로 검색어도 파서를 거치지 않고 tsquery로 변환
+    # (토큰은 정규화로 따옴표와 역슬래시가 제거되어 있음)
+    query = ' & '.join(f"'{token}'" for token in tokens)
+    rows = db.execute(text(f"""
+        SELECT doc_type, doc_key, title, snippet, ts_rank(search_vector, q) AS score, COUNT(*) OVER () AS total
+        FROM search_documents, CAST(:query AS tsquery) AS q
+        WHERE search_vector @@ q {"AND doc_type = :doc_type" if doc_type else ""}
+        ORDER BY score DESC, doc_type, doc_key
+        OFFSET :offset LIMIT :limit
+    """), {'query': query, 'doc_type': doc_type, 'offset': offset, 'limit': limit}).fetchall()
+    total = rows[0].total if rows else 0
+    return total, [
+        {'type': row.doc_type, 'id': row.doc_key, 'title': row.title, 'snippet': row.snippet, 'score': round(float(row.score), 4)}
+        for row in rows
+    ]
+
+def search(db: Session, query: str, doc_type: str = None, offset: int = 0, limit: int = 20):
+    """검색어의 모든 토큰을 포함하는 문서를 점수 순으로 반환합니다. (전체 개수, 결과 목록)"""
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return 0, []
+    if _use_postgres(db):
+        return _search_postgres(db, tokens, doc_type, offset, limit)
+    with _state_lock:
+        return _refresh_memory_index(db).search(tokens, doc_type, offset, limit)
+
+def rebuild_search_index(db: Session):
+    """모든 AI 정보, 프롬프트, 기반 내용, 용어로 검색 색인을 다시 만듭니다. 색인한 문서 수를 반환합니다."""
+    db.query(SearchDocument).delete(synchronize_session=False)
+    count = 0
+    for doc_type, model in _MODELS.items():
+        for obj in db.query(model):
+            index_document(db, doc_type, obj)
+            count += 1
+    db.commit()
+    invalidate_search_documents()
+    return count
@@ -0,0 +1,294 @@
+from sqlalchemy import select, union, update, case, or_, and_
+from sqlalchemy.orm import Session
+import os
+import threading
+import time
+
+from .db_utils import dialect_name, insert_ignore, day_difference
+from .learning_calendar import LearningCalendar, day_offset, from_ordinal, live_streak
+from .utils import get_kst_date
+from .models import SessionStatsCounter, UserProgress, LearnedInfoEvent, LearnedTermEvent, QuizAttempt
+from .progress_store import load_session_events, record_learned_info, record_learned_term, record_quiz_attempt
+
+# 재계산 작업: 대기열(조회 중 발견한 세션)을 확인하는 주기와 주기 점검 한 번에 재계산할 최대 세션 수
+STATS_REBUILD_POLL_SECONDS = float(os.getenv("STATS_REBUILD_POLL_SECONDS", "5"))
+STATS_RECONCILE_BATCH = int(os.getenv("STATS_RECONCILE_BATCH", "500"))
+
+COUNTER_FIELDS = [
+    'total_learned', 'total_terms_learned', 'streak_days', 'max_streak',
+    'last_learned_date', 'quiz_correct', 'quiz_total', 'quiz_score'
+]
+
+def compute_counters_from_events(events):
+    """학습 이벤트 스냅샷에서 카운터 값을 처음부터 계산합니다. (재계산/검증용)"""
+    total_learned = 0
+    learned_dates = []
+    for date, indices in events.learned_info.items():
+        total_learned += len(indices)
+        if indices:
+            learned_dates.append(date)
+
+    total_terms_learned = sum(len(terms) for terms in events.learned_terms.values())
+
+    # 저장되는 streak_days는 마지막 학습일에서 끝나는 구간 길이 (오늘 기준 보정은 조회 시 적용)
+    calendar = LearningCalendar(learned_dates)
+    streak_days = calendar.last_run()
+    max_streak = calendar.max_streak()
+    last_learned_date = from_ordinal(calendar.last) if calendar.last is not None else None
+
+    quiz_correct = sum(attempt['correct'] for attempt in events.quiz_attempts)
+    quiz_total = sum(attempt['total'] for attempt in events.quiz_attempts)
+    quiz_score = events.quiz_attempts[-1]['score'] if events.quiz_attempts else 0
+
+    return {
+        'total_learned': total_learned,
+        'total_terms_learned': total_terms_learned,
+        'streak_days': streak_days,
+        'max_streak': max_streak,
+        'last_learned_date': last_learned_date,
+        'quiz_correct': quiz_correct,
+        'quiz_total': quiz_total,
+        'quiz_score': quiz_score
+    }
+
+def lock_counter(db: Session, session_id: str):
+    """세션 카운터 행을 잠그고 최신 값으로 읽습니다. 행이 없으면 None (잠금은 커밋/롤백까지 유지)
+
+    SQLite는 FOR UPDATE가 없으므로 값을 바꾸지 않는 UPDATE로 데이터베이스 쓰기 잠금을 먼저 잡습니다.
+    """
+    if dialect_name(db) == 'sqlite':
+        db.execute(
+            update(SessionStatsCounter)
+            .where(SessionStatsCounter.session_id == session_id)
+            .values(needs_reconcile=SessionStatsCounter.needs_reconcile)
+            .execution_options(synchronize_session=False)
+        )
+    return (
+        db.query(SessionStatsCounter)
+        .filter(SessionStatsCounter.session_id == session_id)
+        .with_for_update()
+        .populate_existing()
+        .one_or_none()
+    )
+
+def rebuild_counters(db: Session, session_id: str) -> SessionStatsCounter:
+    """원본 학습 이벤트로부터 세션 카운터를 다시 만듭니다. (커밋은 호출자 책임)
+
+    기존 행은 잠근 뒤에 이벤트를 읽어 덮어쓰므로, 그 사이 다른 요청의 증분은 잠금이 풀린 뒤 그대로 더해집니다.
+    행이 없으면 삽입만 시도하고, 동시에 다른 요청이 먼저 만든 행에는 절댓값을 쓰지 않습니다.
+    """
+    counter = lock_counter(db, session_id)
+    values = compute_counters_from_events(load_session_events(db, session_id))
+    if counter is None:
+        insert_ignore(
+            db, SessionStatsCounter,
+            {'session_id': session_id, 'needs_reconcile': False, **values},
+            ['session_id'],
+            exists=lambda: db.query(SessionStatsCounter.session_id).filter(
+                SessionStatsCounter.session_id == session_id
+            ).first() is not None
+        )
+        return db.get(SessionStatsCounter, session_id, populate_existing=True)
+    for field, value in values.items():
+        setattr(counter, field, value)
+    counter.needs_reconcile = False
+    return counter
+
+def get_counters(db: Session, session_id: str) -> SessionStatsCounter:
+    """세션 카운터를 가져옵니다. 없거나 재계산이 필요한 경우 원본 이벤트로부터 만듭니다. (쓰기 경로 전용)"""
+    counter = db.get(SessionStatsCounter, session_id)
+    if counter is None or counter.needs_reconcile:
+        counter = rebuild_counters(db, session_id)
+    return counter
+
+_rebuild_queue = set()
+_rebuild_lock = threading.Lock()
+
+def queue_rebuild(session_id: str):
+    """재계산 작업이 다음 주기에 카운터를 만들거나 다시 계산하도록 세션을 대기열에 넣습니다."""
+    with _rebuild_lock:
+        _rebuild_queue.add(session_id)
+
+def take_rebuild_queue():
+    with _rebuild_lock:
+        session_ids = sorted(_rebuild_queue)
+        _rebuild_queue.clear()
+    return session_ids
+
+def read_counters(db: Session, session_id: str, events=None) -> SessionStatsCounter:
+    """조회 요청용 카운터 (DB에 쓰지 않음)
+
+    행이 없거나 재계산이 필요하면 원본 이벤트(events를 주면 그 스냅샷)로 계산한 저장되지 않은 카운터를
+    반환하고, 실제 행 갱신은 재계산 작업의 대기열에 넣습니다.
+    """
+    counter = db.get(SessionStatsCounter, session_id)
+    if counter is not None and not counter.needs_reconcile:
+        return counter
+    queue_rebuild(session_id)
+    if events is None:
+        events = load_session_events(db, session_id)
+    return SessionStatsCounter(session_id=session_id, **compute_counters_from_events(events))
+
+def counters_to_stats(counter: SessionStatsCounter, today: str = None):
+    """카운터를 기존 `__stats__` 응답 형식의 필드로 변환합니다."""
+    if today is None:
+        today = get_kst_date()
+    return {
+        'total_learned': counter.total_learned,
+        'total_terms_learned': counter.total_terms_learned,
+        'total_terms_available': counter.total_terms_learned,  # 프론트엔드 호환성
+        'streak_days': live_streak(counter.streak_days, counter.last_learned_date, today),
+        'max_streak': counter.max_streak,
+        'last_learned_date': counter.last_learned_date,
+        'quiz_score': counter.quiz_score
+    }
+
+def _apply_counter_update(db: Session, counter: SessionStatsCounter, **values):
+    """카운터 행을 단일 UPDATE 문으로 갱신합니다. (동시 요청의 증분이 유실되지 않음)"""
+    db.execute(
+        update(SessionStatsCounter)
+        .where(SessionStatsCounter.session_id == counter.session_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.expire(counter)  # 다음 접근 시 DB 값을 다시 읽음
+
+def _streak_update_values(db: Session, date: str):
+    """새 학습 날짜를 연속 학습일에 반영하는 SQL 식 (CASE 기반, 현재 행 값 기준으로 계산)"""
+    last = SessionStatsCounter.last_learned_date
+    streak = SessionStatsCounter.streak_days
+    previous_day = day_offset(date, -1)
+
+    new_streak = case(
+        (or_(last.is_(None), last < previous_day), 1),
+        (last == previous_day, streak + 1),
+        else_=streak
+    )
+
+    # 과거 날짜 소급 학습: 현재 연속 구간 밖이면 증분 계산이 불가능하므로 재계산 대상으로 표시
+    gap = day_difference(db, last, date)
+    backfill = and_(last > date, gap >= streak) if gap is not None else last > date
+
+    return {
+        'streak_days': new_streak,
+        'last_learned_date': case((or_(last.is_(None), last < date), date), else_=last),
+        'max_streak': case((new_streak > SessionStatsCounter.max_streak, new_streak), else_=SessionStatsCounter.max_streak),
+        'needs_reconcile': case((backfill, True), else_=SessionStatsCounter.needs_reconcile)
+    }
+
+def track_learned_info(db: Session, session_id: str, date: str, info_index: int) -> bool:
+    """AI 정보 학습 이벤트를 기록하고 카운터를 같은 트랜잭션 안에서 갱신합니다."""
+    counter = get_counters(db, session_id)
+    inserted = record_learned_info(db, session_id, date, info_index)
+    if inserted:
+        _apply_counter_update(
+            db, counter,
+            total_learned=SessionStatsCounter.total_learned + 1,
+            **_streak_update_values(db, date)
+        )
+    return inserted
+
+def track_learned_term(db: Session, session_id: str, date: str, info_index: int, term: str) -> bool:
+    """용어 학습 이벤트를 기록하고 카운터를 같은 트랜잭션 안에서 갱신합니다."""
+    counter = get_counters(db, session_id)
+    inserted = record_learned_term(db, session_id, date, info_index, term)
+    if inserted:
+        _apply_counter_update(db, counter, total_terms_learned=SessionStatsCounter.total_terms_learned + 1)
+    return inserted
+
+def track_quiz_attempt(db: Session, session_id: str, date: str, correct: int, total: int, score: int) -> int:
+    """퀴즈 응시 기록을 추가하고 카운터를 같은 트랜잭션 안에서 갱신합니다. 배정된 회차 번호를 반환합니다."""
+    counter = get_counters(db, session_id)
+    session_number = record_quiz_attempt(db, session_id, date, correct, total, score)
+    _apply_counter_update(
+        db, counter,
+        quiz_correct=SessionStatsCounter.quiz_correct + correct,
+        quiz_total=SessionStatsCounter.quiz_total + total,
+        quiz_score=score
+    )
+    return session_number
+
+def _all_session_ids(db: Session):
+    query = union(
+        select(LearnedInfoEvent.session_id),
+        select(LearnedTermEvent.session_id),
+        select(QuizAttempt.session_id),
+        select(UserProgress.session_id),
+        select(SessionStatsCounter.session_id)
+    )
+    return [row[0] for row in db.execute(query) if row[0]]
+
+def flagged_session_ids(db: Session, limit: int = None):
+    """재계산이 필요하다고 표시된 세션 ID 목록 (최대 limit개)"""
+    query = db.query(SessionStatsCounter.session_id).filter(SessionStatsCounter.needs_reconcile.is_(True))
+    return [session_id for (session_id,) in query.order_by(SessionStatsCounter.session_id).limit(limit or STATS_RECONCILE_BATCH)]
+
+def reconcile_counters(db: Session, session_ids=None):
+    """원본 이벤트로 카운터를 재계산하고 저장된 값과의 차이(drift)를 보고합니다.
+
+    반환값은 `{'checked': n, 'drift': [{'session_id', 'field', 'stored', 'actual'}, ...]}` 입니다.
+    세션마다 카운터 행을 잠근 상태에서 비교/재계산하고 커밋하므로, 실행 중인 요청의 증분이 유실되지 않고
+    쓰기 잠금도 세션 하나를 처리하는 동안만 유지됩니다.
+    """
+    if session_ids is None:
+        session_ids = _all_session_ids(db)
+
+    report = {'checked': 0, 'drift': []}
+    for session_id in session_ids:
+        counter = lock_counter(db, session_id)
+        stored = {field: getattr(counter, field) for field in COUNTER_FIELDS} if counter else None
+        rebuilt = rebuild_counters(db, session_id)
+        for field in COUNTER_FIELDS:
+            actual = getattr(rebuilt, field)
+            if stored is None or stored[field] != actual:
+                report['drift'].append({
+                    'session_id': session_id,
+                    'field': field,
+                    'stored': stored[field] if stored else None,
+                    'actual': actual
+                })
+        db.commit()
+        report['checked'] += 1
+    return report
+
+def run_reconcile_cycle(db: Session, sweep: bool = False):
+    """대기열의 세션과(sweep이면) 재계산 표시된 세션을 최대 STATS_RECONCILE_BATCH개 재계산합니다.
+
+    전체 세션을 훑지 않으므로 작업 비용은 대기 중이거나 표시된 세션 수에만 비례합니다.
+    (전체 점검은 reconcile_stats.py)
+    """
+    session_ids = take_rebuild_queue()
+    if sweep:
+        session_ids = sorted(set(session_ids) | set(flagged_session_ids(db)))
+    if not session_ids:
+        return {'checked': 0, 'drift': []}
+    return reconcile_counters(db, session_ids)
+
+def start_reconcile_worker(session_factory, interval_seconds: float):
+    """대기열과 재계산 표시된 카운터를 처리하는 백그라운드 스레드를 시작합니다. 중지용 Event를 반환합니다.
+
+    대기열은 STATS_REBUILD_POLL_SECONDS마다, 재계산 표시된 행은 interval_seconds마다 확인합니다.
+    """
+    stop_event = threading.Event()
+
+    def run():
+        next_sweep = time.monotonic() + interval_seconds
+        while not stop_event.wait(min(STATS_REBUILD_POLL_SECONDS, interval_seconds)):
+            sweep = time.monotonic() >= next_sweep
+            if sweep:
+                next_sweep = time.monotonic() + interval_seconds
+            db = session_factory()
+            try:
+                report = run_reconcile_cycle(db, sweep)
+                if report['drift']:
+                    sessions = {item['session_id'] for item in report['drift']}
+                    print(f"⚠️ 통계 카운터 불일치 보정: 세션 {len(sessions)}개, 필드 {len(report['drift'])}개")
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ 통계 카운터 재계산 실패: {str(e)}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=run, name="stats-reconcile", daemon=True)
+    thread.start()
+    return stop_event
@@ -0,0 +1,92 @@
+from sqlalchemy.orm import Session
+import json
+import os
+
+from .cache import ResponseCache, create_backend
+from .models import AIInfo, AIInfoTerm
+
+# 날짜별 용어 색인 캐시 (AI 정보 추가/삭제 시 무효화)
+TERM_INDEX_CACHE_TTL_SECONDS = float(os.getenv("TERM_INDEX_CACHE_TTL_SECONDS", "600"))
+TERM_INDEX_CACHE_MAX_ENTRIES = int(os.getenv("TERM_INDEX_CACHE_MAX_ENTRIES", "4096"))
+
+term_index_cache = ResponseCache("ai-info-terms", TERM_INDEX_CACHE_TTL_SECONDS, create_backend(TERM_INDEX_CACHE_MAX_ENTRIES))
+
+TERM_FIELDS = ('info1_terms', 'info2_terms', 'info3_terms')
+
+# 용어 색인이 바뀔 때마다 증가 (색인에서 파생된 프로세스 내 캐시의 무효화 기준)
+_index_state = {'version': 0}
+
+def term_index_version() -> int:
+    return _index_state['version']
+
+def parse_ai_info_terms(ai_info):
+    """AI 정보의 info{1,2,3}_terms JSON을 용어 항목 목록으로 변환합니다.
+
+    항목 형식은 `{'info_index', 'term', 'description'}`이며 JSON 순서를 유지합니다.
+    """
+    entries = []
+    for info_index, field in enumerate(TERM_FIELDS):
+        raw = getattr(ai_info, field)
+        if not raw:
+            continue
+        try:
+            terms = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        for term in terms if isinstance(terms, list) else []:
+            if isinstance(term, dict) and term.get('term'):
+                entries.append({
+                    'info_index': info_index,
+                    'term': term['term'],
+                    'description': term.get('description') or ''
+                })
+    return entries
+
+def rebuild_term_index(db: Session, ai_info):
+    """AI 정보 한 건의 용어 색인을 다시 만듭니다. (커밋은 호출자 책임)"""
+    db.query(AIInfoTerm).filter(AIInfoTerm.date == ai_info.date).delete(synchronize_session=False)
+    for position, entry in enumerate(parse_ai_info_terms(ai_info)):
+        db.add(AIInfoTerm(date=ai_info.date, position=position, **entry))
+
+def delete_term_index(db: Session, date: str):
+    """날짜의 용어 색인을 삭제합니다. (커밋은 호출자 책임)"""
+    db.query(AIInfoTerm).filter(AIInfoTerm.date == date).delete(synchronize_session=False)
+
+def invalidate_term_index(*dates):
+    """날짜별 용어 캐시를 무효화합니다. 커밋 후에 호출해야 이전 값이 다시 캐시되지 않습니다."""
+    term_index_cache.invalidate(*dates)
+    _index_state['version'] += 1
+
+def _load_terms(db: Session, dates):
+    """캐시에 없는 날짜들의 용어를 한 번의 IN 쿼리로 불러옵니다."""
+    loaded = {date: [] for date in dates}
+    rows = db.query(AIInfoTerm.date, AIInfoTerm.info_index, AIInfoTerm.term, AIInfoTerm.description).filter(
+        AIInfoTerm.date.in_(dates)
+    ).order_by(AIInfoTerm.date, AIInfoTerm.info_index, AIInfoTerm.position)
+    for date, info_index, term, description in rows:
+        loaded[date].append({'info_index': info_index, 'term': term, 'description': description})
+
+    # 색인이 없는 날짜(색인 도입 전 데이터)는 AI 정보 JSON에서 직접 읽음
+    unindexed = [date for date, entries in loaded.items() if not entries]
+    if unindexed:
+        columns = [getattr(AIInfo, field) for field in TERM_FIELDS]
+        for ai_info in db.query(AIInfo.date, *columns).filter(AIInfo.date.in_(unindexed)):
+            loaded[ai_info.date] = parse_ai_info_terms(ai_info)
+    return loaded
+
+def get_terms_by_date(db: Session, dates):
+    """날짜별 용어 항목 목록을 반환합니다. 캐시 우선, 나머지는 한 번에 불러와 캐시에 저장합니다."""
+    return term_index_cache.get_many_or_compute(list(dict.fromkeys(dates)), lambda missing: _load_terms(db, missing))
+
+def backfill_term_index(db: Session):
+    """모든 AI 정보로부터 용어 색인을 다시 만듭니다. 처리한 날짜 수를 반환합니다."""
+    db.query(AIInfoTerm).delete(synchronize_session=False)
+    count = 0
+    for ai_info in db.query(AIInfo.date, *[getattr(AIInfo, field) for field in TERM_FIELDS]):
+        for position, entry in enumerate(parse_ai_info_terms(ai_info)):
+            db.add(AIInfoTerm(date=ai_info.date, position=position, **entry))
+        count += 1
+    db.commit()
+    term_index_cache.clear()
+    _index_state['version'] += 1
+    return count
@@ -0,0 +1,44 @@
+from functools import lru_cache
+import os
+import re
+
+# 정규화 결과를 기억할 문자열 수 (같은 제목/용어가 반복해서 비교되므로 작은 캐시로 충분)
+NORMALIZE_CACHE_SIZE = int(os.getenv("NORMALIZE_CACHE_SIZE", "4096"))
+
+# 제거할 구두점과 공백을 하나의 미리 컴파일한 패턴으로 처리
+# (한글이 섞인 제목에서는 str.translate 삭제 표보다 단일 정규식 치환이 더 빠름, test_text_normalize.py 벤치마크 참고)
+_STRIP_PATTERN = re.compile(r'[-–—:·.,!?"\'\\|/\s]+')
+
+# 일괄 정규화 시 항목 구분자 (구두점/공백이 아니므로 치환 후에도 남음)
+_BATCH_SEPARATOR = '\x00'
+
+def _normalize(text: str) -> str:
+    return _STRIP_PATTERN.sub('', text.lower())
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_text(text: str) -> str:
+    """제목/용어 비교용으로 소문자화하고 구두점과 공백을 제거합니다."""
+    return _normalize(text)
+
+def normalize_many(texts):
+    """문자열 목록을 한 번에 정규화합니다. (중복 제목 검사 등 목록 단위 비교용)
+
+    목록을 구분자로 이어 붙여 소문자화와 치환을 한 번씩만 수행합니다.
+    """
+    texts = list(texts)
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [_normalize(text) for text in texts]
+    if not texts:
+        return []
+    return _normalize(_BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
+
+def duplicate_indices(texts):
+    """정규화했을 때 앞 항목과 같아지는 항목의 인덱스 목록을 반환합니다."""
+    seen = set()
+    duplicates = []
+    for index, normalized in enumerate(normalize_many(texts)):
+        if normalized in seen:
+            duplicates.append(index)
+        else:
+            seen.add(normalized)
+    return duplicates
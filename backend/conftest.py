@@ -0,0 +1,45 @@
+"""
+pytest 공용 픽스처 (테스트용 메모리 DB 세션, 통계 캐시 끄기)
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.progress_stats import stats_cache
+
+def new_session():
+    """테스트용 메모리 DB 세션과 쿼리 카운터를 생성합니다. (벤치마크 스크립트에서도 사용)"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    counter = {"queries": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["queries"] += 1
+
+    return sessionmaker(bind=engine)(), counter
+
+@pytest.fixture
+def make_session():
+    """호출할 때마다 새 메모리 DB 세션과 쿼리 카운터를 만드는 함수"""
+    return new_session
+
+@pytest.fixture
+def no_stats_cache(monkeypatch):
+    """통계 캐시를 끄고 매번 DB에서 계산합니다. (테스트가 끝나면 원래 설정으로 복원)
+
+    캐시 객체는 import 시점의 STATS_CACHE_TTL_SECONDS로 만들어지므로 이미 만들어진 캐시의 ttl도 함께 바꿉니다.
+    """
+    monkeypatch.setenv("STATS_CACHE_TTL_SECONDS", "0")
+    monkeypatch.setattr(stats_cache, "ttl", 0)
@@ -65,6 +65,12 @@ def include_routers():
         app.include_router(term.router, prefix="/api/term")
     except Exception as e:
         print(f"⚠️ term 라우터 등록 실패: {e}")
+    
+    try:
+        from app.api import search
+        app.include_router(search.router, prefix="/api/search", tags=["Search"])
+    except Exception as e:
+        print(f"⚠️ search 라우터 등록 실패: {e}")
 
 # CORS 설정 - Railway 배포 환경에 맞게 조정
 app.add_middleware(
@@ -148,5 +154,40 @@ async def not_found_handler(request: Request, exc: HTTPException):
         content={"error": "Not found", "path": str(request.url)}
     )
 
+# 백그라운드 작업
+@app.on_event("startup")
+def start_background_jobs():
+    """활동 로그 기록 스레드와 학습 통계 카운터 재계산 작업을 시작합니다."""
+    from app.database import SessionLocal
+    from app.log_utils import start_log_pipeline
+    start_log_pipeline(SessionLocal)
+    
+    interval = float(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+    if interval > 0:
+        from app.stats_counters import start_reconcile_worker
+        app.state.stats_reconcile_stop = start_reconcile_worker(SessionLocal, interval)
+    
+    # 활동 로그 월별 파티션 생성과 보관 기간 정리
+    retention_interval = float(os.getenv("LOG_RETENTION_INTERVAL_SECONDS", "86400"))
+    if retention_interval > 0:
+        from app.log_partitions import start_retention_worker
+        app.state.log_retention_stop = start_retention_worker(SessionLocal, retention_interval)
+    
+    # 실시간 로그 스트림 (PostgreSQL이면 다른 워커가 기록한 로그도 LISTEN/NOTIFY로 전달)
+    from app.database import engine
+    from app.log_stream import start_log_stream
+    app.state.log_stream_stop = start_log_stream(engine, SessionLocal)
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    for name in ("stats_reconcile_stop", "log_retention_stop", "log_stream_stop"):
+        stop_event = getattr(app.state, name, None)
+        if stop_event:
+            stop_event.set()
+    
+    # 큐에 남은 활동 로그를 모두 기록한 뒤 종료
+    from app.log_utils import stop_log_pipeline
+    stop_log_pipeline()
+
 # 라우터 등록
 include_routers()
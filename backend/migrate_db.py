@@ -48,6 +48,12 @@ def migrate_database():
                 ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
             """))
             
+            # ai_info 테이블에 content_hash 컬럼 추가 (ETag)
+            conn.execute(text("""
+                ALTER TABLE ai_info 
+                ADD COLUMN IF NOT EXISTS content_hash VARCHAR
+            """))
+            
             conn.commit()
             print("✅ 데이터베이스 마이그레이션이 성공적으로 완료되었습니다!")
             
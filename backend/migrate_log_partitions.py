@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+activity_logs 테이블에 (created_at, log_type, log_level) 복합 인덱스를 추가하고,
+PostgreSQL에서는 기존 테이블을 월별 범위 파티션 테이블로 변환하는 마이그레이션
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.log_partitions import convert_to_partitioned, ensure_partitions, list_partitions, run_log_maintenance
+
+def migrate_log_partitions():
+    """복합 인덱스를 만들고 PostgreSQL이면 월별 파티션으로 변환한 뒤 보관 기간 정리를 한 번 실행합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+
+        db = SessionLocal()
+        try:
+            if engine.dialect.name == 'postgresql':
+                if convert_to_partitioned(db):
+                    print("✅ activity_logs를 월별 파티션 테이블로 변환했습니다.")
+                else:
+                    print("ℹ️ activity_logs는 이미 파티션 테이블입니다.")
+                ensure_partitions(db)
+                print(f"✅ 월별 파티션 {len(list_partitions(db))}개가 준비되었습니다.")
+            else:
+                db.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_activity_logs_created_type_level
+                    ON activity_logs (created_at, log_type, log_level)
+                """))
+                db.commit()
+                print("✅ 복합 인덱스가 준비되었습니다. (파티션은 PostgreSQL에서만 지원)")
+
+            report = run_log_maintenance(db)
+            print(f"✅ 보관 기간 정리: 파티션 {len(report['dropped_partitions'])}개, 행 {report['deleted_rows']}개 삭제")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 활동 로그 파티션 마이그레이션을 시작합니다...")
+    if not migrate_log_partitions():
+        sys.exit(1)
+    print("✅ 마이그레이션이 완료되었습니다!")
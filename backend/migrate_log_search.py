@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+활동 로그 사용자명/액션 검색용 색인을 추가하는 마이그레이션
+
+PostgreSQL에서는 pg_trgm 확장과 GIN 트라이그램 색인('%검색어%' 부분 일치용)을,
+모든 DB에서 lower(컬럼) 색인(접두어/정확히 일치용)을 만듭니다.
+파티션 변환(migrate_log_partitions.py)은 기존 색인을 옮기지 않으므로 변환 후 다시 실행하세요.
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.log_queries import ensure_text_indexes, resolve_match_mode
+
+def migrate_log_search():
+    """검색 색인을 만들고 현재 설정에서 쓰일 검색 방식을 출력합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+
+        db = SessionLocal()
+        try:
+            if ensure_text_indexes(db):
+                print("✅ pg_trgm 트라이그램 색인이 준비되었습니다.")
+            else:
+                print("ℹ️ 트라이그램 색인 없이 접두어 검색 색인만 만들었습니다.")
+            print(f"✅ 사용자명/액션 검색 방식: {resolve_match_mode(db)}")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 활동 로그 검색 색인 마이그레이션을 시작합니다...")
+    if not migrate_log_search():
+        sys.exit(1)
+    print("✅ 마이그레이션이 완료되었습니다!")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+user_progress 테이블의 JSON 학습 기록을 정규화된 이벤트 테이블로 옮기는 일회성 마이그레이션
+(learned_info_events, learned_term_events, quiz_attempts, user_achievements)
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.progress_store import migrate_legacy_rows
+from app.achievements import import_legacy_achievements
+
+def migrate_progress_events():
+    """이벤트 테이블을 생성하고 레거시 학습 기록을 옮깁니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+        print("✅ 이벤트 테이블이 준비되었습니다.")
+
+        db = SessionLocal()
+        try:
+            result = migrate_legacy_rows(db)
+            achievements = import_legacy_achievements(db)
+        finally:
+            db.close()
+
+        print(f"✅ 세션 {result['sessions']}개, 레거시 행 {result['rows']}개를 옮겼습니다.")
+        print(f"   - AI 정보 학습: {result['info']}건")
+        print(f"   - 용어 학습: {result['terms']}건")
+        print(f"   - 퀴즈 응시: {result['quiz']}건")
+        print(f"   - 성취: {achievements}건")
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 학습 기록 이벤트 마이그레이션을 시작합니다...")
+    if not migrate_progress_events():
+        sys.exit(1)
+    print("✅ 마이그레이션이 완료되었습니다!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+검색 색인(search_documents) 테이블을 만들고 AI 정보, 프롬프트, 기반 내용, 용어를 색인하는 마이그레이션
+
+PostgreSQL에서는 저장된 토큰으로 tsvector 생성 컬럼과 GIN 색인을 추가합니다.
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.search_index import rebuild_search_index
+
+def migrate_search_index():
+    """검색 색인 테이블(PostgreSQL은 tsvector/GIN 포함)을 준비하고 전체 문서를 색인합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+        print("✅ 검색 색인 테이블이 준비되었습니다.")
+
+        if engine.dialect.name == 'postgresql':
+            with engine.connect() as conn:
+                # 토큰은 이미 정규화되어 있으므로 파서를 거치지 않고 그대로 어휘로 사용 (제목 A, 본문 B 가중치)
+                conn.execute(text("""
+                    ALTER TABLE search_documents
+                    ADD COLUMN IF NOT EXISTS search_vector tsvector
+                    GENERATED ALWAYS AS (
+                        setweight(array_to_tsvector(string_to_array(title_tokens, ' ')), 'A') ||
+                        setweight(array_to_tsvector(string_to_array(body_tokens, ' ')), 'B')
+                    ) STORED
+                """))
+                conn.execute(text("""
+                    CREATE INDEX IF NOT EXISTS ix_search_documents_vector
+                    ON search_documents USING GIN (search_vector)
+                """))
+                conn.commit()
+            print("✅ tsvector 컬럼과 GIN 색인이 추가되었습니다.")
+
+        db = SessionLocal()
+        try:
+            count = rebuild_search_index(db)
+        finally:
+            db.close()
+
+        print(f"✅ 문서 {count}개를 색인했습니다.")
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 검색 색인 마이그레이션을 시작합니다...")
+    if not migrate_search_index():
+        sys.exit(1)
+    print("✅ 마이그레이션이 완료되었습니다!")
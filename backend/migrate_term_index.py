@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+ai_info 테이블의 info{1,2,3}_terms JSON으로부터 용어 색인(ai_info_terms)을 생성하는 마이그레이션
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.term_index import backfill_term_index
+
+def migrate_term_index():
+    """용어 색인 테이블을 생성하고 모든 AI 정보의 용어를 색인합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+        print("✅ 용어 색인 테이블이 준비되었습니다.")
+
+        db = SessionLocal()
+        try:
+            count = backfill_term_index(db)
+        finally:
+            db.close()
+
+        print(f"✅ AI 정보 {count}개 날짜의 용어를 색인했습니다.")
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 용어 색인 마이그레이션을 시작합니다...")
+    if not migrate_term_index():
+        sys.exit(1)
+    print("✅ 마이그레이션이 완료되었습니다!")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+세션별 학습 통계 카운터를 원본 학습 이벤트로 재계산하고 불일치(drift)를 보고합니다.
+"""
+
+import os
+import sys
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.stats_counters import reconcile_counters
+
+def reconcile_stats(session_ids=None):
+    """카운터를 재계산하고 불일치 내역을 출력합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            report = reconcile_counters(db, session_ids)
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"❌ 재계산 중 오류 발생: {e}")
+        return False
+
+    print(f"✅ 세션 {report['checked']}개를 확인했습니다.")
+    if report['drift']:
+        print(f"⚠️ 불일치 {len(report['drift'])}건을 보정했습니다:")
+        for item in report['drift']:
+            print(f"   - {item['session_id']}.{item['field']}: {item['stored']} → {item['actual']}")
+    else:
+        print("✅ 불일치가 없습니다.")
+    return True
+
+if __name__ == "__main__":
+    print("🚀 학습 통계 카운터 재계산을 시작합니다...")
+    if not reconcile_stats(sys.argv[1:] or None):
+        sys.exit(1)
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+기존 AI 정보 전체의 MinHash 서명(ai_info_signatures)을 다시 만드는 일괄 재색인 명령
+"""
+
+import os
+import sys
+import time
+
+# 현재 스크립트의 디렉토리를 Python 경로에 추가
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import engine, SessionLocal
+from app.models import Base
+from app.near_duplicates import reindex_all
+
+def reindex_near_duplicates():
+    """서명 테이블을 준비하고 모든 AI 정보를 다시 색인합니다."""
+    try:
+        Base.metadata.create_all(bind=engine)
+
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            count = reindex_all(db)
+            elapsed = time.perf_counter() - start
+        finally:
+            db.close()
+
+        print(f"✅ AI 정보 {count}개 날짜의 서명을 {elapsed:.1f}초 만에 다시 만들었습니다.")
+    except Exception as e:
+        print(f"❌ 재색인 중 오류 발생: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    print("🚀 유사 중복 검사 색인을 다시 만듭니다...")
+    if not reindex_near_duplicates():
+        sys.exit(1)
+    print("✅ 재색인이 완료되었습니다!")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+AI 정보 용어 색인/용어 퀴즈 API 테스트 (SQLite 메모리 DB 사용)
+"""
+
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+
+from app.models import AIInfo, AIInfoTerm
+from app.schemas import AIInfoCreate
+from app.api import ai_info
+from app.stats_counters import track_learned_info, track_learned_term
+from app.term_index import term_index_cache
+from app.quiz_builder import DistractorPool, build_term_quizzes, clear_pools
+from app import quiz_bundles
+from app import near_duplicates
+from fastapi import Response
+from types import SimpleNamespace
+import random
+import time
+
+pytestmark = pytest.mark.usefixtures("no_stats_cache")
+
+def make_infos(day, terms_per_info=4):
+    return AIInfoCreate(date=day, infos=[
+        {
+            "title": f"{day} 정보 {i + 1}",
+            "content": "내용",
+            "terms": [{"term": f"{day}-용어{i}-{j}", "description": f"{day} 설명 {i}-{j}"} for j in range(terms_per_info)]
+        }
+        for i in range(3)
+    ])
+
+def seed_learning(db, session_id, days, end=date(2025, 3, 31)):
+    """days일 동안 AI 정보를 추가하고 모든 정보와 일부 용어를 학습한 기록을 만듭니다."""
+    for i in range(days):
+        day = (end - timedelta(days=i)).isoformat()
+        ai_info.add_ai_info(make_infos(day), db)
+        for info_index in range(3):
+            track_learned_info(db, session_id, day, info_index)
+        track_learned_term(db, session_id, day, 1, f"{day}-용어1-0")
+    db.commit()
+
+def test_add_ai_info_builds_term_index(make_session):
+    db, _ = make_session()
+    ai_info.add_ai_info(make_infos('2025-01-01', terms_per_info=2), db)
+    rows = db.query(AIInfoTerm).filter(AIInfoTerm.date == '2025-01-01').count()
+    assert rows == 6
+
+    ai_info.delete_ai_info('2025-01-01', db)
+    assert db.query(AIInfoTerm).count() == 0
+
+def test_add_ai_info_warns_duplicate_titles(make_session):
+    """정규화한 제목이 같은 정보는 저장은 그대로 하고 duplicate_titles로 알려주는지 확인"""
+    db, _ = make_session()
+    result = ai_info.add_ai_info(AIInfoCreate(date='2025-06-01', infos=[
+        {"title": "GPT-5 출시", "content": "내용 1", "terms": []},
+        {"title": "gpt 5: 출시!", "content": "내용 2", "terms": []}
+    ]), db)
+    assert [info["title"] for info in result["infos"]] == ["GPT-5 출시", "gpt 5: 출시!"]
+    assert result["duplicate_titles"] == ["gpt 5: 출시!"]
+
+    # 이미 저장된 제목과 같은 정보도 빈 칸에 그대로 저장
+    result = ai_info.add_ai_info(AIInfoCreate(date='2025-06-01', infos=[
+        {"title": "GPT 5 출시", "content": "내용 3", "terms": []}
+    ]), db)
+    assert [info["title"] for info in result["infos"]] == ["GPT-5 출시", "gpt 5: 출시!", "GPT 5 출시"]
+    assert result["duplicate_titles"] == ["GPT 5 출시"]
+
+def test_terms_quiz_constant_query_count(make_session):
+    term_index_cache.ttl = 0
+    counts = []
+    for days in (3, 60):
+        db, counter = make_session()
+        seed_learning(db, "quiz", days)
+        counter["queries"] = 0
+        result = ai_info.get_terms_quiz("quiz", db)
+        assert result["total_terms"] == days * 12
+        assert len(result["quizzes"]) == 5
+        counts.append(counter["queries"])
+    assert counts[0] == counts[1] == 2  # 학습 이벤트 1회 + 용어 색인 1회
+
+def test_learned_terms_fixed_query_count(make_session):
+    term_index_cache.ttl = 0
+    counts = []
+    for days in (2, 120):
+        db, counter = make_session()
+        seed_learning(db, "learned", days)
+        # 용어만 따로 학습한 날짜 (AI 정보 전체 학습 기록 없음)
+        ai_info.add_ai_info(make_infos('2024-01-01'), db)
+        track_learned_term(db, "learned", '2024-01-01', 2, '2024-01-01-용어2-3')
+        db.commit()
+
+        counter["queries"] = 0
+        result = ai_info.get_learned_terms("learned", db)
+        counts.append(counter["queries"])
+        assert result["total_terms"] == days * 12 + 1
+        assert len(result["learned_dates"]) == days + 1
+        assert result["learned_dates"][0] == '2025-03-31' and result["learned_dates"][-1] == '2024-01-01'
+        assert [term["term"] for term in result["terms_by_date"]['2024-01-01']] == ['2024-01-01-용어2-3']
+        assert len(result["terms_by_date"]['2025-03-31']) == 12
+    assert counts[0] == counts[1] == 2  # 학습 이벤트 1회 + 용어 색인 IN 쿼리 1회
+
+def test_term_index_cache_and_legacy_fallback(make_session):
+    db, counter = make_session()
+    term_index_cache.ttl = 600
+    term_index_cache.clear()
+    try:
+        # 색인 도입 전 데이터: AI 정보 JSON에서 직접 읽음
+        terms = json.dumps([{"term": f"T{i}", "description": f"D{i}"} for i in range(4)])
+        db.add(AIInfo(date='2024-12-01', info1_title="t", info1_content="c", info1_terms=terms,
+                      info2_title="", info2_content="", info2_terms="[]",
+                      info3_title="", info3_content="", info3_terms="[]"))
+        db.commit()
+        first = ai_info.get_terms_quiz_by_date('2024-12-01', db)
+        assert first["total_terms"] == 4
+
+        counter["queries"] = 0
+        assert ai_info.get_terms_quiz_by_date('2024-12-01', db)["total_terms"] == 4
+        assert counter["queries"] == 0
+
+        # AI 정보를 갱신하면 캐시가 무효화됨
+        ai_info.add_ai_info(make_infos('2024-12-01', terms_per_info=1), db)
+        assert ai_info.get_terms_quiz_by_date('2024-12-01', db)["total_terms"] == 6
+    finally:
+        term_index_cache.ttl = 0
+        term_index_cache.clear()
+
+def test_distractor_pool_excludes_answer():
+    pool = DistractorPool([{"term": f"T{i}", "description": f"D{i % 50}"} for i in range(200)])
+    rng = random.Random(1)
+    for correct_id in range(len(pool)):
+        answer = pool.terms[correct_id]["description"]
+        wrong = pool.draw(3, rng, [answer], exclude_id=correct_id)
+        descriptions = [term["description"] for term in wrong]
+        assert len(descriptions) == 3 and len(set(descriptions)) == 3 and answer not in descriptions
+
+    # 풀이 작으면 가능한 만큼만 반환
+    small = DistractorPool([{"term": "A", "description": "a"}, {"term": "B", "description": "b"}])
+    assert [term["term"] for term in small.draw(3, rng, ["a"], exclude_id=0)] == ["B"]
+
+def test_terms_quiz_seeded_and_small_pool_fallback(make_session):
+    db, _ = make_session()
+    clear_pools()
+    seed_learning(db, "seeded", 3)
+    first = ai_info.get_terms_quiz("seeded", seed=42, db=db)
+    assert first == ai_info.get_terms_quiz("seeded", seed=42, db=db)
+    for quiz in first["quizzes"]:
+        options = [quiz[f"option{i}"] for i in range(1, 5)]
+        assert len(set(options)) == 4
+
+    # 용어가 2개뿐인 날짜는 전체 용어 풀에서 오답을 보충
+    ai_info.add_ai_info(AIInfoCreate(date='2025-06-01', infos=[{
+        "title": "t", "content": "c",
+        "terms": [{"term": "희귀1", "description": "희귀 설명1"}, {"term": "희귀2", "description": "희귀 설명2"}]
+    }]), db)
+    result = ai_info.get_terms_quiz_by_date('2025-06-01', seed=7, db=db)
+    assert result["total_terms"] == 2
+    assert len(result["quizzes"]) == 2
+    assert result == ai_info.get_terms_quiz_by_date('2025-06-01', seed=7, db=db)
+
+def test_daily_quiz_bundle_rotation_and_regeneration(make_session):
+    db, counter = make_session()
+    quiz_bundles.invalidate_quiz_bundles()
+    builds = {"count": 0}
+    original = quiz_bundles.build_term_quizzes
+
+    def counting_build(*args, **kwargs):
+        builds["count"] += 1
+        return original(*args, **kwargs)
+
+    quiz_bundles.build_term_quizzes = counting_build
+    try:
+        ai_info.add_ai_info(make_infos('2025-07-01'), db)
+        assert builds["count"] == quiz_bundles.QUIZ_BUNDLE_VARIANTS
+
+        counter["queries"] = 0
+        served = [ai_info.get_terms_quiz_by_date('2025-07-01', db) for _ in range(quiz_bundles.QUIZ_BUNDLE_VARIANTS + 1)]
+        assert counter["queries"] <= 1  # 첫 요청만 묶음 테이블 조회, 이후는 메모리
+        assert [result["variant"] for result in served] == list(range(quiz_bundles.QUIZ_BUNDLE_VARIANTS)) + [0]
+        assert all(len(result["quizzes"]) == 5 for result in served)
+
+        # 내용 변화 없는 저장은 재생성하지 않음
+        ai_info.add_ai_info(make_infos('2025-07-01'), db)
+        assert builds["count"] == quiz_bundles.QUIZ_BUNDLE_VARIANTS
+
+        ai_info.delete_ai_info('2025-07-01', db)
+        assert ai_info.get_terms_quiz_by_date('2025-07-01', db)["quizzes"] == []
+    finally:
+        quiz_bundles.build_term_quizzes = original
+
+def test_ai_info_etag_not_modified_skips_row_fetch(make_session):
+    db, counter = make_session()
+    ai_info.add_ai_info(make_infos('2025-08-01'), db)
+
+    response = Response()
+    infos = ai_info.get_ai_info_by_date('2025-08-01', SimpleNamespace(headers={}), response, db)
+    assert len(infos) == 3
+    etag = response.headers["ETag"]
+    assert "max-age" in response.headers["Cache-Control"]
+
+    # ETag가 일치하면 content_hash 컬럼 조회 한 번으로 304 (행 조회/직렬화 없음)
+    counter["queries"] = 0
+    not_modified = ai_info.get_ai_info_by_date('2025-08-01', SimpleNamespace(headers={"if-none-match": f'W/{etag}'}), Response(), db)
+    assert not_modified.status_code == 304 and not_modified.headers["ETag"] == etag
+    assert counter["queries"] == 1
+
+    # 내용이 바뀌면 ETag도 바뀌고 이전 ETag로는 전체 응답
+    db.query(AIInfo).filter(AIInfo.date == '2025-08-01').update({"info3_title": "", "info3_content": ""})
+    db.commit()
+    ai_info.add_ai_info(AIInfoCreate(date='2025-08-01', infos=[{"title": "새 정보", "content": "새 내용", "terms": []}]), db)
+    response = Response()
+    infos = ai_info.get_ai_info_by_date('2025-08-01', SimpleNamespace(headers={"if-none-match": etag}), response, db)
+    assert infos[2]["title"] == "새 정보" and response.headers["ETag"] != etag
+
+def test_ai_info_etag_sees_changes_from_other_workers(make_session):
+    """다른 워커가 내용을 바꾸면 이 워커도 바로 이전 ETag에 304를 보내지 않는지 확인"""
+    db, _ = make_session()
+    ai_info.add_ai_info(make_infos('2025-08-02'), db)
+    response = Response()
+    ai_info.get_ai_info_by_date('2025-08-02', SimpleNamespace(headers={}), response, db)
+    etag = response.headers["ETag"]
+    assert ai_info.get_ai_info_by_date('2025-08-02', SimpleNamespace(headers={"if-none-match": etag}), Response(), db).status_code == 304
+
+    # 이 프로세스의 무효화 경로를 거치지 않고 DB에서 직접 변경 (다른 워커의 저장과 같음)
+    db.query(AIInfo).filter(AIInfo.date == '2025-08-02').update({"info1_title": "다른 워커", "content_hash": "changed"})
+    db.commit()
+    response = Response()
+    infos = ai_info.get_ai_info_by_date('2025-08-02', SimpleNamespace(headers={"if-none-match": etag}), response, db)
+    assert infos[0]["title"] == "다른 워커" and response.headers["ETag"] == '"changed"'
+
+def test_ai_info_etag_backfills_missing_hash(make_session):
+    db, _ = make_session()
+    db.add(AIInfo(date='2024-11-01', info1_title="t", info1_content="c", info1_terms="[]",
+                  info2_title="", info2_content="", info2_terms="[]",
+                  info3_title="", info3_content="", info3_terms="[]"))
+    db.commit()
+    response = Response()
+    assert len(ai_info.get_ai_info_by_date('2024-11-01', SimpleNamespace(headers={}), response, db)) == 1
+    etag = response.headers["ETag"]
+    assert db.query(AIInfo.content_hash).filter(AIInfo.date == '2024-11-01').scalar() == etag.strip('"')
+    assert ai_info.get_ai_info_by_date('2024-11-01', SimpleNamespace(headers={"if-none-match": etag}), Response(), db).status_code == 304
+
+def test_bulk_fetch_and_cached_dates(make_session):
+    db, counter = make_session()
+    ai_info.dates_cache.invalidate("all")
+    for day in ('2025-09-01', '2025-09-02', '2025-09-05'):
+        ai_info.add_ai_info(make_infos(day, terms_per_info=1), db)
+
+    counter["queries"] = 0
+    by_range = ai_info.get_ai_info_bulk(start='2025-09-01', end='2025-09-03', db=db)
+    assert counter["queries"] == 1
+    assert list(by_range) == ['2025-09-01', '2025-09-02'] and len(by_range['2025-09-01']) == 3
+    by_list = ai_info.get_ai_info_bulk(dates='2025-09-05,2025-09-04,2025-09-05', db=db)
+    assert list(by_list) == ['2025-09-05']
+
+    assert ai_info.get_all_ai_info_dates(db) == ['2025-09-01', '2025-09-02', '2025-09-05']
+    counter["queries"] = 0
+    ai_info.get_all_ai_info_dates(db)
+    assert counter["queries"] == 0
+
+    ai_info.delete_ai_info('2025-09-02', db)
+    assert ai_info.get_all_ai_info_dates(db) == ['2025-09-01', '2025-09-05']
+
+STORY = ("OpenAI가 GPT-5를 발표했다. 새 모델은 멀티모달 추론 성능이 크게 향상되었고 "
+         "개발자를 위한 API도 함께 공개되었다. 회사는 안전성 평가 결과도 함께 발표했다.")
+
+def test_near_duplicate_detected_across_dates(make_session):
+    db, _ = make_session()
+    near_duplicates.invalidate_near_duplicates()
+    ai_info.add_ai_info(AIInfoCreate(date='2025-10-01', infos=[
+        {"title": "OpenAI, GPT-5 발표", "content": STORY, "terms": []},
+        {"title": "구글 제미나이 업데이트", "content": "구글이 제미나이 모델의 새로운 버전을 공개하며 긴 문맥 처리 능력을 강조했다.", "terms": []},
+    ]), db)
+
+    reworded = STORY.replace("크게", "대폭").replace("함께 공개되었다", "공개됐다")
+    result = ai_info.add_ai_info(AIInfoCreate(date='2025-10-03', infos=[
+        {"title": "OpenAI GPT-5 공개!", "content": reworded, "terms": []},
+        {"title": "엔비디아 실적", "content": "엔비디아가 데이터센터 매출 증가에 힘입어 분기 최대 실적을 기록했다.", "terms": []},
+    ]), db)
+    assert [(d["info_index"], d["date"], d["match_index"]) for d in result["duplicates"]] == [(0, '2025-10-01', 0)]
+    assert result["duplicates"][0]["similarity"] >= near_duplicates.NEAR_DUP_THRESHOLD
+
+    # 같은 날짜에 다시 저장해도 자기 자신은 후보가 아님
+    assert ai_info.add_ai_info(make_infos('2025-10-05'), db)["duplicates"] == []
+    check = ai_info.check_ai_info_duplicates(AIInfoCreate(date='2025-10-01', infos=[{"title": "OpenAI, GPT-5 발표", "content": STORY}]), db)
+    assert [d["date"] for d in check["duplicates"]] == ['2025-10-03']
+
+    # 삭제한 날짜는 더 이상 후보가 아님
+    ai_info.delete_ai_info('2025-10-01', db)
+    check = ai_info.check_ai_info_duplicates(AIInfoCreate(date='2025-10-09', infos=[{"title": "GPT-5", "content": STORY}]), db)
+    assert [d["date"] for d in check["duplicates"]] == ['2025-10-03']
+
+def test_near_duplicate_reindex_matches_incremental(make_session):
+    db, _ = make_session()
+    near_duplicates.invalidate_near_duplicates()
+    for day in ('2025-11-01', '2025-11-02'):
+        ai_info.add_ai_info(make_infos(day), db)
+    stored = sorted((row.date, row.info_index, row.signature) for row in db.query(near_duplicates.AIInfoSignature))
+    assert near_duplicates.reindex_all(db) == 2
+    assert sorted((row.date, row.info_index, row.signature) for row in db.query(near_duplicates.AIInfoSignature)) == stored
+
+if __name__ == "__main__":
+    from conftest import new_session as make_session
+    # 유사 중복 검사: 3년치(정보 약 3300건) 색인에서 한 건 검사 시간
+    index = near_duplicates.LSHIndex()
+    rng = random.Random(0)
+    words = [f"단어{i}" for i in range(3000)] + [f"word{i}" for i in range(3000)]
+    for i in range(3300):
+        text = ' '.join(rng.choice(words) for _ in range(80))
+        index.add((f"day{i // 3}", i % 3), f"제목 {i}", near_duplicates.minhash_signature(near_duplicates.info_text("", text)))
+    query = near_duplicates.minhash_signature(near_duplicates.info_text("", text))
+    start = time.perf_counter()
+    for _ in range(1000):
+        index.query(query)
+    print(f"📊 정보 {len(index)}건 색인에서 유사 중복 조회 1회: {(time.perf_counter() - start):.3f}ms")
+
+    term_index_cache.ttl = 0
+    for days in (7, 90, 365):
+        db, counter = make_session()
+        seed_learning(db, "bench", days)
+        counter["queries"] = 0
+        ai_info.get_terms_quiz("bench", db)
+        print(f"📊 {days:>4}일 학습 기록: 용어 퀴즈 쿼리 {counter['queries']}회")
+    sys.exit(0)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+학습 달력(연속 학습일 계산) 테스트 및 마이크로 벤치마크
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.learning_calendar import LearningCalendar, live_streak
+
+def make_history(days, end, skip_ratio=0.2, seed=7):
+    """end까지 days일 동안 일부 날짜를 건너뛴 학습 기록을 생성합니다."""
+    rng = random.Random(seed)
+    return [
+        (end - timedelta(days=i)).isoformat()
+        for i in range(days)
+        if rng.random() >= skip_ratio
+    ]
+
+def naive_streaks(dates, today):
+    """기존 방식(날짜 문자열 비교)으로 계산한 기준값"""
+    learned = sorted(set(dates))
+    max_run = run = 0
+    previous = None
+    for value in learned:
+        current = date.fromisoformat(value)
+        run = run + 1 if previous and current - previous == timedelta(days=1) else 1
+        max_run = max(max_run, run)
+        previous = current
+    current = 0
+    check = date.fromisoformat(today)
+    if check.isoformat() not in learned:
+        check -= timedelta(days=1)  # 오늘 아직 학습하지 않았으면 어제부터 확인
+    while check.isoformat() in learned:
+        current += 1
+        check -= timedelta(days=1)
+    return current, max_run
+
+def test_matches_naive_reference():
+    end = date(2025, 6, 30)
+    for seed in range(20):
+        dates = make_history(400, end, skip_ratio=0.3, seed=seed)
+        calendar = LearningCalendar(dates)
+        for today in (end, end + timedelta(days=1), end + timedelta(days=2)):
+            assert (calendar.current_streak(today.isoformat()), calendar.max_streak()) == naive_streaks(dates, today.isoformat())
+
+def test_streak_edges():
+    assert LearningCalendar().current_streak('2025-01-01') == 0
+    assert LearningCalendar().max_streak() == 0
+
+    calendar = LearningCalendar(['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-03', 'invalid'])
+    assert calendar.active_days == 3
+    assert calendar.last_run() == 3
+    assert calendar.current_streak('2025-01-04') == 3  # 어제까지 학습했으면 유지
+    assert calendar.current_streak('2025-01-05') == 0
+    assert live_streak(3, '2025-01-03', '2025-01-03') == 3
+
+def test_activity_bitmap():
+    calendar = LearningCalendar(['2025-01-02', '2025-01-04'])
+    assert calendar.activity_bitmap('2024-12-31', '2025-01-05') == [0, 0, 1, 0, 1, 0]
+    assert calendar.activity_bitmap('2025-01-04', '2025-01-04') == [1]
+    assert calendar.is_active('2025-01-02') and not calendar.is_active('2025-01-03')
+
+if __name__ == "__main__":
+    end = date.today()
+    for years in (1, 3, 10):
+        dates = make_history(365 * years, end, skip_ratio=0.05)
+        started = time.perf_counter()
+        naive = naive_streaks(dates, end.isoformat())
+        naive_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        calendar = LearningCalendar(dates)
+        result = (calendar.current_streak(end.isoformat()), calendar.max_streak())
+        calendar.activity_bitmap((end - timedelta(days=365)).isoformat(), end.isoformat())
+        calendar_ms = (time.perf_counter() - started) * 1000
+
+        assert result == naive
+        print(f"📊 {years:>2}년 기록 ({len(dates)}일): 문자열 방식 {naive_ms:.2f}ms, 비트셋 {calendar_ms:.2f}ms")
+    sys.exit(0)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+활동 로그 파이프라인/보관 기간 정리 테스트 및 벤치마크 (SQLite 사용)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import ActivityLog, UserProgress
+from app.log_utils import LogPipeline, log_activity, log_pipeline
+from app import log_partitions
+from datetime import date, datetime, timezone
+
+def make_file_engine():
+    path = os.path.join(tempfile.mkdtemp(), "logs.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+def row(i):
+    return {'action': f"테스트 {i}", 'details': "", 'log_type': 'user', 'log_level': 'info', 'session_id': f"s{i % 7}"}
+
+def test_sync_log_failure_keeps_caller_session(make_session):
+    db, _ = make_session()
+    assert not log_pipeline.running
+    log_activity(db, "로그인", username="alice")
+    assert db.query(ActivityLog).count() == 1
+
+    # 로그 테이블이 없어도 호출자의 세션은 롤백되지 않음
+    db.add(UserProgress(session_id="alice", date="2025-01-01"))
+    db.execute(text("DROP TABLE activity_logs"))
+    failed = log_pipeline.counters['failed']
+    log_activity(db, "로그인", username="alice")
+    assert log_pipeline.counters['failed'] == failed + 1
+    db.commit()
+    assert db.query(UserProgress).count() == 1
+
+def test_async_pipeline_batches_concurrent_writes():
+    engine = make_file_engine()
+    pipeline = LogPipeline(batch_size=100, flush_interval_ms=20)
+    pipeline.start(sessionmaker(bind=engine))
+
+    def produce(offset):
+        for i in range(250):
+            pipeline.enqueue(row(offset + i))
+
+    threads = [threading.Thread(target=produce, args=(n * 250,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert pipeline.flush()
+    pipeline.stop()
+
+    db = sessionmaker(bind=engine)()
+    assert db.query(ActivityLog).count() == 1000
+    assert pipeline.counters['written'] == 1000 and pipeline.counters['dropped'] == 0
+    assert pipeline.counters['batches'] < 100  # 여러 행 INSERT로 묶여서 기록됨
+
+def test_backpressure_drops_and_stop_drains():
+    engine = make_file_engine()
+    pipeline = LogPipeline(batch_size=1000, flush_interval_ms=60000, max_queue=5, enqueue_timeout_ms=0)
+    pipeline.start(sessionmaker(bind=engine))
+    results = [pipeline.enqueue(row(i)) for i in range(8)]
+    assert results.count(False) == 3 and pipeline.counters['dropped'] == 3
+    assert pipeline.stats()['queued'] == 5
+
+    # 종료 시 기록 주기를 기다리지 않고 남은 로그를 모두 기록
+    pipeline.stop()
+    assert sessionmaker(bind=engine)().query(ActivityLog).count() == 5
+
+def test_partition_helpers():
+    assert log_partitions.add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert log_partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert log_partitions.partition_name(date(2025, 3, 1)) == "activity_logs_y2025m03"
+    assert log_partitions.parse_partition_name("activity_logs_y2025m03") == date(2025, 3, 1)
+    assert log_partitions.parse_partition_name("activity_logs_default") is None
+    assert log_partitions.retention_cutoff(date(2025, 3, 15), 12) == date(2024, 3, 1)
+    assert log_partitions.retention_cutoff(date(2025, 3, 15), 0) is None
+
+    statements = log_partitions.conversion_statements(date(2024, 11, 20), date(2025, 1, 5), ahead=2)
+    created = [s.split()[5] for s in statements if s.startswith("CREATE TABLE IF NOT EXISTS activity_logs_y")]
+    assert created == ["activity_logs_y2024m11", "activity_logs_y2024m12", "activity_logs_y2025m01",
+                       "activity_logs_y2025m02", "activity_logs_y2025m03"]
+    # 행을 옮긴 뒤에 기존 테이블을 삭제
+    order = [i for i, s in enumerate(statements) if s.lstrip().startswith(("INSERT INTO", "DROP TABLE"))]
+    assert "INSERT" in statements[order[0]] and "DROP" in statements[order[1]]
+
+    # 기본 파티션의 행을 뺀 뒤 파티션을 만들고, 만든 뒤에 다시 넣음
+    moved = log_partitions.move_default_rows_statements(date(2025, 3, 1))
+    assert "DELETE FROM activity_logs_default" in moved[1] and "'2025-03-01'" in moved[1] and "'2025-04-01'" in moved[1]
+    assert moved[2] == log_partitions.create_partition_statement(date(2025, 3, 1))
+    assert moved[3].startswith("INSERT INTO activity_logs SELECT")
+
+def test_retention_deletes_old_rows_without_partitions(make_session):
+    db, _ = make_session()
+    for month in range(1, 13):
+        for _ in range(3):
+            db.add(ActivityLog(action="오래된 로그", created_at=datetime(2024, month, 10, tzinfo=timezone.utc)))
+    db.add(ActivityLog(action="최근 로그", created_at=datetime(2025, 3, 1, tzinfo=timezone.utc)))
+    db.commit()
+
+    # 기본값(보관 기간 0)에서는 아무것도 삭제하지 않음
+    assert log_partitions.run_log_maintenance(db, today=date(2025, 3, 15))['deleted_rows'] == 0
+    assert db.query(ActivityLog).count() == 37
+
+    original = log_partitions.LOG_RETENTION_DELETE_BATCH, log_partitions.LOG_RETENTION_MONTHS
+    log_partitions.LOG_RETENTION_DELETE_BATCH, log_partitions.LOG_RETENTION_MONTHS = 4, 12
+    try:
+        report = log_partitions.run_log_maintenance(db, today=date(2025, 3, 15))
+    finally:
+        log_partitions.LOG_RETENTION_DELETE_BATCH, log_partitions.LOG_RETENTION_MONTHS = original
+    # 2024년 3월 1일 이전(1~2월) 로그만 삭제
+    assert report['cutoff'] == '2024-03-01' and report['deleted_rows'] == 6 and report['partitions'] == []
+    assert db.query(ActivityLog).count() == 31
+
+def test_postgres_partition_maintenance():
+    """PostgreSQL에서 파티션 변환, 기본 파티션 행 이동, 기본 파티션 보관 기간 정리를 확인 (TEST_POSTGRES_URL 지정 시에만)
+
+    지정한 DB의 activity_logs 테이블을 지우고 다시 만들므로 테스트 전용 DB를 사용하세요.
+    """
+    import pytest
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL이 없어 PostgreSQL 파티션 테스트를 건너뜁니다")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS activity_logs CASCADE"))
+    ActivityLog.__table__.create(bind=engine)
+    db = sessionmaker(bind=engine)()
+    count = lambda table: db.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    at = lambda year, month: datetime(year, month, 10, tzinfo=timezone.utc)
+    today = date(2025, 3, 15)
+    try:
+        for created_at in (at(2023, 1), at(2025, 3), at(2025, 5)):
+            db.add(ActivityLog(action="기존 로그", created_at=created_at))
+        db.commit()
+        assert log_partitions.convert_to_partitioned(db, today)
+        assert count("activity_logs") == 3 and count("activity_logs_y2025m05") == 1
+
+        # 파티션이 없는 달의 로그는 기본 파티션에 들어갔다가 파티션을 만들 때 옮겨짐
+        db.add(ActivityLog(action="파티션 없는 달", created_at=at(2025, 8)))
+        db.commit()
+        assert count("activity_logs_default") == 1
+        names = log_partitions.ensure_partitions(db, today, ahead=5)
+        assert names[-1] == "activity_logs_y2025m08"
+        assert count("activity_logs_y2025m08") == 1 and count("activity_logs_default") == 0
+
+        # 보관 기간 정리: 오래된 월 파티션은 삭제하고, 기본 파티션의 오래된 행만 지움
+        report = log_partitions.apply_retention(db, today, months=12)
+        assert "activity_logs_y2023m01" in report['dropped_partitions'] and count("activity_logs") == 3
+        for created_at in (at(2023, 6), at(2023, 7), at(2026, 1)):
+            db.add(ActivityLog(action="기본 파티션", created_at=created_at))
+        db.commit()
+        original = log_partitions.LOG_RETENTION_DELETE_BATCH
+        log_partitions.LOG_RETENTION_DELETE_BATCH = 1
+        try:
+            report = log_partitions.apply_retention(db, today, months=12)
+        finally:
+            log_partitions.LOG_RETENTION_DELETE_BATCH = original
+        assert report['dropped_partitions'] == [] and report['deleted_rows'] == 2
+        assert count("activity_logs_default") == 1
+    finally:
+        db.close()
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS activity_logs CASCADE"))
+        engine.dispose()
+
+if __name__ == "__main__":
+    engine = make_file_engine()
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    start = time.perf_counter()
+    for i in range(500):
+        log_activity(db, f"동기 {i}")
+    sync_ms = (time.perf_counter() - start) * 1000
+
+    log_pipeline.start(factory)
+    start = time.perf_counter()
+    for i in range(500):
+        log_activity(db, f"비동기 {i}")
+    enqueue_ms = (time.perf_counter() - start) * 1000
+    log_pipeline.flush()
+    log_pipeline.stop()
+    print(f"📊 로그 500건: 요청 안에서 동기 기록 {sync_ms:.1f}ms, 파이프라인 큐 적재 {enqueue_ms:.1f}ms "
+          f"(배치 {log_pipeline.counters['batches']}회)")
+    sys.exit(0)
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+활동 로그 조회 API 테스트 및 벤치마크 (SQLite 사용)
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from types import SimpleNamespace
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import insert, text
+
+from app.models import ActivityLog
+from app.api import logs as logs_api
+from app.log_queries import count_cache, decode_cursor, ensure_text_indexes, filter_logs
+from app.log_stats import LogStatsCounter, aggregate_log_stats, log_stats_counter
+from app.log_utils import LogPipeline, log_activity
+from app.log_export import export_chunks
+from app.log_stream import LogHub, log_hub, make_predicate, notify_payloads
+
+ADMIN = SimpleNamespace(id=1, username="admin", role="admin")
+BASE_TIME = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+def seed(db, count, same_time_every=1):
+    """count건의 로그를 넣습니다. same_time_every건씩 같은 created_at을 가짐"""
+    rows = [{
+        'action': f"로그 {i}",
+        'username': "alice" if i % 2 else "bob",
+        'log_type': 'user',
+        'log_level': 'error' if i % 5 == 0 else 'info',
+        'created_at': BASE_TIME + timedelta(seconds=i // same_time_every)
+    } for i in range(count)]
+    for offset in range(0, count, 50000):
+        db.execute(insert(ActivityLog).values(rows[offset:offset + 50000]))
+    db.commit()
+
+def get_logs(db, **params):
+    return logs_api.get_logs(**{
+        "skip": 0, "limit": 100, "log_type": None, "log_level": None, "username": None, "action": None,
+        "start_date": None, "end_date": None, "cursor": None, "direction": "next", "pagination": "offset",
+        "count": None, "match": None, "current_user": ADMIN, "db": db, **params
+    })
+
+def test_cursor_pages_match_offset_order_with_ties(make_session):
+    db, _ = make_session()
+    seed(db, 23, same_time_every=3)
+    expected = [log["id"] for log in get_logs(db, limit=100)["logs"]]
+
+    seen = []
+    page = get_logs(db, pagination="cursor", limit=5)
+    assert "skip" not in page and page["prev_cursor"] is None and page["total"] is None
+    while True:
+        seen += [log["id"] for log in page["logs"]]
+        if page["next_cursor"] is None:
+            break
+        page = get_logs(db, cursor=page["next_cursor"], limit=5)
+    # 같은 시각의 로그도 id로 구분되어 빠지거나 겹치지 않음
+    assert seen == expected and len(seen) == 23
+
+    # 마지막 페이지에서 이전 페이지로 돌아가면 앞 페이지와 같은 로그
+    back = get_logs(db, cursor=page["prev_cursor"], direction="prev", limit=5)
+    assert [log["id"] for log in back["logs"]] == expected[15:20]
+    assert back["next_cursor"] is not None and back["prev_cursor"] is not None
+
+def test_cursor_with_filters_and_counts(make_session):
+    db, _ = make_session()
+    seed(db, 40)
+    count_cache.clear()
+    page = get_logs(db, pagination="cursor", log_level="error", limit=3, count="estimate")
+    assert [log["level"] for log in page["logs"]] == ["error"] * 3
+    assert page["total"] == 8 and page["total_is_estimate"] is True
+
+    # 근사치는 짧은 시간 캐시되므로 새 로그가 바로 반영되지 않음
+    seed(db, 5)
+    cached = get_logs(db, pagination="cursor", log_level="error", limit=3, count="estimate")
+    assert cached["total"] == 8
+    exact = get_logs(db, pagination="cursor", log_level="error", limit=3, count="exact")
+    assert exact["total"] == 9 and exact["total_is_estimate"] is False
+
+def test_offset_mode_is_unchanged_and_bad_params_rejected(make_session):
+    db, _ = make_session()
+    seed(db, 12)
+    page = get_logs(db, skip=10, limit=5)
+    assert page["skip"] == 10 and page["total"] == 12 and len(page["logs"]) == 2
+    assert page["logs"][0]["action"] == "로그 1"
+
+    for params in ({"cursor": "not-a-cursor"}, {"pagination": "cursor", "direction": "sideways"}, {"count": "all"}):
+        try:
+            get_logs(db, **params)
+            assert False, params
+        except HTTPException as e:
+            assert e.status_code == 400
+    try:
+        decode_cursor("e30")
+        assert False
+    except ValueError:
+        pass
+
+def test_text_match_modes_and_prefix_index(make_session):
+    db, _ = make_session()
+    for username, action in (("Alice", "로그인"), ("malice", "로그아웃"), ("bob", "100% 완료"), ("bob", "100개 완료")):
+        db.add(ActivityLog(username=username, action=action, created_at=BASE_TIME))
+    db.commit()
+
+    def users(**params):
+        return sorted(log["user"] for log in get_logs(db, **params)["logs"])
+
+    # 트라이그램 색인이 없는 DB에서는 기본이 대소문자 무시 접두어 일치
+    assert users(username="ali") == ["Alice"]
+    assert users(username="ali", match="contains") == ["Alice", "malice"]
+    assert users(username="ALICE", match="exact") == ["Alice"]
+    # 검색어의 %는 와일드카드가 아니라 문자 그대로
+    assert [log["action"] for log in get_logs(db, action="100%", match="contains")["logs"]] == ["100% 완료"]
+    try:
+        get_logs(db, username="a", match="fuzzy")
+        assert False
+    except HTTPException as e:
+        assert e.status_code == 400
+
+    assert ensure_text_indexes(db) is False
+    query = filter_logs(db.query(ActivityLog.id), username="ali", match="prefix")
+    statement = query.statement.compile(compile_kwargs={"literal_binds": True})
+    plan = " ".join(str(row[-1]) for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")))
+    assert "ix_activity_logs_username_lower" in plan, plan
+
+def legacy_stats(db, now):
+    """기존 /stats 구현처럼 조건마다 COUNT를 따로 실행한 결과"""
+    count = lambda *conditions: db.query(ActivityLog).filter(*conditions).count()
+    return {
+        "total_logs": db.query(ActivityLog).count(),
+        "today_logs": count(ActivityLog.created_at >= now.replace(hour=0, minute=0, second=0, microsecond=0)),
+        "by_level": {level: count(ActivityLog.log_level == level) for level in ("error", "warning", "info", "success")},
+        "by_type": {log_type: count(ActivityLog.log_type == log_type) for log_type in ("user", "system", "security")}
+    }
+
+def test_stats_single_query_matches_separate_counts(make_session):
+    db, counter = make_session()
+    seed(db, 30)
+    db.add(ActivityLog(action="보안", log_type="security", log_level="warning", created_at=BASE_TIME + timedelta(days=1)))
+    db.commit()
+    now = BASE_TIME + timedelta(days=1, hours=1)
+    before = counter["queries"]
+    stats = aggregate_log_stats(db, now.replace(hour=0))
+    assert counter["queries"] == before + 1
+    assert stats == legacy_stats(db, now)
+
+def test_stats_counter_follows_logging_path_without_queries(make_session):
+    db, counter = make_session()
+    seed(db, 10)
+    now = BASE_TIME + timedelta(hours=1)
+    stats_counter = LogStatsCounter(ttl=3600)
+    assert stats_counter.get(db, now)["total_logs"] == 10
+
+    before = counter["queries"]
+    stats_counter.record([{'log_type': 'system', 'log_level': 'error', 'created_at': now},
+                          {'log_type': 'user', 'log_level': 'info', 'created_at': BASE_TIME - timedelta(days=1)}])
+    stats = stats_counter.get(db, now)
+    assert counter["queries"] == before
+    assert stats["total_logs"] == 12 and stats["today_logs"] == 11
+    assert stats["by_type"]["system"] == 1 and stats["by_level"]["error"] == 3
+
+    # 날짜가 바뀌거나 invalidate되면 다시 집계
+    assert stats_counter.get(db, now + timedelta(days=1))["today_logs"] == 0
+    assert stats_counter.refreshes == 2
+    stats_counter.invalidate()
+    stats_counter.get(db, now + timedelta(days=1))
+    assert stats_counter.refreshes == 3
+
+def test_stats_endpoint_counts_pipeline_writes_and_clear(make_session):
+    db, _ = make_session()
+    log_stats_counter.invalidate()
+    seed(db, 4)
+    assert logs_api.get_log_stats(current_user=ADMIN, db=db)["total_logs"] == 4
+    log_activity(db, "로그인", log_type="security", log_level="success")
+    stats = logs_api.get_log_stats(current_user=ADMIN, db=db)
+    assert stats["total_logs"] == 5 and stats["by_type"]["security"] == 1
+
+    logs_api.clear_logs(current_user=ADMIN, db=db)
+    # 삭제 기록 한 건만 남음
+    stats = logs_api.get_log_stats(current_user=ADMIN, db=db)
+    assert stats["total_logs"] == 1 and stats["by_level"]["warning"] == 1
+
+def test_hub_filters_and_bounds_subscriber_queues():
+    async def scenario():
+        hub = LogHub(max_queue=3, max_subscribers=2)
+        errors = hub.subscribe(make_predicate(log_level="error"))
+        alice = hub.subscribe(make_predicate(username="ALI"))
+        assert hub.subscribe() is None
+
+        logs = [ActivityLog(id=i, username="alice" if i % 2 else "bob", action=f"로그 {i}",
+                            log_level="error" if i % 3 == 0 else "info", created_at=BASE_TIME) for i in range(1, 10)]
+        # 로그 기록 스레드에서 전달
+        thread = threading.Thread(target=hub.publish, args=(logs,))
+        thread.start()
+        thread.join()
+
+        assert [log_id for log_id, _ in await errors.next_batch(1)] == ["3", "6", "9"]
+        # 대기열은 3개까지, 오래된 로그부터 버림
+        assert [log_id for log_id, _ in await alice.next_batch(1)] == ["5", "7", "9"] and alice.dropped == 2
+        assert await alice.next_batch(0.01) == []
+        alice.close()
+        assert hub.subscriber_count == 1
+    asyncio.run(scenario())
+
+def test_pipeline_write_publishes_rows_to_stream_endpoint(make_session):
+    db, _ = make_session()
+    engine = db.get_bind()
+
+    async def scenario():
+        connected = {"value": True}
+
+        async def is_disconnected():
+            return not connected["value"]
+
+        request = SimpleNamespace(headers={}, is_disconnected=is_disconnected)
+        response = await logs_api.stream_logs(request, log_type="security", log_level=None, username=None,
+                                              action=None, current_user=ADMIN, db=db)
+        body = response.body_iterator
+        assert await body.__anext__() == "retry: 3000\n\n"
+        assert log_hub.subscriber_count == 1
+
+        # 구독자가 있을 때만 RETURNING으로 기록된 행을 받아 전달 (조건에 맞지 않는 로그는 제외)
+        pipeline = LogPipeline()
+        await asyncio.to_thread(pipeline.write, [
+            {'action': "로그인 실패", 'log_type': 'security', 'log_level': 'warning', 'username': "mallory",
+             'created_at': BASE_TIME},
+            {'action': "학습", 'log_type': 'user', 'log_level': 'info', 'username': "alice", 'created_at': BASE_TIME}
+        ], engine)
+        event = await body.__anext__()
+        assert event.startswith("id: 1\nevent: log\ndata: ") and "로그인 실패" in event and "학습" not in event
+
+        connected["value"] = False
+        await body.aclose()
+        assert log_hub.subscriber_count == 0
+    asyncio.run(scenario())
+
+def test_transaction_logs_reach_stats_and_stream(make_session):
+    """호출자 트랜잭션으로 기록한 로그(학습 기록 일괄 반영)도 커밋 후 통계 카운터와 실시간 스트림에 반영되는지 확인"""
+    from app.api import user_progress
+    from app.schemas import LearningEventBatch
+    db, _ = make_session()
+    log_stats_counter.invalidate()
+    seed(db, 3)
+    assert logs_api.get_log_stats(current_user=ADMIN, db=db)["total_logs"] == 3
+    refreshes = log_stats_counter.refreshes
+
+    async def scenario():
+        connected = {"value": True}
+
+        async def is_disconnected():
+            return not connected["value"]
+
+        request = SimpleNamespace(headers={}, is_disconnected=is_disconnected)
+        response = await logs_api.stream_logs(request, log_type="user", log_level=None, username=None,
+                                              action="일괄", current_user=ADMIN, db=db)
+        body = response.body_iterator
+        assert await body.__anext__() == "retry: 3000\n\n"
+
+        events = [{"type": "info", "session_id": session_id, "date": '2025-03-01', "info_index": 0}
+                  for session_id in ("a", "b")]
+        events.append({"type": "term", "session_id": "a", "date": '2025-03-01', "info_index": 0})  # 오류 이벤트
+        result = await asyncio.to_thread(user_progress.ingest_learning_events, LearningEventBatch(events=events),
+                                         SimpleNamespace(client=None, headers={}), db)
+        assert result["applied"] == 2
+        received = ""
+        while received.count("event: log") < 2:
+            received += await asyncio.wait_for(body.__anext__(), 5)
+        assert received.count("학습 기록 일괄 반영") == 2
+
+        connected["value"] = False
+        await body.aclose()
+    asyncio.run(scenario())
+
+    stats = logs_api.get_log_stats(current_user=ADMIN, db=db)
+    assert stats["total_logs"] == 5 and log_stats_counter.refreshes == refreshes
+
+    # 롤백된 트랜잭션의 로그는 반영하지 않음
+    log_activity(db, "취소될 로그", commit=False)
+    db.rollback()
+    db.commit()
+    assert logs_api.get_log_stats(current_user=ADMIN, db=db)["total_logs"] == 5
+
+def test_notify_payloads_fit_channel_limit():
+    payloads = notify_payloads(range(1000000, 1003000))
+    assert all(len(payload) <= 7900 for payload in payloads) and len(payloads) > 1
+    assert [int(log_id) for payload in payloads for log_id in payload.split(',')] == list(range(1000000, 1003000))
+
+def export(db, **params):
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+    response = logs_api.export_logs(**{
+        "format": "ndjson", "gzip": False, "log_type": None, "log_level": None, "username": None, "action": None,
+        "start_date": None, "end_date": None, "match": None, "current_user": ADMIN, "db": db, **params
+    })
+    chunks = asyncio.run(collect())
+    return response, b"".join(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8") for chunk in chunks)
+
+def test_export_streams_ndjson_csv_and_gzip(make_session):
+    db, _ = make_session()
+    seed(db, 25)
+    db.add(ActivityLog(action='쉼표, "따옴표"\n줄바꿈', log_type="user", log_level="error", username="bob",
+                       created_at=BASE_TIME + timedelta(hours=1)))
+    db.commit()
+
+    response, body = export(db, log_level="error")
+    assert response.media_type == "application/x-ndjson"
+    assert 'filename="activity_logs_' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+    # 오래된 순, 조건 적용
+    assert [row["action"] for row in rows] == [f"로그 {i}" for i in range(0, 25, 5)] + ['쉼표, "따옴표"\n줄바꿈']
+
+    _, body = export(db, format="csv", gzip=True, username="bob", match="exact")
+    text_body = gzip.decompress(body).decode("utf-8")
+    assert text_body.startswith("\ufeffid,timestamp,type,level,user,user_id,session_id,action")
+    rows = list(csv.DictReader(io.StringIO(text_body.lstrip("\ufeff"))))
+    assert len(rows) == 14 and rows[-1]["action"] == '쉼표, "따옴표"\n줄바꿈'
+
+    # 내보내기 자체도 기록됨
+    assert db.query(ActivityLog).filter(ActivityLog.action == "로그 내보내기").count() == 2
+    try:
+        export(db, format="xml")
+        assert False
+    except HTTPException as e:
+        assert e.status_code == 400
+
+def test_export_chunks_are_bounded_by_batch_size(make_session):
+    db, _ = make_session()
+    seed(db, 2500)
+    chunks = list(export_chunks(db.get_bind(), {}, "ndjson", batch_size=1000))
+    assert [chunk.count("\n") for chunk in chunks] == [1000, 1000, 500]
+
+def bench_text_match(make_session, rows):
+    """사용자명 검색: 색인 없는 부분 일치(전체 스캔)와 색인을 타는 접두어 일치 비교
+
+    BENCH_DATABASE_URL로 pg_trgm이 있는 PostgreSQL을 지정하면 트라이그램 부분 일치도 함께 측정합니다.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.database import Base
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+    else:
+        db, _ = make_session()
+    if db.query(ActivityLog).count() < rows:
+        for offset in range(0, rows, 50000):
+            db.execute(insert(ActivityLog).values([{
+                'action': f"학습 {i % 997}", 'username': f"user{i % 20011:05d}", 'log_type': 'user', 'log_level': 'info',
+                'created_at': BASE_TIME + timedelta(seconds=i)
+            } for i in range(offset, min(offset + 50000, rows))]))
+            db.commit()
+        if url:
+            db.execute(text("ANALYZE activity_logs"))
+            db.commit()
+
+    def measure(label, mode):
+        start = time.perf_counter()
+        found = filter_logs(db.query(ActivityLog.id), username="user1234", match=mode).count()
+        print(f"📊 {label}: {(time.perf_counter() - start) * 1000:.1f}ms ({found}건)")
+
+    measure("부분 일치(색인 없음)", "contains")
+    trigram = ensure_text_indexes(db)
+    measure("접두어 일치(lower 색인)", "prefix")
+    if trigram:
+        measure("부분 일치(트라이그램 색인)", "contains")
+
+def bench_export(make_session, rows):
+    """로그 rows건을 CSV로 내보낼 때 메모리 최고 사용량 (행 수가 늘어도 일정해야 함)"""
+    import tracemalloc
+    db, _ = make_session()
+    seed(db, rows)
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in export_chunks(db.get_bind(), {}, "csv"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"📊 내보내기 {rows}건: {(time.perf_counter() - start) * 1000:.0f}ms, "
+          f"출력 {size / 1024 / 1024:.1f}MB, 최고 메모리 {peak / 1024 / 1024:.2f}MB")
+
+if __name__ == "__main__":
+    from conftest import new_session as make_session
+    if sys.argv[1:2] == ["export"]:
+        # python test_logs.py export
+        for rows in (50000, 200000):
+            bench_export(make_session, rows)
+        sys.exit(0)
+    if sys.argv[1:2] == ["search"]:
+        # python test_logs.py search [행 수]
+        bench_text_match(make_session, int(sys.argv[2]) if len(sys.argv) > 2 else 2000000)
+        sys.exit(0)
+
+    db, _ = make_session()
+    seed(db, 50000)
+    for label, params in (("첫 페이지", {}), ("깊은 페이지", {"skip": 49000})):
+        start = time.perf_counter()
+        get_logs(db, limit=100, count="none", **params)
+        print(f"📊 OFFSET {label}: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for label, compute in (("조건별 COUNT 10회", lambda: legacy_stats(db, BASE_TIME)),
+                           ("FILTER 집계 1회", lambda: aggregate_log_stats(db, BASE_TIME)),
+                           ("스트리밍 카운터", lambda: log_stats_counter.get(db))):
+        compute()
+        start = time.perf_counter()
+        for _ in range(10):
+            compute()
+        print(f"📊 로그 통계 {label}: {(time.perf_counter() - start) * 100:.2f}ms")
+
+    page = get_logs(db, pagination="cursor", limit=100)
+    for _ in range(489):
+        page = get_logs(db, cursor=page["next_cursor"], limit=100)
+    start = time.perf_counter()
+    get_logs(db, cursor=page["next_cursor"], limit=100)
+    print(f"📊 커서 깊은 페이지: {(time.perf_counter() - start) * 1000:.1f}ms")
+    sys.exit(0)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+검색 색인/검색 API 테스트 (SQLite 메모리 DB, 프로세스 내 역색인 사용)
+"""
+
+import os
+import sys
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import HTTPException
+
+from app.models import Prompt, Term
+from app.schemas import AIInfoCreate, BaseContentCreate, PromptCreate
+from app.api import ai_info, base_content, prompt, search as search_api
+from app.search_index import InvertedIndex, invalidate_search_documents, rebuild_search_index, tokenize
+
+def test_tokenize_korean_bigrams_and_words():
+    assert tokenize("머신러닝은 GPT-4와") == ['머신', '신러', '러닝', '닝은', 'gpt4', '와']
+    assert tokenize("  ") == []
+
+def test_search_incremental_updates_and_ranking(make_session):
+    db, counter = make_session()
+    invalidate_search_documents()
+    ai_info.add_ai_info(AIInfoCreate(date='2025-05-01', infos=[
+        {"title": "머신러닝 기초", "content": "지도학습과 비지도학습", "terms": [{"term": "과적합", "description": "훈련 데이터에 지나치게 맞춤"}]},
+        {"title": "GPT 소식", "content": "새로운 언어 모델 발표", "terms": []},
+    ]), db)
+    base_content.add_base_content(BaseContentCreate(title="딥러닝 입문", content="신경망과 머신러닝의 관계", category="기초"), db)
+
+    result = search_api.search_content("머신러닝", db=db)
+    assert result["total"] == 2
+    # 제목에 있는 문서가 본문에만 있는 문서보다 먼저
+    assert [hit["type"] for hit in result["results"]] == ['ai_info', 'base_content']
+    assert result["results"][0]["id"] == '2025-05-01'
+    assert search_api.search_content("과적합", db=db)["results"][0]["id"] == '2025-05-01'
+    assert search_api.search_content("머신러닝", type="base_content", db=db)["total"] == 1
+
+    # 갱신/삭제는 바뀐 문서만 다시 읽어 반영
+    db.add(Prompt(title="요약 프롬프트", content="기사를 세 줄로 요약", category="요약"))
+    db.commit()
+    prompt_id = db.query(Prompt.id).scalar()
+    prompt.update_prompt(prompt_id, PromptCreate(title="번역 프롬프트", content="머신러닝 논문을 번역", category="번역"), db)
+    counter["queries"] = 0
+    assert search_api.search_content("머신러닝", db=db)["total"] == 3
+    assert counter["queries"] == 1
+    assert search_api.search_content("요약", db=db)["total"] == 0
+
+    ai_info.delete_ai_info('2025-05-01', db)
+    prompt.delete_prompt(prompt_id, db)
+    assert [hit["type"] for hit in search_api.search_content("머신러닝", db=db)["results"]] == ['base_content']
+
+def test_search_pagination_and_rebuild(make_session):
+    db, _ = make_session()
+    for i in range(25):
+        db.add(Term(term=f"용어{i}", description=f"트랜스포머 관련 설명 {i}"))
+    db.commit()
+    assert rebuild_search_index(db) == 25
+
+    first = search_api.search_content("트랜스포머", page=1, size=10, db=db)
+    last = search_api.search_content("트랜스포머", page=3, size=10, db=db)
+    assert first["total"] == 25 and len(first["results"]) == 10 and len(last["results"]) == 5
+    assert not {hit["id"] for hit in first["results"]} & {hit["id"] for hit in last["results"]}
+    assert search_api.search_content("?!", db=db)["total"] == 0
+
+    for bad in ({"type": "unknown"}, {"size": 0}, {"page": 0}):
+        try:
+            search_api.search_content("트랜스포머", db=db, **bad)
+            assert False, bad
+        except HTTPException as e:
+            assert e.status_code == 400
+
+def test_inverted_index_remove_cleans_postings():
+    index = InvertedIndex()
+    index.add(('term', '1'), "A", "", ['ai'], ['모델'])
+    index.add(('term', '1'), "A", "", ['ai'], [])
+    assert '모델' not in index.postings
+    index.remove(('term', '1'))
+    assert not index.postings and len(index) == 0
+
+if __name__ == "__main__":
+    from conftest import new_session as make_session
+    import time
+    db, _ = make_session()
+    for i in range(5000):
+        db.add(Term(term=f"용어{i}", description=f"대규모 언어 모델 설명 {i % 100} 트랜스포머 {i}"))
+    db.commit()
+    rebuild_search_index(db)
+    search_api.search_content("언어 모델", db=db)
+    start = time.perf_counter()
+    for _ in range(100):
+        search_api.search_content("언어 모델", db=db)
+    print(f"📊 문서 5000개 검색 100회: {(time.perf_counter() - start) * 1000:.1f}ms")
+    sys.exit(0)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+텍스트 정규화 테스트 및 벤치마크 (이전 re.sub 두 번 구현과 결과 비교)
+"""
+
+import re
+import sys
+import time
+
+from app.text_normalize import normalize_text, normalize_many, duplicate_indices
+
+def legacy_normalize_text(text):
+    text = text.lower()
+    text = re.sub(r'[-–—:·.,!?"\'\\|/]', '', text)
+    text = re.sub(r'\s+', '', text)
+    return text
+
+TITLES = [
+    "OpenAI, GPT-5 발표: 멀티모달 추론 성능 \"대폭\" 향상 — 개발자 API 공개!",
+    "Google DeepMind unveils Gemini 2.0: faster, cheaper, multimodal",
+    "메타, 오픈소스 LLM 'Llama 4' 공개… 한국어 성능은?",
+    "Anthropic’s Claude gets computer-use / tool APIs",
+    "네이버 하이퍼클로바X, 기업용 AI 에이전트 출시",
+    "삼성전자·SK하이닉스 HBM4 양산 경쟁 본격화",
+    "EU AI Act 시행 1년… 규제 대응은 어디까지 왔나?",
+    "Mistral releases Codestral 2 — open weights | 32k context",
+    "생성형 AI 저작권 소송, 미국 법원 첫 판결",
+    "NVIDIA Blackwell B200: 학습 속도 4배\t추론 30배",
+]
+
+def test_matches_legacy_normalization():
+    samples = TITLES + ["", "  공백\u3000전각\n줄바꿈  ", "ΟΔΟΣ Σ", "a\\b|c/d"]
+    assert [normalize_text(text) for text in samples] == [legacy_normalize_text(text) for text in samples]
+    assert normalize_many(samples) == [legacy_normalize_text(text) for text in samples]
+    # 구분자 문자가 들어 있어도 항목별로 처리
+    assert normalize_many(["a\x00B", "C"]) == ["a\x00b", "c"]
+    assert normalize_many([]) == []
+
+def test_duplicate_indices():
+    titles = ["GPT-5 발표!", "gpt5 발표", "Gemini 2.0", "GPT 5: 발표"]
+    assert duplicate_indices(titles) == [1, 3]
+
+def benchmark(label, fn, rounds=2000):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"📊 {label:<24} {elapsed:8.1f}ms")
+    return elapsed
+
+if __name__ == "__main__":
+    titles = TITLES * 100
+    normalize_text.cache_clear()
+    legacy = benchmark("기존 re.sub 2회", lambda: [legacy_normalize_text(t) for t in titles], 200)
+    uncached = benchmark("컴파일 패턴 (캐시 없음)", lambda: [normalize_text.__wrapped__(t) for t in titles], 200)
+    cached = benchmark("컴파일 패턴 + 캐시", lambda: [normalize_text(t) for t in titles], 200)
+    batch = benchmark("normalize_many", lambda: normalize_many(titles), 200)
+    print(f"✅ 속도 향상: 캐시 없음 {legacy / uncached:.1f}배, 캐시 {legacy / cached:.1f}배, 일괄 {legacy / batch:.1f}배")
+    sys.exit(0)
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+사용자 학습 진행상황 API 테스트 및 벤치마크 (SQLite 메모리 DB 사용)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from datetime import date, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import UserProgress, ActivityLog, UserAchievement, LearnedInfoEvent, LearnedTermEvent, QuizAttempt, SessionStatsCounter
+from app.schemas import LearningEventBatch
+from app.api import user_progress
+from app.progress_store import migrate_legacy_rows, record_learned_info
+from app import stats_counters
+from app.stats_counters import get_counters, rebuild_counters, reconcile_counters, run_reconcile_cycle, take_rebuild_queue, track_learned_info
+from app.progress_stats import stats_cache
+from app.cache import ResponseCache
+
+# 캐시 테스트 외에는 통계 캐시를 끄고 매번 DB에서 계산
+pytestmark = pytest.mark.usefixtures("no_stats_cache")
+
+def seed_history(db, session_id, days, end=None):
+    """지정한 일수만큼 AI 정보/용어/퀴즈 학습 기록을 생성합니다."""
+    end = end or date.today()
+    for i in range(days):
+        day = (end - timedelta(days=i)).strftime('%Y-%m-%d')
+        db.add(UserProgress(session_id=session_id, date=day, learned_info=json.dumps([0, 1])))
+        db.add(UserProgress(session_id=session_id, date=f'__terms__{day}_0', learned_info=json.dumps([f'term{i}'])))
+        db.add(UserProgress(session_id=session_id, date=f'__quiz__{day}_1', stats=json.dumps({'correct': 4, 'total': 5, 'score': 80})))
+    db.add(UserProgress(session_id=session_id, date='__stats__', stats=json.dumps({'quiz_score': 80, 'achievements': []})))
+    db.commit()
+
+def count_stats_queries(make_session, days):
+    db, counter = make_session()
+    seed_history(db, "bench", days)
+    counter["queries"] = 0
+    started = time.perf_counter()
+    result = user_progress.get_user_stats("bench", db)
+    elapsed = time.perf_counter() - started
+    return counter["queries"], elapsed, result
+
+def test_user_stats_totals(make_session):
+    queries, _, result = count_stats_queries(make_session, 10)
+    assert result["total_learned"] == 20
+    assert result["total_terms_learned"] == 10
+    assert result["cumulative_quiz_correct"] == 40
+    assert result["cumulative_quiz_total"] == 50
+    assert result["cumulative_quiz_score"] == 80
+    assert result["streak_days"] == 10
+
+def test_user_stats_constant_query_count(make_session):
+    short_queries, _, _ = count_stats_queries(make_session, 5)
+    long_queries, _, _ = count_stats_queries(make_session, 365)
+    assert short_queries == long_queries == 1
+
+def test_legacy_migration_keeps_stats(make_session):
+    db, _ = make_session()
+    seed_history(db, "legacy", 30)
+    before = user_progress.get_user_stats("legacy", db)
+    progress_before = user_progress.get_user_progress("legacy", db)
+
+    result = migrate_legacy_rows(db)
+    assert result["rows"] == 90
+    assert db.query(UserProgress).count() == 1  # __stats__ 행만 남음
+
+    # 마이그레이션 후 새 이벤트가 섞여도 중복 집계되지 않음
+    today = date.today().strftime('%Y-%m-%d')
+    record_learned_info(db, "legacy", today, 0)
+    db.commit()
+    assert user_progress.get_user_stats("legacy", db) == before
+    assert user_progress.get_user_progress("legacy", db) == progress_before
+
+def test_counters_match_reconcile(make_session):
+    db, counter = make_session()
+    for day in ('2025-01-01', '2025-01-02', '2025-01-03', '2025-01-05', '2025-01-06'):
+        track_learned_info(db, "c", day, 0)
+        track_learned_info(db, "c", day, 1)
+        db.commit()
+    track_learned_info(db, "c", '2025-01-06', 1)  # 중복 이벤트
+    db.commit()
+
+    stats = get_counters(db, "c")
+    assert (stats.total_learned, stats.streak_days, stats.max_streak) == (10, 2, 3)
+
+    # 카운터 갱신 비용은 기록 길이와 무관
+    counter["queries"] = 0
+    track_learned_info(db, "c", '2025-01-07', 0)
+    db.commit()
+    assert counter["queries"] <= 4
+
+    # 소급 학습으로 연속 구간이 이어지면 재계산 대상으로 표시되어 다음 조회 때 보정
+    track_learned_info(db, "c", '2025-01-04', 0)
+    db.commit()
+    assert get_counters(db, "c").streak_days == 7
+    db.commit()
+    assert reconcile_counters(db, ["c"])["drift"] == []
+
+def test_read_path_does_not_write_counters(make_session):
+    """조회 API는 카운터 행이 없거나 재계산이 필요해도 DB에 쓰지 않고, 재계산은 작업 대기열에서 처리되는지 확인"""
+    db, _ = make_session()
+    for day in ('2025-01-01', '2025-01-02'):
+        track_learned_info(db, "r", day, 0)
+    track_learned_info(db, "flagged", '2025-01-05', 0)
+    track_learned_info(db, "flagged", '2025-01-03', 0)  # 소급 학습 -> 재계산 표시
+    db.query(SessionStatsCounter).filter(SessionStatsCounter.session_id == "r").delete()
+    db.commit()
+    take_rebuild_queue()
+    writes = []
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def _record_writes(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    assert user_progress.get_user_progress("r", db)["total_learned"] == 2
+    assert user_progress.get_user_stats_legacy("r", db)["total_learned"] == 2
+    assert user_progress.get_user_progress("flagged", db)["total_learned"] == 2
+    assert writes == [] and db.get(SessionStatsCounter, "r") is None
+    event.remove(db.get_bind(), "before_cursor_execute", _record_writes)
+
+    # 대기열의 세션만 재계산 (주기 점검이 아니면 표시된 다른 세션은 건드리지 않음)
+    track_learned_info(db, "other", '2025-01-05', 0)
+    track_learned_info(db, "other", '2025-01-03', 0)
+    db.commit()
+    assert run_reconcile_cycle(db)["checked"] == 2
+    assert db.get(SessionStatsCounter, "r").total_learned == 2
+    assert db.get(SessionStatsCounter, "other").needs_reconcile
+    # 주기 점검은 재계산 표시된 행만 처리
+    assert run_reconcile_cycle(db, sweep=True)["checked"] == 1
+    assert not db.get(SessionStatsCounter, "other").needs_reconcile
+    assert run_reconcile_cycle(db, sweep=True)["checked"] == 0
+
+def test_period_stats_year_range_single_query(make_session):
+    db, counter = make_session()
+    end = date(2025, 12, 31)
+    seed_history(db, "period", 400, end=end)
+    db.add(UserProgress(session_id="other", date='2025-06-01', learned_info=json.dumps([0])))
+    db.commit()
+
+    counter["queries"] = 0
+    result = user_progress.get_period_stats("period", '2025-01-01', '2025-12-31', db)
+    assert counter["queries"] == 1
+    assert result["total_days"] == 365
+    assert sum(day["ai_info"] for day in result["period_data"]) == 730
+    assert all(day["terms"] == 1 and day["quiz_total"] == 5 for day in result["period_data"])
+
+def test_period_stats_day_limit(make_session):
+    db, _ = make_session()
+    try:
+        user_progress.get_period_stats("period", '2020-01-01', '2025-12-31', db)
+    except HTTPException as e:
+        assert e.status_code == 400
+    else:
+        assert False, "기간 제한을 초과했는데 예외가 발생하지 않았습니다"
+
+def test_stats_cache_invalidated_on_write(make_session):
+    db, counter = make_session()
+    request = SimpleNamespace(client=None, headers={})
+    today = date.today().strftime('%Y-%m-%d')
+    stats_cache.ttl = 30
+    stats_cache.clear()
+    try:
+        first = user_progress.get_user_stats("cached", db)
+        counter["queries"] = 0
+        assert user_progress.get_user_stats("cached", db) == first
+        assert counter["queries"] == 0
+
+        user_progress.update_user_progress("cached", today, 0, request, db)
+        assert user_progress.get_user_stats("cached", db)["total_learned"] == 1
+        assert stats_cache.hits >= 1 and stats_cache.misses >= 2
+    finally:
+        stats_cache.ttl = 0
+        stats_cache.clear()
+
+def test_response_cache_counts_concurrent_lookups():
+    """여러 스레드가 동시에 조회해도 적중/실패 횟수가 조회 수와 정확히 맞는지 확인"""
+    cache = ResponseCache("concurrent", 30)
+    threads_count, lookups = 8, 2000
+    start = threading.Barrier(threads_count)
+
+    def worker():
+        start.wait()
+        for i in range(lookups):
+            cache.get_or_compute(i % 50, lambda: i)
+            cache.get_many_or_compute([i % 50, 1000 + i % 7], lambda keys: {key: key for key in keys})
+
+    workers = [threading.Thread(target=worker) for _ in range(threads_count)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == threads_count * lookups * 3
+
+def test_batch_ingestion_single_transaction(make_session):
+    db, _ = make_session()
+    request = SimpleNamespace(client=None, headers={})
+    commits = {"count": 0}
+
+    @event.listens_for(db, "after_commit")
+    def _count_commit(session):
+        commits["count"] += 1
+
+    events = []
+    for day in ('2025-03-01', '2025-03-02', '2025-03-03'):
+        events.append({"type": "info", "session_id": "a", "date": day, "info_index": 0})
+        events.append({"type": "term", "session_id": "a", "date": day, "info_index": 0, "term": "LLM"})
+    events += [
+        {"type": "info", "session_id": "a", "date": '2025-03-03', "info_index": 0},  # 배치 내 중복
+        {"type": "quiz", "session_id": "a", "date": '2025-03-03', "score": 3, "total_questions": 4},
+        {"type": "info", "session_id": "b", "date": '2025-03-03', "info_index": 1},
+        {"type": "term", "session_id": "b", "date": '2025-03-03', "info_index": 1},  # 용어 누락
+        {"type": "unknown", "session_id": "b"}
+    ]
+
+    result = user_progress.ingest_learning_events(LearningEventBatch(events=events), request, db)
+    assert (result["applied"], result["duplicates"], result["errors"]) == (8, 1, 2)
+    assert result["results"][6]["status"] == "duplicate"
+    assert result["sessions"] == ["a", "b"]
+    assert commits["count"] == 1
+    assert db.query(ActivityLog).count() == 2
+
+    counters = get_counters(db, "a")
+    assert (counters.total_learned, counters.total_terms_learned, counters.streak_days) == (3, 3, 3)
+    assert (counters.quiz_correct, counters.quiz_total, counters.quiz_score) == (3, 4, 75)
+    db.commit()
+    assert reconcile_counters(db, ["a", "b"])["drift"] == []
+
+def test_invalid_quiz_totals_rejected_per_event(make_session):
+    """문항 수가 음수이거나 맞힌 수가 문항 수보다 많은 퀴즈는 배치에서는 해당 이벤트만, 단건 제출은 422로 거부되는지 확인"""
+    db, _ = make_session()
+    request = SimpleNamespace(client=None, headers={})
+    invalid = ({"score": 0, "total_questions": -1}, {"score": 5, "total_questions": 4}, {"score": 2})
+    events = [{"type": "info", "session_id": "v", "date": '2025-03-01', "info_index": 0}]
+    events += [{"type": "quiz", "session_id": "v", "date": '2025-03-01', **quiz} for quiz in invalid]
+    events.append({"type": "quiz", "session_id": "v", "date": '2025-03-01', "score": 3, "total_questions": 4})
+
+    result = user_progress.ingest_learning_events(LearningEventBatch(events=events), request, db)
+    assert [r["status"] for r in result["results"]] == ["applied", "error", "error", "error", "applied"]
+    assert result["results"][1]["detail"] == "total_questions must not be negative"
+    assert result["results"][2]["detail"] == "score must not exceed total_questions"
+    assert db.query(LearnedInfoEvent).count() == 1 and db.query(QuizAttempt).count() == 1
+
+    for quiz in invalid:
+        try:
+            user_progress.update_quiz_score("v", quiz, request, db)
+            assert False, quiz
+        except HTTPException as e:
+            assert e.status_code == 422
+    assert db.query(QuizAttempt).count() == 1
+
+def count_quiz_submit_queries(make_session, days):
+    db, counter = make_session()
+    seed_history(db, "quiz", days)
+    get_counters(db, "quiz")  # 카운터 준비 (최초 1회 재계산)
+    db.commit()
+    counter["queries"] = 0
+    request = SimpleNamespace(client=None, headers={})
+    result = user_progress.update_quiz_score("quiz", {"score": 5, "total_questions": 5}, request, db)
+    return counter["queries"], result, db
+
+def test_quiz_submit_achievements_constant_cost(make_session):
+    short_queries, result, db = count_quiz_submit_queries(make_session, 5)
+    long_queries, _, _ = count_quiz_submit_queries(make_session, 365)
+    assert short_queries == long_queries
+    assert result["new_achievements"] == ['quiz_beginner', 'quiz_master', 'perfect_quiz']
+    assert db.query(UserAchievement).filter(UserAchievement.session_id == "quiz").count() == 3
+
+def test_check_achievements_reports_unnotified_once(make_session):
+    db, _ = make_session()
+    request = SimpleNamespace(client=None, headers={})
+    today = date.today().strftime('%Y-%m-%d')
+    for info_index in range(3):
+        user_progress.update_user_progress("ach", today, info_index, request, db)
+
+    first = user_progress.check_achievements("ach", db)
+    assert first["new_achievements"] == ['first_learn', 'beginner']
+    second = user_progress.check_achievements("ach", db)
+    assert second["new_achievements"] == []
+    assert second["current_achievements"] == ['first_learn', 'beginner']
+    assert user_progress.get_user_progress("ach", db)["achievements"] == ['first_learn', 'beginner']
+
+def test_rebuild_does_not_overwrite_concurrently_created_counter(make_session):
+    """카운터 행이 없을 때 재계산 도중 다른 요청이 행을 만들고 증분했다면 그 값을 덮어쓰지 않는지 확인"""
+    db, _ = make_session()
+    track_learned_info(db, "race", '2025-05-01', 0)
+    db.query(SessionStatsCounter).delete()
+    db.commit()
+    original = stats_counters.load_session_events
+
+    def load_then_race(session, session_id, *args, **kwargs):
+        # 이벤트를 읽은 직후, 다른 요청이 행을 만들고 새 학습 1건을 반영한 상황
+        events = original(session, session_id, *args, **kwargs)
+        session.add(SessionStatsCounter(session_id=session_id, total_learned=2))
+        session.flush()
+        return events
+
+    stats_counters.load_session_events = load_then_race
+    try:
+        counter = rebuild_counters(db, "race")
+    finally:
+        stats_counters.load_session_events = original
+    db.commit()
+    assert counter.total_learned == 2
+    assert db.get(SessionStatsCounter, "race").total_learned == 2
+
+def test_concurrent_writes_exact_counts():
+    """여러 스레드가 한 세션에 동시에 쓰고 재계산이 함께 돌아도 중복/유실 없이 정확히 집계되는지 확인 (파일 SQLite, 여러 번 반복)"""
+    for round_index in range(5):
+        _run_concurrent_round(f"stress{round_index}")
+
+def _run_concurrent_round(session_id):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(
+            f"sqlite:///{os.path.join(directory, 'stress.db')}",
+            connect_args={"check_same_thread": False, "timeout": 30}
+        )
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        request = SimpleNamespace(client=None, headers={})
+        threads_count, quizzes_per_thread = 8, 3
+        errors = []
+        start = threading.Barrier(threads_count)
+
+        def worker():
+            db = factory()
+            try:
+                start.wait()
+                for info_index in range(10):
+                    user_progress.update_user_progress(session_id, '2025-05-01', info_index, request, db)
+                for i in range(5):
+                    user_progress.update_term_progress(session_id, {"term": f"T{i}", "date": '2025-05-01', "info_index": 0}, request, db)
+                for _ in range(quizzes_per_thread):
+                    user_progress.update_quiz_score(session_id, {"score": 4, "total_questions": 5}, request, db)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        def reconciler(done):
+            # 쓰기와 동시에 재계산 워커가 돌아도 증분이 유실되지 않아야 함
+            db = factory()
+            try:
+                while not done.wait(0.005):
+                    reconcile_counters(db, [session_id])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+
+        done = threading.Event()
+        reconcile_thread = threading.Thread(target=reconciler, args=(done,))
+        reconcile_thread.start()
+        workers = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        done.set()
+        reconcile_thread.join()
+        assert errors == []
+
+        db = factory()
+        try:
+            quiz_count = threads_count * quizzes_per_thread
+            assert db.query(LearnedInfoEvent).count() == 10
+            assert db.query(LearnedTermEvent).count() == 5
+            numbers = sorted(number for (number,) in db.query(QuizAttempt.session_number))
+            assert numbers == list(range(1, quiz_count + 1))
+
+            counters = get_counters(db, session_id)
+            assert (counters.total_learned, counters.total_terms_learned, counters.streak_days) == (10, 5, 1)
+            assert (counters.quiz_correct, counters.quiz_total) == (4 * quiz_count, 5 * quiz_count)
+            assert db.query(UserAchievement).filter(UserAchievement.session_id == session_id).count() == 8
+            assert reconcile_counters(db, [session_id])["drift"] == []
+        finally:
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    from conftest import new_session as make_session
+    stats_cache.ttl = 0  # 캐시 없이 매번 계산하는 비용을 측정
+    for days in (7, 90, 365, 1000):
+        queries, elapsed, _ = count_stats_queries(make_session, days)
+        print(f"📊 {days:>5}일 기록: 쿼리 {queries}회, {elapsed * 1000:.2f}ms")
+    sys.exit(0)
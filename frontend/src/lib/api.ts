@@ -142,6 +142,12 @@ export const logsAPI = {
     action?: string;
     start_date?: string;
     end_date?: string;
+    // 커서 페이지: 응답의 next_cursor/prev_cursor를 그대로 전달
+    pagination?: 'offset' | 'cursor';
+    cursor?: string;
+    direction?: 'next' | 'prev';
+    count?: 'exact' | 'estimate' | 'none';
+    match?: 'contains' | 'prefix' | 'exact';
   }) => {
     const queryParams = new URLSearchParams()
     if (params?.skip) queryParams.append('skip', params.skip.toString())
@@ -152,6 +158,11 @@ export const logsAPI = {
     if (params?.action) queryParams.append('action', params.action)
     if (params?.start_date) queryParams.append('start_date', params.start_date)
     if (params?.end_date) queryParams.append('end_date', params.end_date)
+    if (params?.pagination) queryParams.append('pagination', params.pagination)
+    if (params?.cursor) queryParams.append('cursor', params.cursor)
+    if (params?.direction) queryParams.append('direction', params.direction)
+    if (params?.count) queryParams.append('count', params.count)
+    if (params?.match) queryParams.append('match', params.match)
 
     const response = await api.get(`/api/logs?${queryParams.toString()}`)
     return response.data
@@ -182,6 +193,81 @@ export const logsAPI = {
     return response.data
   },
 
+  // 조건에 맞는 로그를 파일로 내보내기 (NDJSON/CSV, gzip 선택)
+  exportLogs: async (params: {
+    format?: 'ndjson' | 'csv';
+    gzip?: boolean;
+    log_type?: string;
+    log_level?: string;
+    username?: string;
+    action?: string;
+    start_date?: string;
+    end_date?: string;
+  }) => {
+    const queryParams = new URLSearchParams()
+    Object.entries(params).forEach(([key, value]) => {
+      if (value) queryParams.append(key, value.toString())
+    })
+    const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null
+    const response = await fetch(`${API_BASE_URL}/api/logs/export?${queryParams.toString()}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      credentials: 'include',
+    })
+    if (!response.ok) throw new Error(`Log export failed: ${response.status}`)
+    const filename = response.headers.get('Content-Disposition')?.match(/filename="(.+)"/)?.[1] || 'activity_logs'
+    const url = URL.createObjectURL(await response.blob())
+    const link = document.createElement('a')
+    link.href = url
+    link.download = filename
+    link.click()
+    URL.revokeObjectURL(url)
+  },
+
+  // 새 로그 실시간 수신 (Server-Sent Events). EventSource는 인증 헤더를 보낼 수 없어 fetch 스트림으로 읽음
+  // 반환된 함수를 호출하면 연결을 닫음
+  streamLogs: (
+    params: { log_type?: string; log_level?: string; username?: string; action?: string },
+    onLog: (log: any) => void,
+    onDropped?: (count: number) => void
+  ) => {
+    const controller = new AbortController()
+    const queryParams = new URLSearchParams()
+    Object.entries(params).forEach(([key, value]) => {
+      if (value) queryParams.append(key, value)
+    })
+    const token = typeof window !== 'undefined' ? localStorage.getItem('access_token') : null
+
+    const run = async () => {
+      const response = await fetch(`${API_BASE_URL}/api/logs/stream?${queryParams.toString()}`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+        credentials: 'include',
+        signal: controller.signal,
+      })
+      if (!response.ok || !response.body) throw new Error(`Log stream failed: ${response.status}`)
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+        const events = buffer.split('\n\n')
+        buffer = events.pop() || ''
+        for (const raw of events) {
+          const lines = raw.split('\n')
+          const event = lines.find((line) => line.startsWith('event: '))?.slice(7)
+          const data = lines.filter((line) => line.startsWith('data: ')).map((line) => line.slice(6)).join('\n')
+          if (event === 'log') onLog(JSON.parse(data))
+          else if (event === 'dropped') onDropped?.(Number(data))
+        }
+      }
+    }
+    run().catch((error) => {
+      if (error.name !== 'AbortError') console.error('❌ 로그 스트림 오류:', error)
+    })
+    return () => controller.abort()
+  },
+
   // 임시 로그 조회 (인증 없음) - 디버깅용
   getLogsSimple: async (params?: { skip?: number; limit?: number }) => {
     const queryParams = new URLSearchParams()
@@ -301,7 +387,10 @@ export const systemAPI = {
 // AI Info API
 export const aiInfoAPI = {
   getByDate: (date: string) => api.get(`/api/ai-info/${date}`),
+  getRange: (start: string, end: string) => api.get('/api/ai-info/bulk', { params: { start, end } }),
+  getByDates: (dates: string[]) => api.get('/api/ai-info/bulk', { params: { dates: dates.join(',') } }),
   add: (data: any) => api.post('/api/ai-info/', data),
+  checkDuplicates: (data: any) => api.post('/api/ai-info/duplicates/check', data),
   delete: (date: string) => api.delete(`/api/ai-info/${date}`),
   getAllDates: () => api.get('/api/ai-info/dates/all'),
 
@@ -356,4 +445,9 @@ export const baseContentAPI = {
   update: (id: number, data: any) => api.put(`/api/base-content/${id}`, data),
   delete: (id: number) => api.delete(`/api/base-content/${id}`),
   getByCategory: (category: string) => api.get(`/api/base-content/category/${category}`),
-} 
\ No newline at end of file
+} 
+// Search API
+export const searchAPI = {
+  search: (q: string, params: { type?: string; page?: number; size?: number } = {}) =>
+    api.get('/api/search/', { params: { q, ...params } }),
+}